@@ -1,4 +1,5 @@
 import gdspy as gp
+import numpy as np
 import re
 from collections import defaultdict
 
@@ -47,15 +48,16 @@ class GDSBuilder:
             return list(self.layermap.map[layer].values())[0][0] # this is a hack to get the layer number only. Not sure if needed
 
     def make_shape_from_phy(self, phy_obj):
-        layer = phy_obj.layer
-        coords = phy_obj.coords
+        return self.make_shapes(phy_obj.layer, phy_obj.purpose, phy_obj.coords, getattr(phy_obj, 'text', None))
+
+    def make_shapes(self, layer, purposes, coords, text=None):
         shape = []
-        for purpose in phy_obj.purpose:
+        for purpose in purposes:
             map_tuple = self.get_layer_dtype_tuple(layer, purpose)
             if purpose in ['drawing', 'pin', 'blockage']:
                 shape.append(self.make_polygon(coords, tuple=map_tuple))
             elif purpose in ['label']:
-                shape.append(self.make_label(coords, phy_obj.text, layer))
+                shape.append(self.make_label(coords, text, layer))
             else:
                 pass
 
@@ -78,11 +80,62 @@ class GDSBuilder:
         name = text
         return gp.Label(text, coords, layer=layer_num)
 
+    def make_template_cell(self, name, template):
+        """Makes a cell holding the shapes of a ShapeTemplate with their
+        lower-left corner at the origin."""
+        cell = gp.Cell(name, exclude_from_current=True)
+        cell.add(self.make_shapes(template.layer, template.purpose, [0, 0, template.width, template.height]))
+        return cell
+
+    def make_references(self, cell, shape_array, max_period=8):
+        """
+        Places cell at every offset of a ShapeArray. Offsets that repeat on
+        a regular pitch along one axis, e.g. the bits of a bus, become
+        CellArrays: one if the pitch is constant, or one per phase if the
+        spacing repeats every few offsets, as with pins interlaced between
+        power straps. Anything else becomes a CellReference per offset.
+
+        Parameters
+        ----------
+        cell : gdspy.Cell
+        shape_array : ShapeArray
+        max_period : int, optional
+            Longest repeating run of spacings looked for. Default is 8.
+
+        Returns
+        -------
+        list[gdspy.CellReference, gdspy.CellArray]
+        """
+        dbu_per_unit = shape_array.grid.dbu_per_unit
+        offsets = shape_array.dbu[np.lexsort((shape_array.dbu[:, 1], shape_array.dbu[:, 0]))]
+        for period in range(1, min(max_period, len(offsets) - 1) + 1):
+            steps = offsets[period:] - offsets[:-period]
+            if (steps == steps[0]).all() and (steps[0] == 0).sum() == 1:
+                break
+        else:
+            return [gp.CellReference(cell, tuple(offset)) for offset in (offsets / dbu_per_unit).tolist()]
+        spacing = tuple((steps[0] / dbu_per_unit).tolist())
+        references = []
+        for phase in range(period):
+            count = len(offsets[phase::period])
+            origin = tuple((offsets[phase] / dbu_per_unit).tolist())
+            if count == 1:
+                references.append(gp.CellReference(cell, origin))
+            else:
+                columns, rows = (count, 1) if steps[0][0] else (1, count)
+                references.append(gp.CellArray(cell, columns, rows, spacing, origin))
+        return references
+
     def scale_all(self, cell, scale_factor):
         for polygon in cell.polygons:
             polygon.scale(scale_factor)
         for label in cell.labels:
             label.position = label.position * scale_factor
+        for reference in cell.references:
+            reference.origin = tuple(np.array(reference.origin) * scale_factor)
+            reference.magnification = (reference.magnification or 1) * scale_factor
+            if isinstance(reference, gp.CellArray):
+                reference.spacing = tuple(np.array(reference.spacing) * scale_factor)
 
 class GDSDesign:
     """Wrapper around gdspy description of the design"""
@@ -95,20 +148,62 @@ class GDSDesign:
         self.top_cell = gp.Cell(phy_design.name, exclude_from_current=True)
         # Fixme: Figure out why GDSLibrary is remembering cells between instances
         self.gdsii.add(self.top_cell, overwrite_duplicate=True)
+        self.template_cells = {}
 
 
-    def add_polygons(self, cell = None):
+    def add_polygons(self, cell = None, references = False):
+        """
+        Adds the shapes of the design to cell, the top cell by default.
+
+        With references, shapes repeated with the same layer, purpose and
+        size, e.g. the bits of a bus or the straps of a power grid, are
+        written once in a template cell and placed by references. Bus bits
+        that have not been created are read from their ShapeArray instead.
+        """
         if not cell:
             cell = self.top_cell
         phy = self.phy_design
         polygons = []
 
-        for phy_obj in phy.phys_objs:
-            for obj in phy_obj.phys_objs:
-                polygons += self.gds_builder.make_shape_from_phy(obj)
+        # Rectangles are read from the design's RectStore in one pass; gdspy
+        # keeps polygons and labels in separate lists, so their order within
+        # each list is the same as visiting every object. Views of the design
+        # carry a transform, which is applied as the shapes are made.
+        transform = phy.transform
+        if references:
+            rect_store, labels, buses = phy.collect_shapes()
+            shape_arrays = rect_store.shape_arrays(transform)
+            for bus in buses:
+                shape_arrays += bus.shape_array.instances(transform)
+                labels = labels + list(bus.iter_labels())
+            for shape_array in shape_arrays:
+                template = shape_array.template
+                if len(shape_array) == 1:
+                    coords = next(shape_array.iter_coords())
+                    polygons += self.gds_builder.make_shapes(template.layer, template.purpose, coords)
+                else:
+                    polygons += self.gds_builder.make_references(self._template_cell(template), shape_array)
+        else:
+            rect_store, labels = phy.collect_geometry()
+            for layer, purpose, coords in rect_store.iter_rects(transform):
+                polygons += self.gds_builder.make_shapes(layer, purpose, coords)
+        for label in labels:
+            coords = label.coords if transform is None else transform.apply(label.coords)
+            polygons += self.gds_builder.make_shapes(label.layer, label.purpose, coords, label.text)
 
         cell.add(polygons)
 
+    def _template_cell(self, template):
+        """Returns the cell of a ShapeTemplate, adding it to the library
+        the first time."""
+        cell = self.template_cells.get(template)
+        if cell is None:
+            name = f"{self.phy_design.name}_{template.layer}_{len(self.template_cells)}"
+            cell = self.gds_builder.make_template_cell(name, template)
+            self.gdsii.add(cell, overwrite_duplicate=True)
+            self.template_cells[template] = cell
+        return cell
+
     def finish_gdsii(self, scale_factor = 1):
         self.gds_builder.scale_all(self.top_cell, scale_factor)
 
@@ -1,3 +1,4 @@
+from phyrilog.dbu import format_units
 from phyrilog.verilog2phy import PHYDesign, Rectangle, Label
 
 class LEFBlock:
@@ -23,7 +24,7 @@ class LEFBlock:
             layer = new_layer
         else:
             layer = self.layers[layer_name]
-        layer.add_rect([str(x) for x in coords])
+        layer.add_rect([format_units(x) for x in coords])
         return layer
 
     # def add_pin(self, name, pin_obj):
@@ -31,20 +32,38 @@ class LEFBlock:
     #     self.blocks[name] = new_pin
     #     new_pin.add_port(pin_obj.phys_objs)
 
-    def add_pin(self, pin_obj):
+    def add_rectangle(self, rectangle, transform=None):
+        """Adds a Rectangle to its layer, applying transform if given."""
+        coords = rectangle.coords if transform is None else transform.apply(rectangle.coords)
+        return self.add_layer(rectangle.layer, coords)
+
+    def add_pin(self, pin_obj, transform=None):
         new_pin = LEFPin(pin_obj.name, pin_obj)
         self.blocks[pin_obj.name] = new_pin
-        new_pin.add_port(pin_obj.phys_objs)
-
-    def add_bbox_obs(self, bbox_phys_obj):
+        new_pin.add_port(pin_obj.phys_objs, transform)
+
+    def add_bus_pin(self, bus_obj, transform=None):
+        """Adds a PIN per bit of a PHYBusPin, reading the bits' shapes from
+        its ShapeArray instead of creating the bits."""
+        layer = bus_obj.layer
+        shapes = bus_obj.shape_array.iter_coords(transform)
+        for bit_no, bus_idx in enumerate(bus_obj.bus_indices):
+            bit_name = bus_obj.bit_name(bus_idx)
+            new_pin = LEFPin(bit_name, bus_obj)
+            self.blocks[bit_name] = new_pin
+            new_port = new_pin.add_block('PORT', '', [])
+            if bit_no < bus_obj.n_placed:
+                new_port.add_layer(layer, next(shapes))
+
+    def add_bbox_obs(self, bbox_phys_obj, transform=None):
         new_obs = self.add_block('OBS', '', [])
         for rectangle in bbox_phys_obj:
-            new_obs.add_layer(rectangle.layer, rectangle.coords)
+            new_obs.add_rectangle(rectangle, transform)
 
-    def add_pgpin(self, pg, pin_obj):
+    def add_pgpin(self, pg, pin_obj, transform=None):
         new_pgpin = LEFPGPin(pin_obj.name, pin_obj, pg)
         self.blocks[pin_obj.name] = new_pgpin
-        new_pgpin.add_port(pin_obj.phys_objs)
+        new_pgpin.add_port(pin_obj.phys_objs, transform)
 
 
 
@@ -56,15 +75,15 @@ class LEFBlock:
 
 class LEFPin(LEFBlock):
     def __init__(self, pin_name, pin_obj):
-        super().__init__('PIN', pin_obj.name, [])
+        super().__init__('PIN', pin_name, [])
         self.lines.append(f"DIRECTION {pin_obj.direction.upper()}")
         self.lines.append(f"USE SIGNAL")
 
-    def add_port(self, pin_phys_obj):
+    def add_port(self, pin_phys_obj, transform=None):
         new_port = self.add_block('PORT', '', [])
         for rectangle in pin_phys_obj:
             if isinstance(rectangle, Rectangle):
-                new_port.add_layer(rectangle.layer, rectangle.coords)
+                new_port.add_rectangle(rectangle, transform)
 
 class LEFPGPin(LEFPin):
     def __init__(self, pin_name, pin_obj, pg):
@@ -0,0 +1,124 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from phyrilog.parse_cache import ParseCache
+from phyrilog.verilog_library import VerilogLibrary
+from phyrilog.verilog_pin_extract import VerilogModule
+
+ParsedModule = namedtuple('ParsedModule', ['name', 'filename', 'pins', 'params', 'clocks', 'seq_pins',
+                                           'power_pins'])
+ParsedModule.__doc__ = """Picklable parse result of one module. pins, params,
+clocks, seq_pins and power_pins are the dictionaries of the same name on
+VerilogModule."""
+
+# VerilogLibrary objects of a worker process, keyed by file path. Workers
+# reuse the index for every module of a file they are handed, and exit with
+# their pool. The calling process keeps its libraries for one parse_modules
+# call only.
+_libraries = {}
+
+
+def _get_library(filename, libraries):
+    path = os.path.realpath(filename)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    cached = libraries.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, VerilogLibrary(filename))
+        libraries[path] = cached
+    return cached[1]
+
+
+def _parse_chunk(jobs, module_kwargs, cache_dir, libraries=None):
+    """Parses a list of (filename, top) pairs in one process. Worker
+    processes use the module-level libraries."""
+    if libraries is None:
+        libraries = _libraries
+    cache = ParseCache(cache_dir) if cache_dir is not None else None
+    results = []
+    for filename, top in jobs:
+        mod = VerilogModule(top, library=_get_library(filename, libraries), cache=cache, **module_kwargs)
+        results.append(ParsedModule(mod.name, str(filename), mod.pins, mod.params, mod.clocks, mod.seq_pins,
+                                    mod.power_pins))
+    return results
+
+
+def _expand_jobs(sources, libraries):
+    jobs = []
+    for source in sources:
+        if isinstance(source, (tuple, list)):
+            filename, top = source
+            jobs.append((filename, top))
+        else:
+            jobs.extend((source, top) for top in _get_library(source, libraries))
+    return jobs
+
+
+def parse_modules(sources, max_workers=None, chunksize=None, cache_dir=None, **module_kwargs):
+    """Parses many Verilog modules across a pool of worker processes.
+
+    Parameters
+    ----------
+    sources : Iterable[Tuple[str, str], str, Path]
+        Either (filename, top) pairs, or file names, which stand for every
+        module defined in the file. Both can be mixed.
+    max_workers : int, optional
+        Number of worker processes. Defaults to os.cpu_count(). With 1 (or
+        if a process pool cannot be started) the modules are parsed
+        serially in this process. If a worker dies, the chunks that did
+        not finish are parsed serially in this process.
+    chunksize : int, optional
+        Number of modules handed to a worker at a time. Modules from the
+        same file are kept together so each worker indexes a file once.
+        Default splits the work into about four chunks per worker.
+    cache_dir : str, Path, optional
+        Directory of a ParseCache shared by all workers.
+    **module_kwargs
+        Passed to VerilogModule, e.g. constfile, clocks, seq_pins, VDD,
+        VSS and parser.
+
+    Returns
+    -------
+    list[ParsedModule]
+        Parse results in the order of the (expanded) sources.
+
+    """
+    libraries = {}
+    jobs = _expand_jobs(sources, libraries)
+    cache_dir = str(cache_dir) if cache_dir is not None else None
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs)))
+    if max_workers == 1:
+        return _parse_chunk(jobs, module_kwargs, cache_dir, libraries)
+
+    if chunksize is None:
+        chunksize = max(1, -(-len(jobs) // (max_workers * 4)))
+    # Sort by file so chunks rarely span files, remembering input positions.
+    order = sorted(range(len(jobs)), key=lambda idx: str(jobs[idx][0]))
+    chunks = [order[idx:idx + chunksize] for idx in range(0, len(order), chunksize)]
+    results = [None] * len(jobs)
+    try:
+        executor = ProcessPoolExecutor(max_workers=max_workers)
+    except (OSError, NotImplementedError, ImportError):
+        return _parse_chunk(jobs, module_kwargs, cache_dir, libraries)
+    with executor:
+        futures = []
+        for chunk in chunks:
+            try:
+                futures.append(executor.submit(_parse_chunk, [jobs[idx] for idx in chunk], module_kwargs, cache_dir))
+            except BrokenProcessPool:
+                futures.append(None)
+        for chunk, future in zip(chunks, futures):
+            try:
+                chunk_results = future.result() if future is not None else None
+            except BrokenProcessPool:
+                chunk_results = None
+            if chunk_results is None:
+                # The pool lost a worker; parse the chunk in this process
+                chunk_results = _parse_chunk([jobs[idx] for idx in chunk], module_kwargs, cache_dir, libraries)
+            for idx, result in zip(chunk, chunk_results):
+                results[idx] = result
+    return results
@@ -1,54 +1,251 @@
-
+import functools
+import re
 
 # Shamelessly ripping off of the AST module
 
+_token_pattern = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<const>(?:\d*'[bB])?[01](?![\w']))
+  | (?P<name>[A-Za-z_][\w$]*(?:\[\d+\])?)
+  | (?P<op>==|!=|&&|\|\||[~!&|^+*'()])
+""", re.VERBOSE)
+
+# Binding power of binary operators, lowest to highest. Liberty's '+' and
+# '*' are accepted as OR and AND.
+_binary_ops = {
+    '||': (1, 'or'),
+    '|': (1, 'or'),
+    '+': (1, 'or'),
+    '^': (2, 'xor'),
+    '&&': (3, 'and'),
+    '&': (3, 'and'),
+    '*': (3, 'and'),
+    '==': (4, 'eq'),
+    '!=': (4, 'ne'),
+}
+_precedence = {'or': 1, 'xor': 2, 'and': 3}
+_UNARY = 5
+
+# Operator and constant spellings of each output form.
+_styles = {
+    'when': {'not': '!', 'and': ' & ', 'or': ' | ', 'xor': ' ^ ', 0: '0', 1: '1'},
+    'sdf': {'not': '!', 'and': ' & ', 'or': ' | ', 'xor': ' ^ ', 0: "1'b0", 1: "1'b1"},
+}
+
+
+class ConditionError(ValueError):
+    """Raised when a timing condition cannot be parsed."""
+
+
 class Signal:
     def __init__(self, name):
         self.name = name
-        self.elaboration = name
+        self.precedence = _UNARY
+
+    def render(self, style, suffix):
+        """Appends suffix to the signal name, before any bit select."""
+        base, bracket, index = self.name.partition('[')
+        return base + suffix + bracket + index
+
+
+class Constant:
+    def __init__(self, value):
+        self.value = value
+        self.precedence = _UNARY
+
+    def render(self, style, suffix):
+        return _styles[style][self.value]
+
 
 class UnaryOp:
     def __init__(self, op, operand):
         self.op = op
         self.operand = operand
+        self.precedence = _UNARY
 
-class NOT:
-    def __init__(self, tilde=False):
-        if tilde:
-            self.elaboration = '~'
-        else:
-            self.elaboration = '!'
+    def render(self, style, suffix):
+        operand = self.operand.render(style, suffix)
+        if self.operand.precedence < _UNARY:
+            operand = f"({operand})"
+        return _styles[style][self.op] + operand
 
-class AND:
-    def __init__(self):
-        self.elaboration = '&'
-
-class OR:
-    def __init__(self):
-        self.elaboration = '|'
 
 class BinaryOp:
     def __init__(self, op, operand1, operand2):
         self.op = op
         self.operand1 = operand1
         self.operand2 = operand2
-        self.order = [self.operand1,
-                      self.op,
-                      self.operand2]
+        self.precedence = _precedence[op]
+
+    def render(self, style, suffix):
+        # AND, OR and XOR are associative, so operands only need
+        # parentheses when they bind more loosely than this operator.
+        operands = []
+        for operand in (self.operand1, self.operand2):
+            text = operand.render(style, suffix)
+            operands.append(f"({text})" if operand.precedence < self.precedence else text)
+        return _styles[style][self.op].join(operands)
+
+
+def _negate(node):
+    if isinstance(node, UnaryOp):
+        return node.operand
+    if isinstance(node, Constant):
+        return Constant(1 - node.value)
+    return UnaryOp('not', node)
+
+
+def _compare(op, lhs, rhs):
+    """Rewrites a == b and a != b as NOT/XOR, which Liberty expresses."""
+    if isinstance(lhs, Constant):
+        lhs, rhs = rhs, lhs
+    if isinstance(rhs, Constant):
+        result = lhs if rhs.value else _negate(lhs)
+    else:
+        result = _negate(BinaryOp('xor', lhs, rhs))
+    return _negate(result) if op == 'ne' else result
 
-    @property
-    def elaboration(self):
-        return_str = ""
-        for el in self.order:
-            return_str += el.elaboration
-        return return_str
 
-# class Tree:
-#     def __init__(self):
+class Condition:
+    """Timing condition of a sequential pin, parsed once.
+
+    The condition is written in Verilog or Liberty boolean syntax: '~' or
+    '!' (or a trailing "'") for NOT, '&', '&&' or '*' for AND, '|', '||' or
+    '+' for OR, '^' for XOR, '==' and '!=' against signals or constants,
+    and parentheses.
+
+    Parameters
+    ----------
+    text : str
+        Condition text, e.g. '~CSB & ~WEB'.
+
+    Attributes
+    ----------
+    text : str
+        Condition text.
+    tree : Signal, Constant, UnaryOp, BinaryOp
+        Root node of the parsed condition.
+    signals : tuple[str]
+        Names of the signals in the condition, in order of appearance.
+
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+        signals = []
+        self._signals = signals
+        if not self._tokens:
+            raise ConditionError("Empty condition")
+        self.tree = self._parse(0)
+        if self._pos != len(self._tokens):
+            raise ConditionError(f"Unexpected '{self._tokens[self._pos][1]}' in condition {text}")
+        self.signals = tuple(dict.fromkeys(signals))
+        del self._tokens, self._signals
+
+    def render(self, style='when', suffix=''):
+        """Writes the condition out.
+
+        Parameters
+        ----------
+        style : str, optional
+            'when' for a Liberty when attribute, 'sdf' for an sdf_cond
+            attribute. Default is 'when'.
+        suffix : str, optional
+            Suffix appended to every signal name, e.g. the port number of
+            a multi-port memory.
+
+        Returns
+        -------
+        str
+
+        """
+        return self.tree.render(style, suffix)
+
+    def when(self, suffix=''):
+        """Returns the Liberty when string, see render."""
+        return self.render('when', suffix)
+
+    def sdf_cond(self, suffix=''):
+        """Returns the Liberty sdf_cond string, see render."""
+        return self.render('sdf', suffix)
+
+    @staticmethod
+    def _tokenize(text):
+        tokens = []
+        pos = 0
+        while pos < len(text):
+            match = _token_pattern.match(text, pos)
+            if match is None:
+                raise ConditionError(f"Unexpected character '{text[pos]}' in condition {text}")
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == 'const':
+                tokens.append(('const', int(match[kind][-1])))
+            elif kind != 'space':
+                tokens.append((kind, match[kind]))
+        return tokens
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, None)
+
+    def _advance(self):
+        token = self._peek()
+        self._pos += 1
+        return token
+
+    def _parse(self, min_power):
+        node = self._parse_unary()
+        while True:
+            kind, value = self._peek()
+            if kind != 'op' or value not in _binary_ops:
+                return node
+            power, op = _binary_ops[value]
+            if power <= min_power:
+                return node
+            self._advance()
+            rhs = self._parse(power)
+            node = _compare(op, node, rhs) if op in ('eq', 'ne') else BinaryOp(op, node, rhs)
+
+    def _parse_unary(self):
+        kind, value = self._advance()
+        if kind == 'const':
+            node = Constant(value)
+        elif kind == 'name':
+            self._signals.append(value.partition('[')[0])
+            node = Signal(value)
+        elif value == '(':
+            node = self._parse(0)
+            if self._advance()[1] != ')':
+                raise ConditionError(f"Expected ')' in condition {self.text}")
+        elif value in ('~', '!'):
+            return _negate(self._parse_unary())
+        elif value is None:
+            raise ConditionError(f"Unexpected end of condition {self.text}")
+        else:
+            raise ConditionError(f"Unexpected '{value}' in condition {self.text}")
+        # Liberty's postfix NOT, as in A'
+        while self._peek() == ('op', "'"):
+            self._advance()
+            node = _negate(node)
+        return node
+
 
+@functools.lru_cache(maxsize=4096)
+def compile_condition(text):
+    """Parses a timing condition once. Compiled conditions are cached by
+    condition text, so every sequential pin sharing a condition template
+    reuses the same tree.
 
+    Parameters
+    ----------
+    text : str
+        Condition text, e.g. '~CSB & ~WEB'.
 
-# def parse(expr):
+    Returns
+    -------
+    Condition
 
-#     for char in expr:
-#         if
\ No newline at end of file
+    """
+    return Condition(text)
@@ -0,0 +1,118 @@
+import math
+import numbers
+
+import numpy as np
+
+
+class DBUGrid:
+    """
+    Integer database-unit (DBU) grid implied by a design's units and
+    precision, e.g. 1000 DBU per micron for units=1e-6 and precision=1e-9.
+
+    Coordinates stored on the grid are integers, so scaling by an integer
+    and translating are exact. They are converted back to user units only
+    where a view writer reads them.
+
+    Parameters
+    ----------
+    units : float, optional
+        Size of one user unit in meters. Default is 1e-6.
+    precision : float, optional
+        Size of one DBU in meters. Default is 1e-9.
+
+    Attributes
+    ----------
+    units : float
+    precision : float
+    dbu_per_unit : int
+        Number of DBU in one user unit.
+    decimals : int
+        Number of decimal places of a user-unit coordinate on the grid.
+    """
+    def __init__(self, units=1e-6, precision=1e-9):
+        self.units = units
+        self.precision = precision
+        self.dbu_per_unit = int(round(units / precision))
+        self.decimals = int(round(math.log10(self.dbu_per_unit)))
+
+    def __eq__(self, other):
+        return isinstance(other, DBUGrid) and self.dbu_per_unit == other.dbu_per_unit
+
+    def __hash__(self):
+        return hash(self.dbu_per_unit)
+
+    def to_dbu(self, value):
+        """Returns the nearest grid point of a user-unit value, in DBU."""
+        if isinstance(value, numbers.Integral):
+            return int(value) * self.dbu_per_unit
+        return int(round(value * self.dbu_per_unit))
+
+    def to_dbu_array(self, values):
+        """Vectorized to_dbu, returning an int64 array."""
+        return np.rint(np.asarray(values, dtype=float) * self.dbu_per_unit).astype(np.int64)
+
+    def to_units(self, dbu):
+        """Returns a DBU value in user units, as a float."""
+        return dbu / self.dbu_per_unit
+
+    def add(self, *values):
+        """
+        Sums user-unit values on the grid. The values are added as DBU, so
+        the sum is exact instead of accumulating float error.
+
+        Parameters
+        ----------
+        values : float
+            Values to add; subtract a value by passing its negative.
+
+        Returns
+        -------
+        float
+        """
+        return self.to_units(sum(self.to_dbu(value) for value in values))
+
+    def snap(self, value):
+        """
+        Rounds a user-unit value to the grid. Ints are already on the grid
+        and are returned unchanged.
+
+        Parameters
+        ----------
+        value : float
+
+        Returns
+        -------
+        float, int
+        """
+        if isinstance(value, numbers.Integral):
+            return value
+        return self.to_dbu(value) / self.dbu_per_unit
+
+
+DEFAULT_GRID = DBUGrid()
+
+
+def format_units(value):
+    """
+    Formats a user-unit coordinate for a view file. Every writer uses this
+    one rule, so the text does not depend on how the value was computed:
+    whole numbers are written without a decimal point, and anything else
+    as the shortest decimal that reads back as the same float.
+
+    Parameters
+    ----------
+    value : float, int
+
+    Returns
+    -------
+    str
+
+    Examples
+    --------
+    >>> format_units(2.0), format_units(2), format_units(0.102)
+    ('2', '2', '0.102')
+    """
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
@@ -1,23 +1,31 @@
-from verilog_pin_extract import VerilogModule
-import textwrap, re
+from phyrilog.verilog_pin_extract import VerilogModule
+from phyrilog.verilog_lexer import KEYWORDS, mask_comments
+import textwrap, re, bisect
+from collections import namedtuple
 
 class DummyModule(VerilogModule):
+    """VerilogModule for a dummy (port-only) version of a macro. The dummy
+    module text is generated in memory and parsed from there; it is only
+    written to disk if outfile is given."""
     def __init__(self, top, outfile, pin_dict):
         self.outfile = outfile
         self.top = top
         self.pin_dict = pin_dict
         self.line_out = ""
-        self.write_file()
-        super().__init__(top, VDD='VDD', VSS='VSS', filename=outfile, constfile=None, clocks=[('clock')], seq_pins=[()])
-
-    def write_file(self):
-        self.line_out += f"module {self.top}(\n"
+        self.make_module_text()
+        if outfile:
+            self.write_file()
+        super().__init__(top, VDD='VDD', VSS='VSS', filename=outfile, constfile=None, clocks=[('clock')], seq_pins=[],
+                         source=self.line_out)
+
+    def make_module_text(self):
+        self.line_out = f"module {self.top}(\n"
         for pin in self.pin_dict.keys():
             self.line_out += f"\t{pin},\n"
-        self.line_out = self.line_out[-2] + ");\n"
+        self.line_out = self.line_out[:-2] + "\n);\n"
         for pin, attrs in self.pin_dict.items():
             direction = attrs['direction']
-            is_bus = attrs['is_bus']
+            is_bus = attrs.get('is_bus', False)
             if is_bus:
                 bus_max = attrs['bus_max']
                 bus_min = attrs['bus_min']
@@ -25,9 +33,78 @@ class DummyModule(VerilogModule):
             else:
                 self.line_out += f"\t{direction} {pin};\n"
         self.line_out += "endmodule"
+        return self.line_out
+
+    def write_file(self):
         with open(self.outfile, 'w') as file:
             file.write(self.line_out)
 
+Instance = namedtuple('Instance', ['module', 'name', 'start_line', 'end_line', 'connections'])
+Instance.__doc__ = """Module instance in a module body. start_line and end_line are
+indices into the body's line list; connections maps port names to net
+expressions."""
+
+
+class NetIndex:
+    """Instances and connectivity of a module body, built in one pass.
+
+    Every instance is recorded with its connection map, and each net is
+    mapped to the instance ports it is connected to, so that finding the
+    instances of a macro, or what drives or loads a net, is a dictionary
+    lookup.
+
+    Nets are keyed by their connection expression with whitespace removed,
+    e.g. 'A', 'A[3]' or '{a,b}'."""
+
+    _pattern = re.compile(r"\.\s*(?P<port>\w+)\s*\(\s*(?P<net>[^()]*?)\s*\)"
+                          r"|\b(?P<module>\w+)\s*(?:#\s*\((?:[^()]|\([^()]*\))*\)\s*)?(?P<instance>\w+)\s*\("
+                          r"|(?P<end>\)\s*;)")
+    # Words that can precede "name (" without starting an instance
+    _not_modules = KEYWORDS | {'if', 'else', 'for', 'while', 'repeat', 'case', 'casex', 'casez', 'begin', 'end',
+                               'always', 'initial', 'assign', 'return'}
+
+    def __init__(self, line_list):
+        self.instances = {}
+        self.connections = {}
+        text = mask_comments('\n'.join(line_list))
+        line_starts = [0] + [match.end() for match in re.finditer('\n', text)]
+        current = None
+        for match in self._pattern.finditer(text):
+            if match['port'] is not None:
+                if current is None:
+                    continue
+                net = ''.join(match['net'].split())
+                current[4][match['port']] = net
+                self.connections.setdefault(net, []).append((current[0], current[1], match['port']))
+            elif match['module'] in self._not_modules:
+                current = None
+            elif match['module'] is not None:
+                current = [match['module'], match['instance'],
+                           bisect.bisect_right(line_starts, match.start()) - 1, None, {}]
+            elif current is not None:
+                current[3] = bisect.bisect_right(line_starts, match.start()) - 1
+                self.instances.setdefault(current[0], []).append(Instance(*current))
+                current = None
+
+    def instances_of(self, module):
+        """Returns the list of Instance of module in body order."""
+        return self.instances.get(module, [])
+
+    def driver_and_loads(self, net, output_ports, input_ports):
+        """Returns the (module, instance, port) connection driving net, or
+        None, and the list of connections loading it. output_ports and
+        input_ports are sets of port names known to be outputs and
+        inputs."""
+        driver = None
+        loads = []
+        for conn in self.connections.get(net, ()):
+            if conn[2] in input_ports:
+                loads.append(conn)
+            elif conn[2] in output_ports:
+                driver = conn
+        return driver, loads
+
+
 class Dummifier:
     def __init__(self, parent_module, macros=None):
         self.parent = parent_module
@@ -35,67 +112,55 @@ class Dummifier:
         self.dummies = []
         self.dummy_line_lists = {}
         self.dummy_pin_dicts = {}
+        self.net_index = None
+
+    def _get_net_index(self):
+        if self.net_index is None:
+            self.net_index = NetIndex(self.parent.line_list)
+        return self.net_index
 
     def scrape_dummies(self):
         line_list = self.parent.line_list
         self.line_list = line_list
-        end_pttrn = re.compile(r'[\s\S]*\);')
+        net_index = self._get_net_index()
         for macro in self.macros:
-            self.dummy_line_lists[macro] = []
-            top_line = self._get_dummy_top_line(line_list, macro)
-            idx = top_line
-            for line in line_list[idx:]:
-                self.dummy_line_lists[macro].append(line)
-                if re.match(end_pttrn, line):
-                    end_line = line_list.index(line)
-                    break
+            instances = net_index.instances_of(macro)
+            if instances:
+                self.dummy_line_lists[macro] = line_list[instances[0].start_line:instances[0].end_line + 1]
+            else:
+                self.dummy_line_lists[macro] = []
 
     def get_macro_pins(self):
-        pattern = re.compile("\([\s\S]+\)[,]*")
-        for macro, macro_line_list in self.dummy_line_lists.items():
+        net_index = self._get_net_index()
+        for macro in self.dummy_line_lists:
             self.dummy_pin_dicts[macro] = {}
-            for macro_line in macro_line_list:
-                if re.search(pattern, macro_line):
-                    pin_name = macro_line.split("(")[0].strip()[1:]
-                    connection = re.search(pattern, macro_line)[0]
-                    connection = re.search("[^\(\)]", connection)[0]
+            for instance in net_index.instances_of(macro)[:1]:
+                for pin_name, connection in instance.connections.items():
                     self.dummy_pin_dicts[macro][pin_name] = {'name': pin_name,
                                                              'conn': connection}
 
     def get_pin_directions(self, submod_ins = None, submod_outs = None):
+        net_index = self._get_net_index()
+        submod_ins = set(submod_ins or ())
+        submod_outs = set(submod_outs or ())
         unknowns = []
         for macro, pin_dicts in self.dummy_pin_dicts.items():
             for pin, pin_dict in pin_dicts.items():
                 conn = pin_dict['conn']
-                if conn in self.parent.pin_names:
+                if conn in self.parent.pins:
                     pin_dict['direction'] = self.parent.pins[conn]['direction']
                     continue
-                collection = []
-                for line in self.line_list:
-                    if re.search(f"\({pin_dict['conn']}\)", line):
-                        collection.append(line)
-                for line in collection:
-                    if any([ins in line for ins in submod_ins]):
-                        pin_dict['direction'] = 'output'
-                    elif any([outs in line for outs in submod_outs]):
-                        pin_dict['direction'] = 'input'
-                    elif 'assign' in line:
-                        lin = line.replace('assign', "")
-
-                    else:
-                        continue
+                driver, loads = net_index.driver_and_loads(conn, submod_outs, submod_ins)
+                if driver:
+                    pin_dict['direction'] = 'input'
+                elif loads:
+                    pin_dict['direction'] = 'output'
                 if not pin_dict.get('direction', None):
                     unknowns.append((macro,pin))
         if len(unknowns):
             for macro, pin in unknowns:
                 print(f"WARNING: Could not determine port direction for {macro}.{pin}!")
 
-    def _get_dummy_top_line(self, line_list, dummy):
-        pattern = re.compile(fr"[\s]*{dummy} [\w]+ \(")
-        for line in line_list:
-            if re.match(pattern, line):
-                return line_list.index(line)
-
 
 class BinaryOp:
     def __init__(self, left_op, right_op):
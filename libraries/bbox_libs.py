@@ -19,9 +19,13 @@ class PHYBBox(PHYObject):
         Right x-coordinate.
     top_y : float
         Top y-coordinate.
+    grid : DBUGrid, optional
+        Grid of the blockage Rectangles. Default is 1000 DBU per unit.
     """
-    def __init__(self, layers, left_x, bot_y, right_x, top_y):
-        super().__init__("BBOX")
+    __slots__ = ()
+
+    def __init__(self, layers, left_x, bot_y, right_x, top_y, grid=DEFAULT_GRID):
+        super().__init__("BBOX", grid)
         self.purpose = 'blockage'
         for layer in layers:
             self.add_rect(layer, left_x, bot_y, right_x, top_y)
@@ -48,7 +52,7 @@ class PHYBBox(PHYObject):
         -------
 
         """
-        rect_obj = Rectangle(layer, left_x, bot_y, right_x, top_y, purpose=purpose)
+        rect_obj = Rectangle(layer, left_x, bot_y, right_x, top_y, purpose=purpose, grid=self.grid)
         self.phys_objs.append(rect_obj)
         self.rects[rect_obj.centroid] = rect_obj
 
@@ -156,14 +160,14 @@ class BBoxPHY(PHYDesign):
             if 'aspect_ratio' in self.specs.keys():
                 ar = self.specs['aspect_ratio']
                 if y_width and not x_width:
-                    x_width = round(y_width / ar[1] * ar[0], 3)
+                    x_width = self.grid.snap(y_width / ar[1] * ar[0])
                 elif x_width and not y_width:
-                    y_width = round(x_width / ar[0] * ar[1], 3)
+                    y_width = self.grid.snap(x_width / ar[0] * ar[1])
                 else:
                     if self.specs['x_strictness'] == self.strictness_opt[0]:
-                        x_width = round(y_width / ar[1] * ar[0], 3)
+                        x_width = self.grid.snap(y_width / ar[1] * ar[0])
                     elif self.specs['y_strictness'] == self.strictness_opt[0]:
-                        y_width = round(x_width / ar[0] * ar[1], 3)
+                        y_width = self.grid.snap(x_width / ar[0] * ar[1])
                     else:
                         raise ValueError(
                             "Cannot resolve aspect ratio with given x and y widths. \
@@ -185,33 +189,36 @@ class BBoxPHY(PHYDesign):
                          Please adjust dimension or relax y strictness.')
                 else:
                     y_width = self.pin_placer.min_y_dim
-            self.bbox_x_width = round(x_width, 3)
-            self.bbox_y_width = round(y_width, 3)
+            self.bbox_x_width = self.grid.snap(x_width)
+            self.bbox_y_width = self.grid.snap(y_width)
+            origin = self.pin_placer.specs['origin']
             if not box_predefined:
-                bbox = np.asarray([round(self.pin_placer.max_l_pin_length, 3),
-                                round(self.pin_placer.max_b_pin_length, 3),
-                                round(x_width + self.pin_placer.max_l_pin_length, 3),
-                                round(y_width + self.pin_placer.max_b_pin_length, 3)])
-                bbox = np.asarray(self.pin_placer.specs['origin'] * 2) + bbox
+                bbox = [self.grid.add(origin[0], self.pin_placer.max_l_pin_length),
+                        self.grid.add(origin[1], self.pin_placer.max_b_pin_length),
+                        self.grid.add(origin[0], x_width, self.pin_placer.max_l_pin_length),
+                        self.grid.add(origin[1], y_width, self.pin_placer.max_b_pin_length)]
             else:
-                bbox = np.asarray([round(self.pin_placer.max_l_pin_length, 3),
-                                round(self.pin_placer.max_b_pin_length, 3),
-                                round(x_width - self.pin_placer.max_r_pin_length, 3),
-                                round(y_width - self.pin_placer.max_t_pin_length, 3)])
-                bbox = np.asarray(self.pin_placer.specs['origin'] * 2) + bbox
+                bbox = [self.grid.add(origin[0], self.pin_placer.max_l_pin_length),
+                        self.grid.add(origin[1], self.pin_placer.max_b_pin_length),
+                        self.grid.add(origin[0], x_width, -self.pin_placer.max_r_pin_length),
+                        self.grid.add(origin[1], y_width, -self.pin_placer.max_t_pin_length)]
+            bbox = np.asarray(bbox)
             self.pin_placer.specs['internal_box'] = bbox.tolist()
             if self.specs['pin_margin'] and not box_predefined:
                 margins = np.asarray([0, 0, self.pin_placer.v_pin_pitch,
                                       self.pin_placer.h_pin_pitch])
                 inner_box = bbox + margins
                 self.pin_placer.specs['internal_box'] = inner_box.tolist()
-            self.pin_placer.specs['design_boundary'] = (round(self.pin_placer.specs['internal_box'][2] + self.pin_placer.max_r_pin_length, 3),
-                                                        round(self.pin_placer.specs['internal_box'][3] + self.pin_placer.max_t_pin_length, 3))
+            self.pin_placer.specs['design_boundary'] = (
+                self.grid.add(self.pin_placer.specs['internal_box'][2], self.pin_placer.max_r_pin_length),
+                self.grid.add(self.pin_placer.specs['internal_box'][3], self.pin_placer.max_t_pin_length))
             self.pin_placer.specs['bound_box'] = self.pin_placer.specs['origin'] + list(self.pin_placer.specs['design_boundary'])
         else:
             self.pin_placer.autodefine_boundaries()
-            self.bbox_x_width =  self.pin_placer.specs['internal_box'][2] - self.pin_placer.specs['internal_box'][0]
-            self.bbox_y_width = self.pin_placer.specs['internal_box'][3] - self.pin_placer.specs['internal_box'][1]
+            self.bbox_x_width = self.grid.add(self.pin_placer.specs['internal_box'][2],
+                                              -self.pin_placer.specs['internal_box'][0])
+            self.bbox_y_width = self.grid.add(self.pin_placer.specs['internal_box'][3],
+                                              -self.pin_placer.specs['internal_box'][1])
         # Update local specs to reflect pin_placer specs
         self.specs = r_update(self.specs, self.pin_placer.specs)
 
@@ -249,7 +256,8 @@ class BBoxPHY(PHYDesign):
                             self.specs['internal_box'][0],
                             self.specs['internal_box'][1],
                             self.specs['internal_box'][2],
-                            self.specs['internal_box'][3])}
+                            self.specs['internal_box'][3],
+                            self.grid)}
         self.polygons['bboxes'] = self.bboxes
         self.phys_objs.append(self.bboxes['BBOX'])
 
@@ -266,9 +274,10 @@ class BBoxLEFBuilder(LEFBuilder):
         name = phy_design.name
         class_line = "CLASS BLOCK"
         header_lines = self.add_lef_header(version=5.6)
-        origin_line = f"ORIGIN {phy_design.specs['origin'][0]} {phy_design.specs['origin'][1]}"
-        foreign_line = f"FOREIGN {name} {phy_design.specs['origin'][0]} {phy_design.specs['origin'][1]}"
-        size_line = f"SIZE {phy_design.x_width} BY {phy_design.y_width}"
+        origin = ' '.join(format_units(value) for value in phy_design.specs['origin'][:2])
+        origin_line = f"ORIGIN {origin}"
+        foreign_line = f"FOREIGN {name} {origin}"
+        size_line = f"SIZE {format_units(phy_design.x_width)} BY {format_units(phy_design.y_width)}"
         sym_line = f"SYMMETRY {phy_design.specs['symmetry']}"
         site_line = f"SITE {phy_design.specs['site']}"
 
@@ -279,10 +288,19 @@ class BBoxLEFBuilder(LEFBuilder):
         macro_lines = [class_line, origin_line, foreign_line, size_line, sym_line, site_line]
 
         macro_block = self.add_block('MACRO', phy_design.name, lines=macro_lines)
+        transform = phy_design.transform
         if add_pg_pins:
             for pg, pin in pg_pins.items():
-                macro_block.add_pgpin(pg, pin)
+                macro_block.add_pgpin(pg, pin, transform)
+        # Buses whose bits have not been created are written from their
+        # ShapeArray; created bits may have been edited, so they are used.
         for pin in pins:
-            macro_block.add_pin(pin)
+            if isinstance(pin, PHYBusPin) and pin._bits is None:
+                macro_block.add_bus_pin(pin, transform)
+            elif isinstance(pin, PHYBusPin):
+                for bit in pin.bits:
+                    macro_block.add_pin(bit, transform)
+            else:
+                macro_block.add_pin(pin, transform)
         for bbox in bbox.values():
-            macro_block.add_bbox_obs(bbox.phys_objs)
+            macro_block.add_bbox_obs(bbox.phys_objs, transform)
@@ -0,0 +1,122 @@
+import time
+import warnings
+
+from phyrilog.utilities import file_stamp
+from phyrilog.verilog_library import LibraryChanges, VerilogLibrary
+
+
+class LibraryWatcher:
+    """Watches the file of a VerilogLibrary, and the `include files it
+    reads, and reports which modules an edit changed.
+
+    The library stays in memory between edits. When the (mtime, size)
+    stamp of the file or of one of its includes changes, the file is
+    re-read and re-indexed once, and modules are
+    compared by the digest of their own text and `define constants, so only
+    the modules that were actually edited are reported.
+
+    Parameters
+    ----------
+    library : VerilogLibrary, str, Path
+        Library to watch, or the name of the file to index and watch.
+    interval : float, optional
+        Seconds between checks of the file stamp. Default is 0.25.
+
+    Attributes
+    ----------
+    library : VerilogLibrary
+        The watched library, refreshed in place.
+    interval : float
+        Seconds between checks of the file stamp.
+
+    Examples
+    --------
+    >>> watcher = LibraryWatcher('sram.v')
+    >>> watcher.watch(lambda changes: print(changes.changed))
+
+    """
+
+    def __init__(self, library, interval=0.25):
+        if not isinstance(library, VerilogLibrary):
+            library = VerilogLibrary(library)
+        if library.in_memory:
+            raise ValueError("Cannot watch a library built from in-memory source.")
+        self.library = library
+        self.interval = interval
+        self._stamp = self._get_stamp()
+
+    def _get_stamp(self):
+        stamp = file_stamp(self.library.filename)
+        if stamp is None:
+            # Editors that save by replacing the file can briefly leave
+            # no file behind; try again on the next check.
+            return None
+        # Included const files, e.g. the SRAM const.vh, change the macros
+        # of the modules after them.
+        return stamp, tuple((path, file_stamp(path)) for path in self.library.include_stamps)
+
+    def poll(self):
+        """Checks the file and its includes once.
+
+        Returns
+        -------
+        LibraryChanges
+            Modules that changed or were removed since the last check. Both
+            lists are empty if the file is unchanged.
+
+        Raises
+        ------
+        Exception
+            Any error re-reading or re-indexing the file. The library keeps
+            its previous index, and the next check tries again.
+
+        """
+        stamp = self._get_stamp()
+        if stamp is None or stamp == self._stamp:
+            return LibraryChanges([], [])
+        changes = self.library.refresh()
+        self._stamp = stamp
+        return changes
+
+    def watch(self, callback, stop=None, on_error=None):
+        """Checks the file every interval seconds, calling callback with
+        the LibraryChanges of every edit that changed a module. Returns
+        when stop is set, or on KeyboardInterrupt.
+
+        An edit that cannot be parsed, e.g. a file saved half-way through
+        an edit, is reported once and the watch goes on; the library keeps
+        its last good index until the file is fixed.
+
+        Parameters
+        ----------
+        callback : Callable[[LibraryChanges], Any]
+            Called after the library has been refreshed.
+        stop : threading.Event, optional
+            Event that ends the watch when set.
+        on_error : Callable[[Exception], Any], optional
+            Called with the error of an edit that could not be parsed.
+            Default issues a warning.
+
+        """
+        failed_stamp = None
+        try:
+            while stop is None or not stop.is_set():
+                try:
+                    changes = self.poll()
+                except Exception as error:
+                    stamp = self._get_stamp()
+                    if stamp != failed_stamp:
+                        failed_stamp = stamp
+                        if on_error is None:
+                            warnings.warn(f"Could not refresh {self.library.filename}: {error}")
+                        else:
+                            on_error(error)
+                    changes = LibraryChanges([], [])
+                if changes.changed or changes.removed:
+                    callback(changes)
+                if stop is not None:
+                    stop.wait(self.interval)
+                else:
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
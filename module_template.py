@@ -0,0 +1,106 @@
+import copy
+
+from phyrilog.verilog_lexer import scan_module_header
+
+
+class ModuleTemplate:
+    """Parameterized Verilog module parsed once and elaborated for many
+    parameter sets.
+
+    The template keeps the module's parameter default expressions and the
+    bus range expressions of its ports. Elaborating it for a parameter set
+    re-evaluates only those expressions; the source is not read or scanned
+    again. Clock and sequential pin matching depend only on pin names, so
+    their results are reused as well.
+
+    Parameters
+    ----------
+    module : VerilogModule
+        Parsed module with its default parameter values. Any parser
+        backend can be used; with parser='lexer' or 'stream' the header
+        scanned during parsing is reused.
+
+    Attributes
+    ----------
+    module : VerilogModule
+        The module the template was made from.
+    param_exprs : dict
+        Dictionary of parameter default expression strings keyed by name,
+        in declaration order.
+    ranges : dict
+        Dictionary of (msb, lsb) expression strings keyed by bus pin name.
+
+    Examples
+    --------
+    >>> template = ModuleTemplate(VerilogModule('Fifo', filename='fifo.v', parser='lexer'))
+    >>> fifo32 = template.elaborate({'WIDTH': 32})
+    >>> fifo32.pins['din']['bus_max']
+    31
+
+    """
+
+    def __init__(self, module):
+        header = module._header
+        if header is None:
+            header = scan_module_header('\n'.join(module.line_list), module.name, module.top_line_no)
+        self.module = module
+        self.param_exprs = dict(header.params)
+        self.ranges = {name: decl.bus_range for decl in header.ports for name in decl.names
+                       if decl.bus_range and name in module.pins}
+
+    @property
+    def param_names(self):
+        """Names that can be overridden: the module parameters and the
+        numeric `define constants."""
+        names = list(self.param_exprs)
+        if self.module.macros:
+            names.extend(name for name in self.module.macros.numeric_values() if name not in self.param_exprs)
+        return names
+
+    def elaborate(self, overrides=None):
+        """Creates the module for a parameter set.
+
+        Parameters
+        ----------
+        overrides : dict, optional
+            Dictionary of parameter values keyed by name, as given in a
+            #(...) parameter override. Parameters whose defaults depend on
+            an overridden parameter are re-evaluated.
+
+        Returns
+        -------
+        VerilogModule
+            New module with its own params, pins, clocks and seq_pins.
+
+        Raises
+        ------
+        ValueError
+            If overrides names a parameter the module does not have.
+
+        """
+        overrides = dict(overrides or {})
+        unknown = set(overrides).difference(self.param_names)
+        if unknown:
+            raise ValueError(f"Module {self.module.name} has no parameter(s) {', '.join(sorted(unknown))}.")
+        base = self.module
+        variant = copy.copy(base)
+        variant.params = {}
+        variant._set_params(self.param_exprs, overrides)
+
+        # Pin dicts are copied, and clocks/seq_pins are pointed at the
+        # copies, as they share pin dicts in a freshly parsed module.
+        copies = {}
+        variant.pins = {}
+        for name, pin in base.pins.items():
+            new_pin = dict(pin)
+            bus_range = self.ranges.get(name)
+            if bus_range is not None:
+                new_pin.update(variant._bus_parser(f"[{bus_range[0]}:{bus_range[1]}]"))
+            variant.pins[name] = new_pin
+            copies[id(pin)] = new_pin
+        variant.clocks = {name: copies.get(id(pin), pin) for name, pin in base.clocks.items()}
+        variant.seq_pins = {name: copies.get(id(pin), pin) for name, pin in base.seq_pins.items()}
+        variant.pin_name_list = None
+        variant.ports_json_dict = {'name': variant.name,
+                                   'pins': variant.pins}
+        return variant
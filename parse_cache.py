@@ -0,0 +1,130 @@
+import hashlib
+import os
+import pickle
+import tempfile
+
+# Bump when the parser output or the stored state layout changes so that
+# stale entries are never loaded.
+CACHE_VERSION = 1
+
+
+class ParseCache:
+    """Content-addressed on-disk cache of parsed VerilogModule results.
+
+    Entries are keyed by the digest of the source file, the digest of the
+    `define constants seen by the module, the module name and the
+    clocks/seq_pins/power pin specs, so a changed file or spec simply
+    misses. Each entry is a pickle of the module's pins, params, clocks and
+    seq_pins dictionaries; clocks and seq_pins share their pin dictionaries
+    with pins, as they do in a freshly parsed module.
+
+    Serialized entries are also kept in memory, so repeated lookups in one
+    process do not touch the disk. Every lookup returns a fresh copy.
+
+    Parameters
+    ----------
+    cache_dir : str, Path
+        Directory holding the cache entries. Created if it does not exist.
+
+    Examples
+    --------
+    >>> cache = ParseCache('.phyrilog_cache')
+    >>> mod = VerilogModule('SRAM1RW1024x16', filename='sram.v', cache=cache)
+
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = str(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(source_digest, macro_digest, top, clocks, seq_pins, VDD, VSS, parser):
+        """Returns the cache key for a module.
+
+        Parameters
+        ----------
+        source_digest : str
+            Digest of the Verilog source file contents.
+        macro_digest : str
+            Digest of the `define constants seen by the module, or an empty
+            string if there are none.
+        top : str
+            Name of the module.
+        clocks : Iterable[str], str
+            Clock pin name spec passed to VerilogModule.
+        seq_pins : Iterable[Tuple[str, str, str]]
+            Sequential pin spec passed to VerilogModule.
+        VDD, VSS : str
+            Related power and ground pin names.
+        parser : str
+            Port extraction backend.
+
+        Returns
+        -------
+        str
+            Hex digest identifying the parse result.
+
+        """
+        content = repr((CACHE_VERSION, source_digest, macro_digest, top, clocks, seq_pins, VDD, VSS, parser))
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.pickle')
+
+    def get(self, key):
+        """Returns the stored state for key, or None on a miss. Entries that
+        cannot be unpickled, e.g. truncated files or entries referring to
+        classes that no longer exist, are deleted and treated as misses."""
+        data = self._memory.get(key)
+        if data is None:
+            try:
+                with open(self._path(key), 'rb') as file:
+                    data = file.read()
+            except OSError:
+                self.misses += 1
+                return None
+        try:
+            state = pickle.loads(data)
+        except Exception:
+            self._discard(key)
+            self.misses += 1
+            return None
+        self._memory[key] = data
+        self.hits += 1
+        return state
+
+    def _discard(self, key):
+        """Removes the entry for key from memory and disk."""
+        self._memory.pop(key, None)
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def put(self, key, state):
+        """Stores state under key. The entry is written to a temporary file
+        and renamed into place, so concurrent writers never expose a
+        partial entry."""
+        data = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        self._memory[key] = data
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def clear(self):
+        """Removes every entry from the cache."""
+        self._memory.clear()
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith('.pickle'):
+                    os.unlink(os.path.join(root, name))
@@ -0,0 +1,508 @@
+import functools
+import importlib
+import json
+import struct
+
+import numpy as np
+
+from phyrilog.verilog2phy import Label, PHYBusPin, PHYObject, PHYPortPin, Rectangle
+
+# Bump when the layout of the snapshot changes. Snapshots of other versions
+# are rejected rather than misread.
+SNAPSHOT_VERSION = 3
+_MAGIC = b'PHYSNAP\0'
+_header = struct.Struct('<HI')
+_NONE = 0xFFFFFFFF
+
+# Geometry is stored as packed arrays of DBU on the design grid.
+_rect_dtype = np.dtype([('layer', '<u4'), ('purpose', '<u4'), ('orientation', '<u4'),
+                        ('dbu', '<i8', (4,)), ('key', '<f8', (2,)), ('flags', 'u1')])
+_port_dtype = np.dtype([('cls', '<u4'), ('strings', '<u4', (6,)), ('pin_dict', '<u4'), ('n', '<u4'),
+                        ('numbers', '<f8', (3,)), ('bus_idx', '<i8'), ('flags', 'u1')])
+_label_dtype = np.dtype([('text', '<u4'), ('layer', '<u4'), ('purpose', '<u4'), ('show', 'u1'),
+                         ('dbu', '<i8', (2,))])
+_RECT, _LABEL = 0, 1
+_KEY_IS_TUPLE = 1
+
+# Attributes stored in the fixed part of a pin record; everything else an
+# object carries goes into its generic 'x' (extras) mapping.
+_pin_strings = ('name', 'direction', 'layer', 'side', 'related_power_pin', 'related_ground_pin')
+_port_numbers = ('x_width', 'y_width', 'center', 'bus_idx')
+_bus_numbers = ('x_width', 'y_width', 'bus_min', 'bus_max', 'n_placed')
+_geometry_attrs = ('phys_objs', 'rects', 'labels')
+_port_attrs = frozenset(_pin_strings + _port_numbers + _geometry_attrs + ('pin_dict', 'spatial_index', 'grid'))
+_bus_attrs = frozenset(_pin_strings + _bus_numbers + ('pin_dict', '_offsets', '_scale_factors', '_bits',
+                                                      'spatial_index', 'grid'))
+_object_attrs = frozenset(('name', 'spatial_index', 'grid') + _geometry_attrs)
+# Values every PHYPortPin is created with; only differing values are stored.
+_port_defaults = {'purpose': None, 'block_structure': {}}
+
+# Design attributes that are not part of a snapshot: the pin placer holds its
+# own copy of every pin and of the tech file, the raw tech file contents are
+# only needed to build the design, and the RectStore is rebuilt on demand.
+_skipped_design_attrs = frozenset(('pin_placer', 'tech_dict', '_rect_store', '_spatial_index', '_n_indexed'))
+
+
+def _instance_attrs(obj):
+    """Returns the attributes set on obj, from its __slots__ and __dict__."""
+    attrs = {}
+    for cls in reversed(type(obj).__mro__):
+        slots = cls.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ('__dict__', '__weakref__') and hasattr(obj, name):
+                attrs[name] = getattr(obj, name)
+    attrs.update(getattr(obj, '__dict__', {}))
+    return attrs
+
+
+class SnapshotError(ValueError):
+    """Raised when data is not a PHYDesign snapshot of a supported version."""
+
+
+def _class_ref(cls):
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+@functools.lru_cache(maxsize=None)
+def _load_class(ref):
+    module, qualname = ref.split(':')
+    obj = importlib.import_module(module)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _rows(array):
+    """Converts a structured array to lists of plain Python values; tolist
+    leaves sub-array fields as numpy arrays."""
+    return [[field.tolist() if isinstance(field, np.ndarray) else field for field in row]
+            for row in array.tolist()]
+
+
+def _pack_numbers(values):
+    """Returns values with None replaced by 0, and flags marking the
+    Nones."""
+    flags = 0
+    for bit, value in enumerate(values):
+        if value is None:
+            flags |= 1 << bit
+    return [0 if value is None else value for value in values], flags
+
+
+def _unpack_numbers(values, flags):
+    return [None if flags >> bit & 1 else value for bit, value in enumerate(values)]
+
+
+class _Writer:
+    """Collects the string table, pin dictionaries, objects and geometry
+    of one design."""
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.purposes = []
+        self.purpose_ids = {}
+        self.pin_dicts = []
+        self.pin_dict_ids = {}
+        self.objects = []
+        self.object_ids = {}
+        self.registered = []
+        self.shared = {}
+        self.defined = set()
+        self.ports = []
+        self.port_extras = {}
+        self.rects = []
+        self.labels = []
+        self.kinds = []
+        # Set to the grid of the design before its objects are encoded
+        self.grid = None
+
+    def string(self, value):
+        if value is None:
+            return _NONE
+        idx = self.string_ids.get(value)
+        if idx is None:
+            idx = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+    def purpose(self, value):
+        key = tuple(value) if isinstance(value, list) else value
+        idx = self.purpose_ids.get(key)
+        if idx is None:
+            idx = self.purpose_ids[key] = len(self.purposes)
+            self.purposes.append(self.encode(list(value) if isinstance(value, list) else value))
+        return idx
+
+    def pin_dict(self, pin_dict):
+        idx = self.pin_dict_ids.get(id(pin_dict))
+        if idx is None:
+            idx = self.pin_dict_ids[id(pin_dict)] = len(self.pin_dicts)
+            self.pin_dicts.append(pin_dict)
+        return idx
+
+    def object(self, obj):
+        """Returns the index of obj in the object table. Objects are
+        registered here and encoded later, so references may be cyclic."""
+        idx = self.object_ids.get(id(obj))
+        if idx is None:
+            idx = self.object_ids[id(obj)] = len(self.objects)
+            self.objects.append(None)
+            self.registered.append(obj)
+        return idx
+
+    def encode(self, value):
+        """Encodes plain data as JSON-compatible values. Physical objects
+        become references into the object table."""
+        if isinstance(value, (PHYObject, PHYBusPin)):
+            return {'__o': self.object(value)}
+        if id(value) in self.pin_dict_ids:
+            return {'__p': self.pin_dict_ids[id(value)]}
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, tuple):
+            return {'__t': [self.encode(item) for item in value]}
+        if not isinstance(value, (list, dict)):
+            raise TypeError(f"Cannot snapshot value of type {type(value).__name__}.")
+        shared = self.shared.get(id(value))
+        if shared is not None and id(value) in self.defined:
+            return {'__r': shared}
+        if isinstance(value, list):
+            encoded = [self.encode(item) for item in value]
+        elif all(isinstance(key, str) and not key.startswith('__') for key in value):
+            encoded = {key: self.encode(item) for key, item in value.items()}
+        else:
+            encoded = {'__d': [[self.encode(key), self.encode(item)] for key, item in value.items()]}
+        if shared is None:
+            return encoded
+        # The first occurrence of a container that is referenced more than
+        # once defines it; later occurrences refer back to it.
+        self.defined.add(id(value))
+        return {'__k': shared, 'v': encoded}
+
+    def find_shared(self, value, seen):
+        """Numbers the lists and dicts reachable from value that are
+        referenced more than once, e.g. a design's specs and defaults."""
+        if isinstance(value, tuple):
+            for item in value:
+                self.find_shared(item, seen)
+        elif isinstance(value, (list, dict)) and id(value) not in self.pin_dict_ids:
+            if id(value) in seen:
+                self.shared.setdefault(id(value), len(self.shared))
+                return
+            seen[id(value)] = value
+            items = value if isinstance(value, list) else [item for pair in value.items() for item in pair]
+            for item in items:
+                self.find_shared(item, seen)
+
+    def extras(self, obj, known):
+        return {name: self.encode(value) for name, value in _instance_attrs(obj).items() if name not in known}
+
+    def geometry(self, obj):
+        """Appends the Rectangles and Labels of obj to the packed arrays.
+        Returns the number of entries."""
+        keys = {id(rect): key for key, rect in obj.rects.items()}
+        for phy_obj in obj.phys_objs:
+            if isinstance(phy_obj, Rectangle):
+                key = keys.get(id(phy_obj), phy_obj.center if isinstance(obj, PHYPortPin) else phy_obj.centroid)
+                flags = 0
+                if isinstance(key, tuple):
+                    flags |= _KEY_IS_TUPLE
+                else:
+                    key = (key, 0.0)
+                self.rects.append((self.string(phy_obj.layer), self.purpose(phy_obj.purpose),
+                                   self.string(phy_obj.orientation), self.dbu(phy_obj), key, flags))
+                self.kinds.append(_RECT)
+            elif isinstance(phy_obj, Label):
+                self.labels.append((self.string(phy_obj.text), self.string(phy_obj.layer),
+                                    self.purpose(phy_obj.purpose), phy_obj.show, self.dbu(phy_obj)))
+                self.kinds.append(_LABEL)
+            else:
+                raise TypeError(f"Cannot snapshot child object of type {type(phy_obj).__name__}.")
+        return len(obj.phys_objs)
+
+    def dbu(self, phy_obj):
+        """Returns the coordinates of a Rectangle or Label in DBU of the
+        design grid."""
+        if phy_obj.grid == self.grid:
+            return phy_obj.dbu
+        return [self.grid.to_dbu(value) for value in phy_obj.coords]
+
+    def encode_object(self, obj):
+        """Returns the object table entry of obj: the row number of a
+        PHYPortPin in the packed pin array, or a record of any other
+        object."""
+        if isinstance(obj, PHYPortPin):
+            row = len(self.ports)
+            numbers, flags = _pack_numbers([getattr(obj, name, None) for name in _port_numbers])
+            self.ports.append((self.string(_class_ref(type(obj))),
+                               [self.string(getattr(obj, name)) for name in _pin_strings],
+                               self.pin_dict(obj.pin_dict), self.geometry(obj), numbers[:-1], numbers[-1], flags))
+            extras = {name: self.encode(value) for name, value in _instance_attrs(obj).items()
+                      if name not in _port_attrs and not (name in _port_defaults and value == _port_defaults[name])}
+            if extras:
+                self.port_extras[row] = extras
+            return row
+        record = {'c': self.string(_class_ref(type(obj)))}
+        if isinstance(obj, PHYBusPin):
+            record['s'] = [self.string(getattr(obj, name)) for name in _pin_strings]
+            record['v'] = [getattr(obj, name) for name in _bus_numbers]
+            record['d'] = self.pin_dict(obj.pin_dict)
+            record['pl'] = [list(offset) for offset in obj._offsets]
+            record['sf'] = list(obj._scale_factors)
+            record['b'] = None if obj._bits is None else [self.object(bit) for bit in obj._bits]
+            known = _bus_attrs
+        else:
+            record['s'] = [self.string(obj.name)]
+            record['n'] = self.geometry(obj)
+            known = _object_attrs
+        record['x'] = self.extras(obj, known)
+        return record
+
+    def encode_design(self, design):
+        self.grid = design.grid
+        # Pin dictionaries shared between the VerilogModule and the pins are
+        # stored once.
+        for pin_dict in getattr(design, 'verilog_pin_dict', {}).values():
+            self.pin_dict(pin_dict)
+        attrs = {name: value for name, value in vars(design).items() if name not in _skipped_design_attrs}
+        self.find_shared(list(attrs.values()), {})
+        attrs = {name: self.encode(value) for name, value in attrs.items()}
+        # Objects are encoded in table order, which is also the order of
+        # their geometry in the packed arrays. Encoding may register more.
+        idx = 0
+        while idx < len(self.registered):
+            self.objects[idx] = self.encode_object(self.registered[idx])
+            idx += 1
+        pin_dicts = [self.encode(dict(pin_dict)) for pin_dict in self.pin_dicts]
+        return {'c': _class_ref(type(design)), 'a': attrs, 'strings': self.strings,
+                'purposes': self.purposes, 'pin_dicts': pin_dicts, 'objects': self.objects,
+                'port_extras': self.port_extras,
+                'counts': [len(self.ports), len(self.rects), len(self.labels), len(self.kinds)]}
+
+    def arrays(self):
+        ports = np.empty(len(self.ports), dtype=_port_dtype)
+        for idx, port in enumerate(self.ports):
+            ports[idx] = port
+        rects = np.empty(len(self.rects), dtype=_rect_dtype)
+        for idx, rect in enumerate(self.rects):
+            rects[idx] = rect
+        labels = np.empty(len(self.labels), dtype=_label_dtype)
+        for idx, label in enumerate(self.labels):
+            labels[idx] = label
+        return ports, rects, labels, np.asarray(self.kinds, dtype='u1')
+
+
+def snapshot_design(design):
+    """Serializes a placed PHYDesign (or subclass, e.g. BBoxPHY) into a
+    compact, versioned binary snapshot.
+
+    Geometry is stored as packed numeric arrays, and the strings used by
+    pins, rectangles and labels (names, layers, sides, directions) are
+    stored once in an interned string table. The pin placer and the raw
+    tech file contents are not included.
+
+    Parameters
+    ----------
+    design : PHYDesign
+
+    Returns
+    -------
+    bytes
+
+    Raises
+    ------
+    TypeError
+        If the design holds a value the snapshot format cannot represent.
+
+    """
+    writer = _Writer()
+    meta = json.dumps(writer.encode_design(design), separators=(',', ':')).encode()
+    arrays = writer.arrays()
+    return b''.join([_MAGIC, _header.pack(SNAPSHOT_VERSION, len(meta)), meta] + [array.tobytes() for array in arrays])
+
+
+class _Reader:
+    """Rebuilds a design from the decoded snapshot metadata and arrays."""
+
+    def __init__(self, meta, ports, rects, labels, kinds):
+        self.strings = meta['strings']
+        self.port_rows = _rows(ports)
+        self.port_extras = meta['port_extras']
+        self.objects = []
+        for entry in meta['objects']:
+            cls = _load_class(self.strings[self.port_rows[entry][0] if isinstance(entry, int) else entry['c']])
+            self.objects.append(cls.__new__(cls))
+        self.pin_dicts = [self.decode(pin_dict) for pin_dict in meta['pin_dicts']]
+        self.purposes = [self.decode(purpose) for purpose in meta['purposes']]
+        self.shared = {}
+        self.rect_rows = _rows(rects)
+        self.label_rows = _rows(labels)
+        self.kinds = kinds.tolist()
+        self.rect_pos = self.label_pos = self.kind_pos = 0
+        # Set to the grid of the design before its objects are filled in
+        self.grid = None
+
+    def string(self, idx):
+        return None if idx == _NONE else self.strings[idx]
+
+    def decode(self, value):
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if '__o' in value:
+            return self.objects[value['__o']]
+        if '__p' in value:
+            return self.pin_dicts[value['__p']]
+        if '__t' in value:
+            return tuple(self.decode(item) for item in value['__t'])
+        if '__r' in value:
+            return self.shared[value['__r']]
+        if '__k' in value:
+            # Register the container before filling it, so that references
+            # to it from inside resolve to the same object.
+            encoded = value['v']
+            container = self.shared[value['__k']] = [] if isinstance(encoded, list) else {}
+            if isinstance(encoded, list):
+                container.extend(self.decode(item) for item in encoded)
+            else:
+                container.update(self.decode(encoded))
+            return container
+        if '__d' in value:
+            return {self.decode(key): self.decode(item) for key, item in value['__d']}
+        return {key: self.decode(item) for key, item in value.items()}
+
+    def geometry(self, obj, n_entries):
+        phys_objs = []
+        rects = {}
+        labels = []
+        for kind in self.kinds[self.kind_pos:self.kind_pos + n_entries]:
+            if kind == _RECT:
+                layer, purpose, orientation, dbu, key, flags = self.rect_rows[self.rect_pos]
+                self.rect_pos += 1
+                rect = Rectangle.__new__(Rectangle)
+                rect._store = rect._index = None
+                rect.grid = self.grid
+                rect.layer = self.string(layer)
+                rect.dbu = dbu
+                rect.purpose = self.purposes[purpose]
+                rect.orientation = self.string(orientation)
+                phys_objs.append(rect)
+                rects[tuple(key) if flags & _KEY_IS_TUPLE else key[0]] = rect
+            else:
+                text, layer, purpose, show, dbu = self.label_rows[self.label_pos]
+                self.label_pos += 1
+                label = Label.__new__(Label)
+                label.grid = self.grid
+                label.text = self.string(text)
+                label.purpose = self.purposes[purpose]
+                label.layer = self.string(layer)
+                label.dbu = dbu
+                label.show = bool(show)
+                phys_objs.append(label)
+                labels.append(label)
+        self.kind_pos += n_entries
+        obj.phys_objs = phys_objs
+        obj.rects = rects
+        return labels
+
+    def fill_object(self, obj, record):
+        attrs = {}
+        if isinstance(record, int):
+            _, strings, pin_dict, n_entries, numbers, bus_idx, flags = self.port_rows[record]
+            attrs.update(zip(_pin_strings, map(self.string, strings)))
+            attrs.update(zip(_port_numbers, _unpack_numbers(numbers + [bus_idx], flags)))
+            if attrs['bus_idx'] is None:
+                del attrs['bus_idx']
+            attrs['pin_dict'] = self.pin_dicts[pin_dict]
+            attrs['purpose'] = None
+            attrs['block_structure'] = {}
+            attrs['labels'] = self.geometry(obj, n_entries)
+            extras = self.port_extras.get(str(record), {})
+            attrs.update((name, self.decode(value)) for name, value in extras.items())
+        elif isinstance(obj, PHYBusPin):
+            attrs.update(zip(_pin_strings, map(self.string, record['s'])))
+            attrs.update(zip(_bus_numbers, record['v']))
+            attrs['pin_dict'] = self.pin_dicts[record['d']]
+            attrs['_offsets'] = [tuple(offset) for offset in record['pl']]
+            attrs['_scale_factors'] = record['sf']
+            attrs['_bits'] = None if record['b'] is None else [self.objects[idx] for idx in record['b']]
+        else:
+            attrs['name'] = self.string(record['s'][0])
+            self.geometry(obj, record['n'])
+        if not isinstance(record, int):
+            attrs.update((name, self.decode(value)) for name, value in record['x'].items())
+        # Spatial indexes are not stored; the design rebuilds its index.
+        # Objects take the grid of the design.
+        attrs['spatial_index'] = None
+        attrs['grid'] = self.grid
+        for name, value in attrs.items():
+            setattr(obj, name, value)
+
+
+def load_snapshot(data):
+    """Rebuilds a PHYDesign from a snapshot made by snapshot_design.
+
+    The design is restored without re-reading the tech file or re-running
+    pin placement. It can be passed straight to the LEF and GDS builders.
+
+    Parameters
+    ----------
+    data : bytes, bytearray, memoryview
+
+    Returns
+    -------
+    PHYDesign
+        Design of the class that was snapshotted.
+
+    Raises
+    ------
+    SnapshotError
+        If data is not a snapshot, or was written by another snapshot
+        version.
+
+    """
+    data = memoryview(data)
+    if bytes(data[:len(_MAGIC)]) != _MAGIC:
+        raise SnapshotError("Data is not a PHYDesign snapshot.")
+    pos = len(_MAGIC)
+    version, meta_len = _header.unpack_from(data, pos)
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Snapshot version {version} is not supported (expected {SNAPSHOT_VERSION}).")
+    pos += _header.size
+    meta = json.loads(bytes(data[pos:pos + meta_len]))
+    pos += meta_len
+    n_ports, n_rects, n_labels, n_kinds = meta['counts']
+    ports = np.frombuffer(data, dtype=_port_dtype, count=n_ports, offset=pos)
+    pos += ports.nbytes
+    rects = np.frombuffer(data, dtype=_rect_dtype, count=n_rects, offset=pos)
+    pos += rects.nbytes
+    labels = np.frombuffer(data, dtype=_label_dtype, count=n_labels, offset=pos)
+    pos += labels.nbytes
+    kinds = np.frombuffer(data, dtype='u1', count=n_kinds, offset=pos)
+
+    reader = _Reader(meta, ports, rects, labels, kinds)
+    cls = _load_class(meta['c'])
+    design = cls.__new__(cls)
+    # Design attributes are decoded in the order they were encoded, before
+    # the objects they refer to are filled in.
+    vars(design).update((name, reader.decode(value)) for name, value in meta['a'].items())
+    reader.grid = design.grid
+    for obj, record in zip(reader.objects, meta['objects']):
+        reader.fill_object(obj, record)
+    return design
+
+
+def write_snapshot(design, filename):
+    """Writes snapshot_design(design) to filename."""
+    with open(filename, 'wb') as file:
+        file.write(snapshot_design(design))
+
+
+def read_snapshot(filename):
+    """Loads a design from a snapshot file written by write_snapshot."""
+    with open(filename, 'rb') as file:
+        return load_snapshot(file.read())
@@ -1,6 +1,8 @@
 from phyrilog.verilog_pin_extract import VerilogModule
 from phyrilog.verilog2phy import *
 from phyrilog.utilities import *
+from phyrilog.dbu import DBUGrid
+from phyrilog.spatial_index import IntervalIndex, SpatialIndex
 import numpy as np
 import enum
 
@@ -70,8 +72,15 @@ class PinPlacer:
         locations defined. This list is populated either by predefining
         the pin locations in the pin_specs, or when a free pin is placed
         by the pin placer.
+    grid : DBUGrid
+        Database-unit grid all coordinates are snapped to. Placement is
+        computed in integer DBU of the grid, and the pins are created on
+        it.
     sig_figs : int
         Decimal significant figure precision of all coordinates.
+    spatial_index : SpatialIndex
+        Index of the pin shapes placed so far, by layer. Items are the
+        PHYPortPin and PHYBusPin objects owning the shapes.
     """
 
     def __init__(self, pins_dict, pg_pins_dict, techfile,
@@ -111,7 +120,9 @@ class PinPlacer:
         self.specs = r_update(self.specs, options_dict)
         self._extract_techfile(techfile)
         self.pins = []
-        self.sig_figs = int(np.log10(self.specs['units']) - np.log10(self.specs['precision']))
+        self.grid = DBUGrid(self.specs['units'], self.specs['precision'])
+        self.sig_figs = self.grid.decimals
+        self.spatial_index = SpatialIndex()
         self.autodefined = False
         self.pg_pins = {}
         self.dist_pin_spacing = {'left': 0,
@@ -219,13 +230,19 @@ class PinPlacer:
                 layer = self.specs['pins'][pin['name']].get('layer', layer)
                 center = self.specs['pins'][pin['name']].get('center', None)
             if 'is_bus' in pin.keys():
-                for bus_idx in range(pin['bus_max'] + 1):
-                    pin_obj = PHYPortPin(pin, layer, side, x_width, y_width, bus_idx=bus_idx)
-                    pin_obj.name = pin['name'] + '[' + str(bus_idx) + ']'
-                    self.pin_sides_dict[side].append(pin_obj)
-                    self.pins.append(pin_obj)
+                bus_obj = PHYBusPin(pin, layer, side, x_width, y_width, self.grid)
+                bit_names = [bus_obj.bit_name(bus_idx) for bus_idx in bus_obj.bus_indices]
+                if any(bit_name in pin_specs.keys() for bit_name in bit_names):
+                    # Bits with their own specs are placed individually
+                    for bus_idx in bus_obj.bus_indices:
+                        pin_obj = PHYPortPin(pin, layer, side, x_width, y_width, bus_idx=bus_idx, grid=self.grid)
+                        self.pin_sides_dict[side].append(pin_obj)
+                        self.pins.append(pin_obj)
+                else:
+                    self.pin_sides_dict[side].append(bus_obj)
+                    self.pins.append(bus_obj)
             else:
-                pin_obj = PHYPortPin(pin, layer, side, x_width, y_width, center=center)
+                pin_obj = PHYPortPin(pin, layer, side, x_width, y_width, center=center, grid=self.grid)
                 self.pin_sides_dict[side].append(pin_obj)
                 self.pins.append(pin_obj)
         if self.specs['pg_pins']['pg_pin_placement'] == pg_pin_placement_options[0]:
@@ -248,13 +265,14 @@ class PinPlacer:
                 if 'multiplier' in self.specs['pg_pins'].keys():
                     for idx in range(pg_pin['multiplier'] + 1):
                         spacing = 2 * self.metals[layer]['min_width'] + 2 * self.metals[layer]['pitch']
-                        new_cent = center + round(idx * spacing, self.sig_figs)
-                        pin_obj = PHYPortPin(pg_pin_dict, layer, side, x_width, y_width, center=new_cent)
+                        new_cent = center + self.grid.snap(idx * spacing)
+                        pin_obj = PHYPortPin(pg_pin_dict, layer, side, x_width, y_width, center=new_cent,
+                                             grid=self.grid)
                         self.pin_sides_dict[side].append(pin_obj)
                         # self.pins.append(pin_obj)
                         self.pg_pins.append(pin_obj)
                 else:
-                    pin_obj = PHYPortPin(pg_pin_dict, layer, side, x_width, y_width, center=center)
+                    pin_obj = PHYPortPin(pg_pin_dict, layer, side, x_width, y_width, center=center, grid=self.grid)
                     self.pin_sides_dict[side].append(pin_obj)
                     # self.pins.append(pin_obj)
                     if purpose == 'power':
@@ -263,16 +281,21 @@ class PinPlacer:
                         self.pg_pins['gnd'] = pin_obj
         self.h_pin_spacing = self.h_pin_pitch - self.h_pin_width
         self.v_pin_spacing = self.v_pin_pitch - self.v_pin_width
-        self.min_h_pins = round(max(len(self.pin_sides_dict['left']), len(self.pin_sides_dict['right'])), self.sig_figs)
-        self.min_v_pins = round(max(len(self.pin_sides_dict['top']), len(self.pin_sides_dict['bottom'])), self.sig_figs)
-        self.min_y_dim = round(max(sum([pin.y_width for pin in self.pin_sides_dict['left']]) +
-                                   (self.min_h_pins - 1) * self.h_pin_spacing,
-                                   sum([pin.y_width for pin in self.pin_sides_dict['right']]) + (
-                                           (self.min_h_pins - 1) * self.h_pin_spacing)), self.sig_figs)
-        self.min_x_dim = round(max(sum([pin.x_width for pin in self.pin_sides_dict['top']]) +
-                                   (self.min_v_pins - 1) * (self.v_pin_spacing),
-                                   sum([pin.x_width for pin in self.pin_sides_dict['bottom']]) + (
-                                           (self.min_v_pins - 1) * self.v_pin_pitch)), self.sig_figs)
+        self.min_h_pins = max(n_bits(self.pin_sides_dict['left']), n_bits(self.pin_sides_dict['right']))
+        self.min_v_pins = max(n_bits(self.pin_sides_dict['top']), n_bits(self.pin_sides_dict['bottom']))
+        to_dbu = self.grid.to_dbu
+
+        def side_dbu(side, attr):
+            return sum(to_dbu(getattr(pin, attr)) * pin.n_bits for pin in self.pin_sides_dict[side])
+
+        self.min_y_dim = self.grid.to_units(max(side_dbu('left', 'y_width') +
+                                                (self.min_h_pins - 1) * to_dbu(self.h_pin_spacing),
+                                                side_dbu('right', 'y_width') +
+                                                (self.min_h_pins - 1) * to_dbu(self.h_pin_spacing)))
+        self.min_x_dim = self.grid.to_units(max(side_dbu('top', 'x_width') +
+                                                (self.min_v_pins - 1) * to_dbu(self.v_pin_spacing),
+                                                side_dbu('bottom', 'x_width') +
+                                                (self.min_v_pins - 1) * to_dbu(self.v_pin_pitch)))
         self.max_b_pin_length = max_none([pin.y_width for pin in self.pin_sides_dict['bottom']])
         self.max_l_pin_length = max_none([pin.x_width for pin in self.pin_sides_dict['left']])
         self.max_r_pin_length = max_none([pin.x_width for pin in self.pin_sides_dict['right']])
@@ -290,10 +313,10 @@ class PinPlacer:
         """
         pin_specs = self.specs['pins']
         self.autodefined = True
-        self.specs['internal_box'] = [round(self.max_l_pin_length, self.sig_figs),
-                                      round(self.max_b_pin_length, self.sig_figs),
-                                      round(self.min_x_dim + self.max_l_pin_length, self.sig_figs),
-                                      round(self.min_y_dim + self.max_b_pin_length, self.sig_figs)]
+        self.specs['internal_box'] = [self.grid.snap(self.max_l_pin_length),
+                                      self.grid.snap(self.max_b_pin_length),
+                                      self.grid.add(self.min_x_dim, self.max_l_pin_length),
+                                      self.grid.add(self.min_y_dim, self.max_b_pin_length)]
         self.specs['design_boundary'] = [
             self.min_x_dim + self.max_l_pin_length + self.max_r_pin_length,
             self.min_y_dim + self.max_t_pin_length + self.max_b_pin_length]
@@ -301,23 +324,23 @@ class PinPlacer:
         if self.specs.get('aspect_ratio', None):
             dom_dim_idx = self.specs['design_boundary'].index(max(self.specs['design_boundary']))
             sub_dim_idx = self.specs['design_boundary'].index(min(self.specs['design_boundary']))
-            sub_dim = round(self.specs['design_boundary'][dom_dim_idx] / self.specs['aspect_ratio'][dom_dim_idx] *
-                            self.specs['aspect_ratio'][sub_dim_idx], self.sig_figs)
-            self.specs['design_boundary'][sub_dim_idx] = round(sub_dim, self.sig_figs)
+            sub_dim = self.grid.snap(self.specs['design_boundary'][dom_dim_idx] / self.specs['aspect_ratio'][dom_dim_idx] *
+                                     self.specs['aspect_ratio'][sub_dim_idx])
+            self.specs['design_boundary'][sub_dim_idx] = self.grid.snap(sub_dim)
             box_sides = [self.specs['internal_box'][2] - self.specs['internal_box'][0],
                          self.specs['internal_box'][3] - self.specs['internal_box'][1]]
             dom_dim_idx = box_sides.index(max(box_sides))
             sub_dim_idx = box_sides.index(min(box_sides))
-            sub_dim = round(box_sides[dom_dim_idx] / self.specs['aspect_ratio'][dom_dim_idx] *
-                            self.specs['aspect_ratio'][sub_dim_idx], self.sig_figs)
+            sub_dim = self.grid.snap(box_sides[dom_dim_idx] / self.specs['aspect_ratio'][dom_dim_idx] *
+                                     self.specs['aspect_ratio'][sub_dim_idx])
             box_sides[sub_dim_idx] = sub_dim
-            self.specs['internal_box'][2 + sub_dim_idx] = round(self.specs['internal_box'][0 + sub_dim_idx] + sub_dim,
-                                                                self.sig_figs)
+            self.specs['internal_box'][2 + sub_dim_idx] = self.grid.add(self.specs['internal_box'][0 + sub_dim_idx],
+                                                                        sub_dim)
         if self.specs['pin_margin']:
             margins = np.asarray([0, 0, self.v_pin_pitch, self.h_pin_pitch])
             self.specs['design_boundary'] = [
-                round(self.min_x_dim + self.max_l_pin_length + self.max_r_pin_length + 2 * self.v_pin_pitch, self.sig_figs),
-                round(self.min_y_dim + self.max_t_pin_length + self.max_b_pin_length + 2 * self.h_pin_pitch, self.sig_figs)]
+                self.grid.add(self.min_x_dim, self.max_l_pin_length, self.max_r_pin_length, 2 * self.v_pin_pitch),
+                self.grid.add(self.min_y_dim, self.max_t_pin_length, self.max_b_pin_length, 2 * self.h_pin_pitch)]
             inner_box = np.asarray(self.specs['internal_box']) + margins
             self.specs['internal_box'] = inner_box.tolist()
         self.specs['design_boundary'] = [self.specs['internal_box'][2] + self.max_r_pin_length,
@@ -338,6 +361,8 @@ class PinPlacer:
         pin_specs = self.specs['pins']
         for side_name, side in self.pin_sides_dict.items():
             for pin in side:
+                if isinstance(pin, PHYBusPin):
+                    continue
                 if pin.name in pin_specs.keys():
                     x_pos = pin_specs[pin.name].get('x_pos', None)
                     y_pos = pin_specs[pin.name].get('y_pos', None)
@@ -347,25 +372,28 @@ class PinPlacer:
                         if side_name in ['left', 'right']:
                             layer = pin_specs['h_layer']
                             layer = pin_specs[pin.name].get('layer', layer)
-                            x_width = round(pin_specs[pin.name].get('x_width', pin_specs['pin_length']), self.sig_figs)
-                            y_width = round(pin_specs[pin.name].get('y_width', self.h_pin_width), self.sig_figs)
-                            left_x = 0 if side_name == 'left' else round(self.specs['design_boundary'][0] - x_width, self.sig_figs)
-                            right_x = x_width if side_name == 'left' else round(self.specs['design_boundary'][0], self.sig_figs)
-                            top_y = round(center + y_width / 2, self.sig_figs)
-                            bot_y = round(center - y_width / 2, self.sig_figs)
+                            x_width = self.grid.snap(pin_specs[pin.name].get('x_width', pin_specs['pin_length']))
+                            y_width = self.grid.snap(pin_specs[pin.name].get('y_width', self.h_pin_width))
+                            left_x = 0 if side_name == 'left' else self.grid.add(self.specs['design_boundary'][0],
+                                                                                 -x_width)
+                            bot_y = self._lower_edge(center, y_width)
                         else:
                             layer = pin_specs['v_layer']
                             layer = pin_specs[pin.name].get('layer', layer)
-                            x_width = round(pin_specs[pin.name].get('x_width', pin_specs['pin_length']), self.sig_figs)
-                            y_width = round(pin_specs[pin.name].get('y_width', self.h_pin_width), self.sig_figs)
-                            left_x = round(center - x_width / 2, self.sig_figs)
-                            right_x = round(center + x_width / 2, self.sig_figs)
-                            bot_y = 0 if side_name == 'bottom' else round(self.specs['design_boundary'][1] - y_width, self.sig_figs)
-                            top_y = y_width if side_name == 'bottom' else round(self.specs['design_boundary'][1], self.sig_figs)
-                        pin.add_rect(layer, left_x=left_x, bot_y=bot_y)
+                            x_width = self.grid.snap(pin_specs[pin.name].get('x_width', pin_specs['pin_length']))
+                            y_width = self.grid.snap(pin_specs[pin.name].get('y_width', self.h_pin_width))
+                            left_x = self._lower_edge(center, x_width)
+                            bot_y = 0 if side_name == 'bottom' else self.grid.add(self.specs['design_boundary'][1],
+                                                                                  -y_width)
+                        self._add_pin_shape(pin, layer, left_x, bot_y)
                         self.placed_pin_sides_dict[side_name].append(pin)
                         side.pop(side.index(pin))
 
+    def _lower_edge(self, center, width):
+        """Returns the lower edge of a shape of width centered on center,
+        on the grid."""
+        return self.grid.to_units(round(self.grid.to_dbu(center) - self.grid.to_dbu(width) / 2))
+
     def _make_subpartitions(self):
         """
         Coordinate subpartitioning of each side of design.
@@ -385,10 +413,10 @@ class PinPlacer:
                            'right': [],
                            'top': [],
                            'bottom': []}
-        h_pin_margin = round(self.specs.get('pin_margin', False) *
-                             self.metals[self.specs['pins']['h_layer']]['pitch'] * 0.5, self.sig_figs)
-        v_pin_margin = round(self.specs.get('pin_margin', False) *
-                             self.metals[self.specs['pins']['v_layer']]['pitch'] * 0.5, self.sig_figs)
+        h_pin_margin = self.grid.snap(self.specs.get('pin_margin', False) *
+                                      self.metals[self.specs['pins']['h_layer']]['pitch'] * 0.5)
+        v_pin_margin = self.grid.snap(self.specs.get('pin_margin', False) *
+                                      self.metals[self.specs['pins']['v_layer']]['pitch'] * 0.5)
         bounds = {'left': [self.specs['internal_box'][1] + h_pin_margin, self.specs['internal_box'][3] - h_pin_margin],
                   'right': [self.specs['internal_box'][1] + h_pin_margin, self.specs['internal_box'][3] - h_pin_margin],
                   'top': [self.specs['internal_box'][0] + v_pin_margin, self.specs['internal_box'][2] - v_pin_margin],
@@ -396,12 +424,11 @@ class PinPlacer:
                              self.specs['internal_box'][2] - v_pin_margin]}
         for side in self.partitions.keys():
             self.partitions[side] += self._subpartition_side([bounds[side]], self.placed_pin_sides_dict[side])
-        for side, pin_space in self.dist_pin_spacing.items():
-            pin_space = 0
-            for partition in self.partitions[side]:
-                pin_space += round(partition[1] - partition[0], self.sig_figs)
+        to_dbu = self.grid.to_dbu
+        for side in self.dist_pin_spacing:
+            pin_space = sum(to_dbu(partition[1]) - to_dbu(partition[0]) for partition in self.partitions[side])
             if self.pin_sides_dict[side]:
-                self.dist_pin_spacing[side] = round(pin_space / len(self.pin_sides_dict[side]), self.sig_figs)
+                self.dist_pin_spacing[side] = self.grid.to_units(round(pin_space / n_bits(self.pin_sides_dict[side])))
 
     def _subpartition_interval(self, bounds, rect):
         """Subpartitions a given interval with the given placed pin.
@@ -419,16 +446,15 @@ class PinPlacer:
         """
         center = rect.center
         layer = rect.layer
-        pin_dimensions = rect.coords
         if btwn(center, bounds):
+            grid = self.grid
             pitch = self.metals[layer]['pitch']
+            pitch_dbu = grid.to_dbu(pitch)
+            dbu = rect.dbu
             direction = self.metals[layer]['direction']
-            if direction == 'horizontal':
-                lower_interval = [round(bounds[0], self.sig_figs), round(pin_dimensions[3] - pitch, self.sig_figs)]
-                upper_interval = [round(pin_dimensions[1] + pitch, self.sig_figs), round(bounds[1], self.sig_figs)]
-            else:
-                lower_interval = [round(bounds[0], self.sig_figs), round(pin_dimensions[2] - pitch, self.sig_figs)]
-                upper_interval = [round(pin_dimensions[0] + pitch, self.sig_figs), round(bounds[1], self.sig_figs)]
+            lower_idx, upper_idx = (1, 3) if direction == 'horizontal' else (0, 2)
+            lower_interval = [grid.snap(bounds[0]), grid.to_units(dbu[upper_idx] - pitch_dbu)]
+            upper_interval = [grid.to_units(dbu[lower_idx] + pitch_dbu), grid.snap(bounds[1])]
             partitions = [lower_interval, upper_interval]
         else:
             partitions = [bounds]
@@ -436,7 +462,9 @@ class PinPlacer:
 
     def _subpartition_side(self, side_bounds, placed_pins):
         """
-        Iterates subpartitioning method over all pins on a side.
+        Iterates subpartitioning method over all pins on a side. The
+        partitions are kept in an IntervalIndex, so each pin shape is only
+        checked against the partitions containing its center.
         Parameters
         ----------
         side_bounds : list[lower_bound, upper_bound]
@@ -449,15 +477,16 @@ class PinPlacer:
         partitions : list
             List of new partitions.
         """
-        partitions = side_bounds
+        partitions = IntervalIndex()
+        for bounds in side_bounds:
+            partitions.insert(bounds[0], bounds[1], bounds)
         for pin_obj in placed_pins:
             for rect in pin_obj.rects.values():
-                center = rect.center
-                for partition in partitions:
-                    if btwn(center, partition):
-                        new_part = self._subpartition_interval(partition, rect)
-                        partitions = replace(partitions, new_part, partitions.index(partition))
-        return partitions
+                for partition in partitions.containing(rect.center):
+                    partitions.remove(partition[0], partition[1], partition)
+                    for new_part in self._subpartition_interval(partition, rect):
+                        partitions.insert(new_part[0], new_part[1], new_part)
+        return partitions.items()
 
     def place_interlaced_pg_pins(self, layer, interlace_interval, side_bounds):
         """
@@ -482,33 +511,39 @@ class PinPlacer:
         pitch = self.metals[layer]['pitch']
         horizontal = self.metals[layer]['direction'] == 'horizontal'
         sides = ['left', 'right'] if horizontal else ['top', 'bottom']
-        pin_window = round(pitch, self.sig_figs)
+        pin_window = self.grid.snap(pitch)
         side_length = side_bounds[1] - side_bounds[0]
         a = 2 * pg_pin_specs.get('strap_width', width)
         b = pg_pin_specs.get('strap_spacing', pitch)
         strap_width = pg_pin_specs.get('strap_width', width)
-        strap_spacing = pg_pin_specs.get('strap_spacing', round(pitch - strap_width / 2, self.sig_figs))
-        interlace_size = round(2 * strap_width + strap_spacing, self.sig_figs)
-        interlace_chunk = round(pin_window * interlace_interval + interlace_size + (pitch - width / 2), self.sig_figs)
+        strap_spacing = pg_pin_specs.get('strap_spacing', self.grid.snap(pitch - strap_width / 2))
+        interlace_size = self.grid.snap(2 * strap_width + strap_spacing)
+        interlace_chunk = self.grid.snap(pin_window * interlace_interval + interlace_size + (pitch - width / 2))
         if horizontal:
             n_interlaces = int(np.floor(self.min_h_pins / interlace_interval))
         else:
             n_interlaces = int(np.floor(self.min_v_pins / interlace_interval))
         if self.specs['pin_spacing'] == 'distributed':
-            n_pins = max([len(self.pin_sides_dict[sides[0]]), len(self.pin_sides_dict[sides[1]])])
+            n_pins = max([n_bits(self.pin_sides_dict[sides[0]]), n_bits(self.pin_sides_dict[sides[1]])])
             interlace_region = n_interlaces * interlace_size
             pin_region = (side_length - interlace_region) / n_pins
             if pin_region > (pitch):
                 for side in sides:
                     if horizontal:
-                        total_pin_width = sum(pin.y_width for pin in self.pin_sides_dict[side])
+                        total_pin_width = sum(pin.y_width * pin.n_bits for pin in self.pin_sides_dict[side])
                     else:
-                        total_pin_width = sum(pin.x_width for pin in self.pin_sides_dict[side])
-                    self.dist_pin_spacing[side] = round((side_length - total_pin_width) /
-                                                        (len(self.pin_sides_dict[side])), self.sig_figs) \
+                        total_pin_width = sum(pin.x_width * pin.n_bits for pin in self.pin_sides_dict[side])
+                    self.dist_pin_spacing[side] = self.grid.snap((side_length - total_pin_width) /
+                                                                 (n_bits(self.pin_sides_dict[side]))) \
                         if self.pin_sides_dict[side] else pitch
                 pin_window = min(self.dist_pin_spacing[sides[0]], self.dist_pin_spacing[sides[1]])
-        start = side_bounds[0] + self.specs['pin_margin'] * pitch * 0.5
+        # The straps are stepped along the side in DBU
+        to_dbu = self.grid.to_dbu
+        start = to_dbu(side_bounds[0] + self.specs['pin_margin'] * pitch * 0.5)
+        window = to_dbu(pin_window) * interlace_interval
+        strap_dbu = to_dbu(strap_width)
+        chunk = to_dbu(interlace_size) + (to_dbu(pitch) - to_dbu(width)) / 2
+        growth = self.grid.to_units(round(chunk))
         vdd_obj1, gnd_obj1, vdd_obj2, gnd_obj2 = self._get_pg_strap_objs(p_layer=layer)
         # self.power_pin = vdd_obj1
         # self.ground_pin = gnd_obj1
@@ -518,14 +553,15 @@ class PinPlacer:
         # for side in sides:
         #     self.placed_pin_sides_dict[side] += interlace_list
         for n in range(n_interlaces):
-            vdd_center = round(start + pin_window * interlace_interval + strap_width * 0.5, self.sig_figs)
-            start = round(start + pin_window * interlace_interval + interlace_size + (pitch - width) * 0.5, self.sig_figs)
+            vdd_center = self.grid.to_units(round(start + window + strap_dbu / 2))
+            start = round(start + window + chunk)
             if self.autodefined:
-                self.specs['internal_box'][2 + horizontal] += round(interlace_size + (pitch - width) * 0.5, self.sig_figs)
+                box_idx = 2 + horizontal
+                self.specs['internal_box'][box_idx] = self.grid.add(self.specs['internal_box'][box_idx], growth)
             if horizontal:
-                self.min_y_dim += round(interlace_size + (pitch - width) * 0.5, self.sig_figs)
+                self.min_y_dim = self.grid.add(self.min_y_dim, growth)
             else:
-                self.min_x_dim += round(interlace_size + (pitch - width) * 0.5, self.sig_figs)
+                self.min_x_dim = self.grid.add(self.min_x_dim, growth)
             self.draw_pg_strap(vdd_center, vdd_obj1, gnd_obj1, layer=layer, pair=True)
 
     def _get_pg_strap_objs(self, p_layer=None, g_layer=None):
@@ -569,20 +605,20 @@ class PinPlacer:
                                      'direction': 'inout',
                                      'is_analog': False}
         if self.metals[vdd_layer]['direction'] == 'horizontal':
-            vdd_xwidth = round(self.specs['design_boundary'][0], self.sig_figs)
-            vdd_ywidth = round(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']), self.sig_figs)
+            vdd_xwidth = self.grid.snap(self.specs['design_boundary'][0])
+            vdd_ywidth = self.grid.snap(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']))
             gnd_xwidth = vdd_xwidth
             gnd_ywidth = vdd_ywidth
         else:
-            vdd_ywidth = round(self.specs['design_boundary'][1], self.sig_figs)
-            vdd_xwidth = round(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']), self.sig_figs)
+            vdd_ywidth = self.grid.snap(self.specs['design_boundary'][1])
+            vdd_xwidth = self.grid.snap(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']))
             gnd_xwidth = vdd_xwidth
             gnd_ywidth = vdd_ywidth
         side = ['left', 'right'] if pg_pin_specs['strap_orientation'] == 'horizontal' else ['top', 'bottom']
-        vdd_obj1 = PHYPortPin(pg_pin_dicts['power_pin'], vdd_layer, side[0], vdd_xwidth, vdd_ywidth)
-        gnd_obj1 = PHYPortPin(pg_pin_dicts['ground_pin'], gnd_layer, side[0], gnd_xwidth, gnd_ywidth)
-        vdd_obj2 = PHYPortPin(pg_pin_dicts['power_pin'], vdd_layer, side[1], vdd_xwidth, vdd_ywidth)
-        gnd_obj2 = PHYPortPin(pg_pin_dicts['ground_pin'], gnd_layer, side[1], gnd_xwidth, gnd_ywidth)
+        vdd_obj1 = PHYPortPin(pg_pin_dicts['power_pin'], vdd_layer, side[0], vdd_xwidth, vdd_ywidth, grid=self.grid)
+        gnd_obj1 = PHYPortPin(pg_pin_dicts['ground_pin'], gnd_layer, side[0], gnd_xwidth, gnd_ywidth, grid=self.grid)
+        vdd_obj2 = PHYPortPin(pg_pin_dicts['power_pin'], vdd_layer, side[1], vdd_xwidth, vdd_ywidth, grid=self.grid)
+        gnd_obj2 = PHYPortPin(pg_pin_dicts['ground_pin'], gnd_layer, side[1], gnd_xwidth, gnd_ywidth, grid=self.grid)
         self.pg_pins['pwr'] = vdd_obj1
         self.pg_pins['gnd'] = gnd_obj1
         return vdd_obj1, gnd_obj1, vdd_obj2, gnd_obj2
@@ -614,57 +650,52 @@ class PinPlacer:
             pg_pin_dicts[purpose] = {'name': pin,
                                      'direction': 'inout',
                                      'is_analog': False}
+        grid = self.grid
         vdd_layer = layer if layer else pg_pin_specs['pwr_pin']['layer']
         if self.metals[vdd_layer]['direction'] == 'horizontal':
-            vdd_xwidth = round(self.specs['design_boundary'][0], self.sig_figs)
-            vdd_ywidth = round(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']), self.sig_figs)
-            vdd_pos = round(center - vdd_ywidth / 2, self.sig_figs)
-            if pair:
-                pitch = self.specs.get('strap_spacing', self.metals[vdd_layer]['pitch'])
-                gnd_xwidth = vdd_xwidth
-                gnd_ywidth = vdd_ywidth
-                gnd_pos = round(vdd_pos + pitch, self.sig_figs)
-                gnd_center = round(center + pitch, self.sig_figs)
+            vdd_xwidth = grid.snap(self.specs['design_boundary'][0])
+            vdd_ywidth = grid.snap(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']))
+            vdd_pos = self._lower_edge(center, vdd_ywidth)
         else:
-            vdd_ywidth = round(self.specs['design_boundary'][1], self.sig_figs)
-            vdd_xwidth = round(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']), self.sig_figs)
-            vdd_pos = round(center - vdd_xwidth / 2, self.sig_figs)
-            if pair:
-                pitch = self.specs.get('strap_spacing', self.metals[vdd_layer]['pitch'])
-                gnd_xwidth = vdd_xwidth
-                gnd_ywidth = vdd_ywidth
-                gnd_pos = round(vdd_pos + pitch, self.sig_figs)
-                gnd_center = round(center + pitch, self.sig_figs)
+            vdd_ywidth = grid.snap(self.specs['design_boundary'][1])
+            vdd_xwidth = grid.snap(pg_pin_specs.get('strap_width', self.metals[vdd_layer]['min_width']))
+            vdd_pos = self._lower_edge(center, vdd_xwidth)
+        if pair:
+            pitch = self.specs.get('strap_spacing', self.metals[vdd_layer]['pitch'])
+            gnd_xwidth = vdd_xwidth
+            gnd_ywidth = vdd_ywidth
+            gnd_pos = grid.add(vdd_pos, pitch)
+            gnd_center = grid.add(center, pitch)
         # if not pwr_obj:
         #     pwr_obj = PHYPortPin(pg_pin_dicts['pwr_pin'], vdd_layer, vdd_xwidth, vdd_ywidth, center=center)
         if not pair:
             gnd_layer = layer if layer else pg_pin_specs['gnd_pin']['layer']
             if self.metals[gnd_layer]['direction'] == 'horizontal':
-                gnd_xwidth = round(self.specs['design_boundary'][0], self.sig_figs)
-                gnd_ywidth = round(pg_pin_specs.get('strap_width', self.metals[gnd_layer]['min_width']), self.sig_figs)
-                gnd_pos = round(center - gnd_ywidth / 2, self.sig_figs)
+                gnd_xwidth = grid.snap(self.specs['design_boundary'][0])
+                gnd_ywidth = grid.snap(pg_pin_specs.get('strap_width', self.metals[gnd_layer]['min_width']))
             else:
-                gnd_ywidth = round(self.specs['design_boundary'][1], self.sig_figs)
-                gnd_xwidth = round(pg_pin_specs.get('strap_width', self.metals[gnd_layer]['min_width']), self.sig_figs)
-                gnd_pos = round(center - gnd_ywidth / 2, self.sig_figs)
+                gnd_ywidth = grid.snap(self.specs['design_boundary'][1])
+                gnd_xwidth = grid.snap(pg_pin_specs.get('strap_width', self.metals[gnd_layer]['min_width']))
+            gnd_pos = self._lower_edge(center, gnd_ywidth)
         # if not gnd_obj:
         #     gnd_obj = PHYPortPin(pg_pin_dicts['gnd_pin'], gnd_layer, gnd_xwidth, gnd_ywidth, center=center)
         pwr_obj.x_width = vdd_xwidth
         pwr_obj.y_width = vdd_ywidth
         gnd_obj.x_width = gnd_xwidth
         gnd_obj.y_width = gnd_ywidth
+        internal_box = [grid.to_dbu(value) for value in self.specs['internal_box']]
         if self.metals[vdd_layer]['direction'] == 'horizontal':
-            if vdd_pos + vdd_ywidth > self.specs['internal_box'][3] \
-                    or gnd_pos + gnd_ywidth > self.specs['internal_box'][3]:
+            if grid.to_dbu(vdd_pos) + grid.to_dbu(vdd_ywidth) > internal_box[3] \
+                    or grid.to_dbu(gnd_pos) + grid.to_dbu(gnd_ywidth) > internal_box[3]:
                 return [], []
-            pwr_obj.add_rect(vdd_layer, left_x=0, bot_y=vdd_pos)
-            gnd_obj.add_rect(vdd_layer, left_x=0, bot_y=gnd_pos)
+            self._add_pin_shape(pwr_obj, vdd_layer, 0, vdd_pos)
+            self._add_pin_shape(gnd_obj, vdd_layer, 0, gnd_pos)
         else:
-            if vdd_pos + vdd_xwidth > self.specs['internal_box'][2] \
-                    or gnd_pos + gnd_xwidth > self.specs['internal_box'][2]:
+            if grid.to_dbu(vdd_pos) + grid.to_dbu(vdd_xwidth) > internal_box[2] \
+                    or grid.to_dbu(gnd_pos) + grid.to_dbu(gnd_xwidth) > internal_box[2]:
                 return pwr_obj.rects[center].coords, gnd_obj.rects[gnd_center].coords
-            pwr_obj.add_rect(vdd_layer, left_x=vdd_pos, bot_y=0)
-            gnd_obj.add_rect(vdd_layer, left_x=gnd_pos, bot_y=0)
+            self._add_pin_shape(pwr_obj, vdd_layer, vdd_pos, 0)
+            self._add_pin_shape(gnd_obj, vdd_layer, gnd_pos, 0)
         return pwr_obj.rects[center].coords, gnd_obj.rects[gnd_center].coords
 
     def place_free_pins(self):
@@ -734,24 +765,25 @@ class PinPlacer:
         placed_pins : list
             List of placed pins.
         """
-        lower = interval[0]
-        # upper = interval[0]
+        # Pins are stepped along the interval in DBU; the width and pitch
+        # are only converted when the pin at the head of the list changes.
+        grid = self.grid
+        lower, upper = grid.to_dbu(interval[0]), grid.to_dbu(interval[1])
+        pin = None
         placed_pins = []
-        while lower < interval[1] and len(pin_list) > 0:
-            pin = pin_list.pop(0)
-            layer = pin.layer
-            width = pin.y_width if orientation == 'horizontal' else pin.x_width
-            pitch = self.metals[layer]['pitch']
-            lower_dim = round(lower, self.sig_figs)
-            upper_dim = round(lower + width, self.sig_figs)
-            if upper_dim > interval[1]:
+        while lower < upper and len(pin_list) > 0:
+            if pin is not pin_list[0]:
+                pin = pin_list[0]
+                layer = pin.layer
+                width = grid.to_dbu(pin.y_width if orientation == 'horizontal' else pin.x_width)
+                pitch = self.metals[layer]['pitch']
+                pitch_dbu = grid.to_dbu(pitch)
+            if lower + width > upper:
                 return pin_list, placed_pins
-            if orientation == 'horizontal':
-                pin.add_rect(layer, left_x=ref_edge, bot_y=lower_dim)
-            else:
-                pin.add_rect(layer, left_x=lower_dim, bot_y=ref_edge)
-            lower = round(lower_dim + pitch, self.sig_figs)
-            placed_pins.append(pin)
+            placed_pin = self._place_next_pin(pin_list, layer, orientation, ref_edge, grid.to_units(lower))
+            if placed_pin is not None:
+                placed_pins.append(placed_pin)
+            lower += pitch_dbu
         return pin_list, placed_pins
 
     def _distributed_place_engine(self, interval, orientation, ref_edge, pin_list, side):
@@ -770,7 +802,6 @@ class PinPlacer:
         -------
 
         """
-        interval_size = interval[1] - interval[0]
         spacing = self.dist_pin_spacing[side]
         if len(pin_list) == 0:
             return [], pin_list
@@ -780,19 +811,80 @@ class PinPlacer:
             placed_pins = []
             layer = pin_list[0].layer
             width = pin_list[0].y_width if orientation == 'horizontal' else pin_list[0].x_width
-            n_pins = int(np.floor(interval_size / (width + spacing)))
-            leftover = round(interval_size - n_pins * (width + spacing), self.sig_figs)
-            start = round(leftover / 2 + interval[0], self.sig_figs)
+            grid = self.grid
+            lower, upper = grid.to_dbu(interval[0]), grid.to_dbu(interval[1])
+            step = grid.to_dbu(width) + grid.to_dbu(spacing)
+            n_pins = (upper - lower) // step
+            start = round(lower + (upper - lower - n_pins * step) / 2)
             for n in range(n_pins):
-                pin = pin_list.pop(0)
-                if orientation == 'horizontal':
-                    pin.add_rect(layer, left_x=ref_edge, bot_y=start)
-                else:
-                    pin.add_rect(layer, left_x=start, bot_y=ref_edge)
-                start += round(width + spacing, self.sig_figs)
-                placed_pins.append(pin)
+                placed_pin = self._place_next_pin(pin_list, layer, orientation, ref_edge, grid.to_units(start))
+                start += step
+                if placed_pin is not None:
+                    placed_pins.append(placed_pin)
             return pin_list, placed_pins
 
+    def _place_next_pin(self, pin_list, layer, orientation, ref_edge, position):
+        """
+        Places the pin at the head of pin_list. If it is a PHYBusPin, only
+        its next unplaced bit is placed, and the bus stays at the head of
+        pin_list until all of its bits are placed.
+        Parameters
+        ----------
+        pin_list : list
+            List of pins to place.
+        layer : str
+            Layer of the pin shape.
+        orientation : ('horiztonal', 'vertical')
+            Orientation of pin.
+        ref_edge : float
+            Coordinate of the design edge the pin sits on.
+        position : float
+            Coordinate of the lower edge of the pin along the side.
+
+        Returns
+        -------
+        pin : PHYPortPin, PHYBusPin or None
+            The pin, once it has been completely placed and removed from
+            pin_list. None if bits of the bus remain unplaced.
+        """
+        pin = pin_list[0]
+        if orientation == 'horizontal':
+            left_x, bot_y = ref_edge, position
+        else:
+            left_x, bot_y = position, ref_edge
+        self._add_pin_shape(pin, layer, left_x, bot_y)
+        if isinstance(pin, PHYBusPin) and not pin.placed:
+            return None
+        return pin_list.pop(0)
+
+    def _add_pin_shape(self, pin, layer, left_x, bot_y):
+        """
+        Adds a shape to pin with its lower-left corner at (left_x, bot_y),
+        and adds the shape to the spatial index. For a PHYBusPin, the next
+        unplaced bit is placed.
+        Parameters
+        ----------
+        pin : PHYPortPin, PHYBusPin
+        layer : str
+            Layer of the pin shape.
+        left_x : float
+            X-coordinate of the left edge.
+        bot_y : float
+            Y-coordinate of the bottom edge.
+
+        Returns
+        -------
+
+        """
+        if isinstance(pin, PHYBusPin):
+            pin.place_bit(layer, left_x, bot_y)
+            self.spatial_index.insert(layer, pin.template.rect(left_x, bot_y).coords, pin)
+        else:
+            n_rects = len(pin.rects)
+            pin.add_rect(layer, left_x=left_x, bot_y=bot_y)
+            if len(pin.rects) > n_rects:
+                self.spatial_index.insert(layer, next(reversed(pin.rects.values())).coords, pin)
+
     def place_pins(self):
         """
         Master method to perform all the steps in pin placement.
@@ -827,7 +919,11 @@ class PinPlacer:
                 print(f"WARNING: Not all pins on the {side} side were able to be placed!")
                 print(f"The following pins on the {side} side were not placed:")
                 for pin in pin_list:
-                    print(f"\t{pin.name}")
+                    if isinstance(pin, PHYBusPin):
+                        for bit_name in pin.unplaced_bit_names():
+                            print(f"\t{bit_name}")
+                    else:
+                        print(f"\t{pin.name}")
         return int(failed)
 
     def _clean_pin_lists(self):
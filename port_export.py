@@ -0,0 +1,122 @@
+import contextlib
+import json
+
+
+def port_record(module, pin_specs=None):
+    """Builds the JSON description of a module's ports, in the layout
+    written by VerilogModule.write_pin_json. The module's pin dictionaries
+    are copied before pin specs are merged in, so the module is left
+    unchanged.
+
+    Parameters
+    ----------
+    module : VerilogModule, ParsedModule
+        Parsed module. Only name, pins and power_pins are used.
+    pin_specs : dict, optional
+        Dictionary of pin specifications keyed by pin name. Specs under
+        'all_pins' apply to every pin; specs of a specific pin take
+        precedence.
+
+    Returns
+    -------
+    dict
+
+    """
+    pin_specs = pin_specs or {}
+    all_pins_specs = pin_specs.get('all_pins', {})
+    pins = []
+    for pin_name, pin_dict in module.pins.items():
+        pin_record = dict(pin_dict)
+        pin_record.update(all_pins_specs)
+        pin_record.update(pin_specs.get(pin_name, {}))
+        pins.append(pin_record)
+    pg_pins = [{'name': module.power_pins['power_pin'],
+                'pg_type': 'primary_power'},
+               {'name': module.power_pins['ground_pin'],
+                'pg_type': 'primary_ground'},
+               ]
+    return {'name': module.name,
+            'revision': 0,
+            'cells': [{'name': module.name,
+                       'pins': pins,
+                       'pg_pins': pg_pins}],
+            }
+
+
+def iter_port_json(modules, pin_specs=None, ndjson=False, indent=None):
+    """Encodes the ports of many modules one module at a time.
+
+    Parameters
+    ----------
+    modules : Iterable[VerilogModule, ParsedModule]
+        Parsed modules. Can be a generator; each module is encoded as it
+        is produced.
+    pin_specs : dict, optional
+        Pin specifications, see port_record.
+    ndjson : bool, optional
+        If True, one JSON object per line (NDJSON). Otherwise a single
+        JSON array of module objects. Default is False.
+    indent : int, optional
+        Indentation of the JSON array elements. Ignored for NDJSON.
+
+    Yields
+    ------
+    str
+        Pieces of the encoded output.
+
+    """
+    if ndjson:
+        for module in modules:
+            yield json.dumps(port_record(module, pin_specs)) + '\n'
+        return
+    separator = '['
+    for module in modules:
+        yield separator
+        if indent is not None:
+            yield '\n'
+        yield json.dumps(port_record(module, pin_specs), indent=indent)
+        separator = ','
+    yield '[]\n' if separator == '[' else '\n]\n'
+
+
+def write_ports(modules, output, pin_specs=None, ndjson=False, indent=None):
+    """Writes the ports of many modules in a single streamed pass. Only
+    one module's description is held in memory at a time, and the parsed
+    pin dictionaries are not modified.
+
+    Parameters
+    ----------
+    modules : Iterable[VerilogModule, ParsedModule]
+        Parsed modules, e.g. the result of bulk_parse.parse_modules.
+    output : str, Path, TextIO
+        Output file name, or a text stream to write to.
+    pin_specs : dict, optional
+        Pin specifications, see port_record.
+    ndjson : bool, optional
+        If True, write one module per line (NDJSON) instead of one JSON
+        array. Default is False.
+    indent : int, optional
+        Indentation of the JSON array elements. Ignored for NDJSON.
+
+    Returns
+    -------
+    int
+        Number of modules written.
+
+    """
+    count = 0
+
+    def counted():
+        nonlocal count
+        for module in modules:
+            count += 1
+            yield module
+
+    if hasattr(output, 'write'):
+        context = contextlib.nullcontext(output)
+    else:
+        context = open(output, 'w')
+    with context as file:
+        for piece in iter_port_json(counted(), pin_specs, ndjson, indent):
+            file.write(piece)
+    return count
@@ -1,10 +1,11 @@
 from get_srams import SRAMList
-import shutil
 from phyrilog.libraries.bbox_libs import *
 from phyrilog.LIBBuilder import *
 from phyrilog.GDSBuilder import *
 from phyrilog.utilities import *
 from phyrilog.verilog_pin_extract import VerilogModule
+from phyrilog.verilog_library import VerilogLibrary
+from phyrilog.library_watch import LibraryWatcher
 import numpy as np
 import re
 import pickle
@@ -12,12 +13,12 @@ import pickle
 class SRAMBBox:
     """This object is a wrapper for all the generators and views2 associated with a single SRAM BBox instance."""
 
-    def __init__(self, name, modulefile, constfile, techfile, layermapfile, cornerfile, views_dir, characterizer=None, def_specs=dict(), **kwargs):
+    def __init__(self, name, modulefile, constfile, techfile, layermapfile, cornerfile, views_dir, characterizer=None, def_specs=dict(), library=None, **kwargs):
         self.name = name
         self.per_word_bit_xwidth =  0.22 # This was determined arbitrarily.
         self.clock_names = (('CE'),)
         self.seq_names = (('O[^A-Z]','CE','~OEB'),('I[^A-Z]','CE','~CSB & ~WEB'),('A[^A-Z]','CE','~CSB'))
-        self.verilog_module = VerilogModule(name, filename=modulefile, constfile=constfile,
+        self.verilog_module = VerilogModule(name, filename=modulefile, constfile=constfile, library=library,
                                             clocks=self.clock_names, seq_pins=self.seq_names)
         self.layermapfile = layermapfile
         self.cornerfile = cornerfile
@@ -93,16 +94,16 @@ class SRAMBBox:
         if not os.path.exists(self.lib_file_path):
             os.mkdir(self.lib_file_path)
 
-    def build_lef(self, path=None):
-        self.lef_builder = BBoxLEFBuilder(self.phy, indent_char_width=2)
+    def build_lef(self, path=None, phy=None):
+        self.lef_builder = BBoxLEFBuilder(phy or self.phy, indent_char_width=2)
         if path:
             filepath = path
         else:
             filepath = self.lef_file_path / (self.name + '.lef')
         self.lef_builder.write_lef(filename=filepath)
 
-    def build_gds(self, path=None):
-        self.gds_builder = GDSDesign(self.phy, layermap_file=self.layermapfile)
+    def build_gds(self, path=None, phy=None):
+        self.gds_builder = GDSDesign(phy or self.phy, layermap_file=self.layermapfile)
         self.gds_builder.add_polygons()
         if path:
             filepath = path
@@ -110,8 +111,8 @@ class SRAMBBox:
             filepath = self.gds_file_path / (self.name + '.gds')
         self.gds_builder.write_gdsfile(filename=filepath)
 
-    def build_lib(self, path=None):
-        self.lib_builder = LIBBuilder(self.phy, corners=self.cornerfile, characterizer=self.characterizer,
+    def build_lib(self, path=None, phy=None):
+        self.lib_builder = LIBBuilder(phy or self.phy, corners=self.cornerfile, characterizer=self.characterizer,
                                       options=self.lib_options)
         if path:
             filepath = path
@@ -127,17 +128,15 @@ class SRAMBBox:
         print("\n")
 
     def build_all_xN(self, N, lef_path=None, gds_path=None, lib_path=None, build_lib=False):
-        self.phy.scale(N)
-        N_str = str(N)
-        re.sub(r'\.', 'p', N_str)
-        self.name = self.name + f'_x{N_str}'
-        print(f'Building {self.name} phy views...')
-        self.build_lef(path=lef_path)
-        self.build_gds(path=gds_path)
+        # The views are written from a scaled view of the design, so the
+        # placed design itself is never rescaled.
+        phy = self.phy.view(scale=N)
+        name = self.name + '_x' + re.sub(r'\.', 'p', str(N))
+        print(f'Building {name} phy views...')
+        self.build_lef(path=lef_path or self.lef_file_path / (name + '.lef'), phy=phy)
+        self.build_gds(path=gds_path or self.gds_file_path / (name + '.gds'), phy=phy)
         if build_lib:
-            self.build_lib(path=lib_path)
-        self.name = self.name[:-2]
-        self.phy.scale(1 / N)
+            self.build_lib(path=lib_path or self.lib_file_path / (name + '_lib'), phy=phy)
         print('\n')
 
     def _get_consts_from_name(self):
@@ -260,86 +259,15 @@ class ASAP7SRAMs:
             self.sramlist.search(search)
         self.srams_names = self.sramlist.srams
         self.srams = []
-        with open(behav_file, 'r') as file:
-            self.line_list = [line.rstrip('\n') for line in file]
-        self.line_list = self._strip_comments(self.line_list)
-        # self.module_def_list = [line for line in self.line_list if "module" in line]
-        if os.path.exists('tmp'):
-            shutil.rmtree('tmp')
+        # Each SRAM's constants come from the `define block preceding it
+        self.library = VerilogLibrary(behav_file)
         self.predefs = predefs
 
 
-    def _strip_comments(self, line_list):
-        """Removes comments from lines."""
-        new_line_list = []
-        multiline_comment = False
-
-        # Precompile RegEx patterns
-        slineA = re.compile("//")
-        slineB = re.compile("/\*[\w\W]+\*/")
-        mline_begin = re.compile("/\*")
-        mline_end =  re.compile("\*/")
-        empty = re.compile("(?![\s\S])")
-
-        # Line-by-line Comment Filter
-        for line in line_list:
-            # Remove single line comment
-            if re.search(slineA, line):
-                continue
-            # Remove single line comment defined with /* ... */ syntax
-            elif re.match(slineB, line):
-                continue
-            # Remove first line of multiline comment and begin tracking
-            elif re.search(mline_begin, line):
-                multiline_comment = True
-                continue
-            # Remove lines that are in the body of the multiline comment
-            elif multiline_comment and not re.search(mline_end, line):
-                continue
-            # Remove last line of multiline commend and stop tracking
-            elif re.search(mline_end, line):
-                multiline_comment = False
-                continue
-            # Remove empty lines
-            elif re.match(empty, line):
-                continue
-            else:
-                new_line_list.append(line)
-        return new_line_list
-
-    def _find_module(self, top):
-        for line in self.line_list:
-            if top in line.split() and 'module' in line.split():
-                return self.line_list.index(line)
-
-    def _get_relevant_lines(self, top):
-        os.chdir('tmp')
-        top_line = self._find_module(top)
-        idx = top_line - 1
-        line = self.line_list[idx]
-        premodule_block = []
-        while line != 'endmodule' and idx > 0:
-            premodule_block.insert(0, line)
-            idx += -1
-            line = self.line_list[idx]
-        module_block = []
-        idx = top_line
-        line = self.line_list[idx]
-        while line != 'endmodule':
-            line = self.line_list[idx]
-            module_block.append(line)
-            idx += 1
-        self.modulefile = "temp_module_file.v"
-        with open(self.modulefile, "w+") as modulefile:
-            for line in module_block:
-                modulefile.write(f"{line}\n")
-        self.constfile = "temp_const_file.vh"
-        with open(self.constfile, "w+") as constfile:
-            for line in premodule_block:
-                constfile.write(f"{line}\n")
-        os.chdir('..')
-
     def make_sram_objs(self, name):
+        self.srams.append(self._new_sram_obj(name))
+
+    def _new_sram_obj(self, name):
         if not os.path.exists(self.project_dir / 'views'):
             os.mkdir(self.project_dir / 'views')
         try:
@@ -347,9 +275,10 @@ class ASAP7SRAMs:
             print(f"Found extra specs for {name}: {extra_specs}")
         except KeyError or TypeError:
             extra_specs = dict()
-        self.srams.append(SRAMBBox(name, self.modulefile, self.constfile, self.techfile,
-                                   self.layermapfile, self.cornerfile, self.project_dir / 'views',
-                                   characterizer=ASAP7Characterizer, def_specs=extra_specs))
+        return SRAMBBox(name, None, None, self.techfile,
+                        self.layermapfile, self.cornerfile, self.project_dir / 'views',
+                        characterizer=ASAP7Characterizer, def_specs=extra_specs,
+                        library=self.library)
 
 
     def build_all_sram_views(self, sram_obj):
@@ -359,14 +288,32 @@ class ASAP7SRAMs:
     def add_all_srams(self):
         for sram_name in self.srams_names:
             print(f'Building {sram_name} PHYObject...')
-            os.mkdir('tmp')
-            self._get_relevant_lines(sram_name)
-            os.chdir('tmp')
             self.make_sram_objs(sram_name)
-            os.chdir('..')
-            shutil.rmtree('tmp')
             print("\n")
 
     def build_all_srams(self):
         for sram_obj in self.srams:
             self.build_all_sram_views(sram_obj)
+
+    def rebuild_srams(self, changes):
+        """Re-parses and rebuilds the views of the SRAMs in a
+        LibraryChanges. Modules that were not selected when the container
+        was made are ignored."""
+        for name in changes.removed:
+            self.srams = [sram_obj for sram_obj in self.srams if sram_obj.name != name]
+        for name in changes.changed:
+            if name not in self.srams_names:
+                continue
+            print(f'Rebuilding {name} PHYObject...')
+            sram_obj = self._new_sram_obj(name)
+            self.srams = [sram_obj if old.name == name else old for old in self.srams]
+            if sram_obj not in self.srams:
+                self.srams.append(sram_obj)
+            self.build_all_sram_views(sram_obj)
+
+    def watch(self, interval=0.25):
+        """Watches the behavioral model, rebuilding the views of only the
+        SRAMs whose module (or `define constants) changed on each save.
+        Runs until interrupted."""
+        print(f'Watching {self.library.filename} for changes...')
+        LibraryWatcher(self.library, interval).watch(self.rebuild_srams)
@@ -29,3 +29,5 @@ with open(def_specs, 'rb') as f:
 asap7_srams = ASAP7SRAMs(behav_model, projects_dir / 'phyrilog', projects_dir / 'hammer', search='[\s\S](_new)*', predefs=predefs)
 asap7_srams.add_all_srams()
 asap7_srams.build_all_srams()
+if '--watch' in sys.argv:
+    asap7_srams.watch()
@@ -1,5 +1,7 @@
 import re
 
+from phyrilog.utilities import open_source
+
 class SRAMList:
     """This just has a list of srams."""
 
@@ -7,11 +9,12 @@ class SRAMList:
         self.everything = []
         self.srams = []
         if listfile:
-            with open(listfile) as f:
-                for line in listfile:
-                    self.srams.append(line)
+            with open_source(listfile) as f:
+                for line in f:
+                    if line.strip():
+                        self.srams.append(line.strip())
         else:
-            with open(file) as f:
+            with open_source(file) as f:
                 for line in f:
                     if line:
                         words = line.split()
@@ -0,0 +1,328 @@
+import bisect
+import heapq
+import itertools
+import math
+
+
+def _union(boxes):
+    boxes = iter(boxes)
+    left_x, bot_y, right_x, top_y = next(boxes)
+    for box in boxes:
+        left_x = min(left_x, box[0])
+        bot_y = min(bot_y, box[1])
+        right_x = max(right_x, box[2])
+        top_y = max(top_y, box[3])
+    return (left_x, bot_y, right_x, top_y)
+
+
+def _area(box):
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def _touches(box, window):
+    return box[0] <= window[2] and window[0] <= box[2] and box[1] <= window[3] and window[1] <= box[3]
+
+
+def _distance(box, x, y):
+    dx = max(box[0] - x, 0, x - box[2])
+    dy = max(box[1] - y, 0, y - box[3])
+    return math.hypot(dx, dy)
+
+
+class IntervalIndex:
+    """
+    Sorted index of 1D intervals, e.g. the free partitions or placed pin
+    spans along one side of a design.
+
+    Intervals are kept sorted by their lower bound as they are inserted, so
+    lookups bisect to the candidates instead of scanning every interval.
+    Reversed intervals are indexed by their lower and upper values.
+
+    Attributes
+    ----------
+    max_span : float
+        Length of the longest interval inserted.
+    """
+    def __init__(self):
+        self._keys = []
+        self._items = []
+        self.max_span = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def insert(self, lower, upper, item):
+        """
+        Adds an interval.
+
+        Parameters
+        ----------
+        lower : float
+        upper : float
+        item : Any
+            Object returned by queries for this interval.
+
+        Returns
+        -------
+
+        """
+        key = (min(lower, upper), max(lower, upper))
+        idx = bisect.bisect_right(self._keys, key)
+        self._keys.insert(idx, key)
+        self._items.insert(idx, item)
+        self.max_span = max(self.max_span, key[1] - key[0])
+
+    def remove(self, lower, upper, item):
+        """Removes the interval [lower, upper] of item. Items are compared
+        by identity."""
+        key = (min(lower, upper), max(lower, upper))
+        for idx in range(bisect.bisect_left(self._keys, key), bisect.bisect_right(self._keys, key)):
+            if self._items[idx] is item:
+                del self._keys[idx], self._items[idx]
+                return
+        raise KeyError(item)
+
+    def items(self):
+        """Items of all intervals, in order of lower bound."""
+        return list(self._items)
+
+    def overlapping(self, lower, upper):
+        """
+        Items of the intervals that overlap or touch [lower, upper], in
+        order of lower bound.
+
+        Parameters
+        ----------
+        lower : float
+        upper : float
+
+        Returns
+        -------
+        list
+        """
+        lower, upper = min(lower, upper), max(lower, upper)
+        start = bisect.bisect_left(self._keys, (lower - self.max_span,))
+        stop = bisect.bisect_right(self._keys, (upper, math.inf))
+        return [item for key, item in zip(self._keys[start:stop], self._items[start:stop]) if key[1] >= lower]
+
+    def containing(self, value):
+        """Items of the intervals that strictly contain value, in order of
+        lower bound."""
+        start = bisect.bisect_left(self._keys, (value - self.max_span,))
+        stop = bisect.bisect_left(self._keys, (value,))
+        return [item for key, item in zip(self._keys[start:stop], self._items[start:stop]) if key[1] > value]
+
+
+class _Node:
+    __slots__ = ('leaf', 'entries')
+
+    def __init__(self, leaf, entries=None):
+        self.leaf = leaf
+        self.entries = entries if entries is not None else []
+
+    @property
+    def box(self):
+        return _union(entry[0] for entry in self.entries)
+
+
+class RTree:
+    """
+    R-tree of boxes in one layer. Boxes are inserted one at a time; nodes
+    that overflow are split in half along the axis their entries are most
+    spread out on.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Number of entries in a node before it is split. Default is 8.
+    """
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._root = _Node(True)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def insert(self, box, item):
+        """
+        Adds a box.
+
+        Parameters
+        ----------
+        box : Sequence[float]
+            [left_x, bot_y, right_x, top_y]
+        item : Any
+            Object returned by queries for this box.
+
+        Returns
+        -------
+
+        """
+        box = tuple(box)
+        sibling = self._insert(self._root, box, item)
+        if sibling is not None:
+            root = self._root
+            self._root = _Node(False, [(root.box, root), (sibling.box, sibling)])
+        self._size += 1
+
+    def _insert(self, node, box, item):
+        if node.leaf:
+            node.entries.append((box, item))
+        else:
+            idx = min(range(len(node.entries)), key=lambda idx: self._enlargement(node.entries[idx][0], box))
+            child = node.entries[idx][1]
+            sibling = self._insert(child, box, item)
+            node.entries[idx] = (child.box, child)
+            if sibling is not None:
+                node.entries.append((sibling.box, sibling))
+        if len(node.entries) > self.max_entries:
+            return self._split(node)
+        return None
+
+    @staticmethod
+    def _enlargement(box, new_box):
+        area = _area(box)
+        return _area(_union((box, new_box))) - area, area
+
+    @staticmethod
+    def _split(node):
+        entries = node.entries
+        x_spread = max(entry[0][0] + entry[0][2] for entry in entries) - min(entry[0][0] + entry[0][2] for entry in entries)
+        y_spread = max(entry[0][1] + entry[0][3] for entry in entries) - min(entry[0][1] + entry[0][3] for entry in entries)
+        axis = 0 if x_spread >= y_spread else 1
+        entries.sort(key=lambda entry: entry[0][axis] + entry[0][axis + 2])
+        half = len(entries) // 2
+        node.entries = entries[:half]
+        return _Node(node.leaf, entries[half:])
+
+    def window(self, box):
+        """Items of the boxes that overlap or touch box."""
+        found = []
+        if not self._size:
+            return found
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            for entry_box, child in node.entries:
+                if _touches(entry_box, box):
+                    if node.leaf:
+                        found.append(child)
+                    else:
+                        stack.append(child)
+        return found
+
+    def nearest(self, x, y, count=1):
+        """Yields (distance, item) of the boxes closest to (x, y), nearest
+        first, up to count of them."""
+        counter = itertools.count()
+        heap = [(0, next(counter), False, self._root)]
+        while heap and count > 0:
+            distance, _, is_item, entry = heapq.heappop(heap)
+            if is_item:
+                yield distance, entry
+                count -= 1
+                continue
+            for entry_box, child in entry.entries:
+                heapq.heappush(heap, (_distance(entry_box, x, y), next(counter), entry.leaf, child))
+
+
+class SpatialIndex:
+    """
+    Per-layer spatial index of design geometry, answering window and
+    nearest-shape queries without scanning every shape.
+
+    Shapes are added as they are created, either as Rectangles or as
+    (layer, box, item) entries for geometry that has no Rectangle yet,
+    e.g. the bits of a PHYBusPin.
+
+    Attributes
+    ----------
+    layers : dict[str, RTree]
+        R-tree of each layer.
+    """
+    def __init__(self):
+        self.layers = {}
+        self._rect_ids = set()
+
+    def __len__(self):
+        return sum(len(tree) for tree in self.layers.values())
+
+    def clear(self):
+        """Removes every shape."""
+        self.layers = {}
+        self._rect_ids = set()
+
+    def insert(self, layer, box, item):
+        """
+        Adds a box on layer.
+
+        Parameters
+        ----------
+        layer : str
+        box : Sequence[float]
+            [left_x, bot_y, right_x, top_y]
+        item : Any
+            Object returned by queries for this box.
+
+        Returns
+        -------
+
+        """
+        tree = self.layers.get(layer)
+        if tree is None:
+            tree = self.layers[layer] = RTree()
+        tree.insert(box, item)
+
+    def add_rect(self, rect):
+        """Adds a Rectangle at its current coordinates. Rectangles already
+        in the index are skipped."""
+        if id(rect) not in self._rect_ids:
+            self._rect_ids.add(id(rect))
+            self.insert(rect.layer, rect.coords, rect)
+
+    def _trees(self, layer):
+        if layer is None:
+            return list(self.layers.values())
+        tree = self.layers.get(layer)
+        return [tree] if tree is not None else []
+
+    def window(self, box, layer=None):
+        """
+        Items whose boxes overlap or touch box.
+
+        Parameters
+        ----------
+        box : Sequence[float]
+            [left_x, bot_y, right_x, top_y] of the window.
+        layer : str, optional
+            Only search this layer. Default is every layer.
+
+        Returns
+        -------
+        list
+        """
+        return [item for tree in self._trees(layer) for item in tree.window(box)]
+
+    def nearest(self, point, layer=None, count=1):
+        """
+        Items whose boxes are closest to point, nearest first. Items whose
+        boxes contain point are at distance 0.
+
+        Parameters
+        ----------
+        point : Sequence[float]
+            (x, y) coordinate.
+        layer : str, optional
+            Only search this layer. Default is every layer.
+        count : int, optional
+            Number of items to return. Default is 1.
+
+        Returns
+        -------
+        list
+        """
+        x, y = point
+        found = heapq.merge(*(tree.nearest(x, y, count) for tree in self._trees(layer)),
+                            key=lambda found: found[0])
+        return [item for _, item in itertools.islice(found, count)]
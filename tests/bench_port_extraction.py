@@ -0,0 +1,41 @@
+from phyrilog.verilog_pin_extract import VerilogModule
+from phyrilog.verilog_library import VerilogLibrary
+import pathlib
+import tempfile
+import timeit
+
+this_dir = pathlib.Path(__file__).parent
+behav_model = this_dir.parent / 'views/behavioral/sram.v'
+
+
+def make_netlist(filename, n_ports=2000, n_cells=200000):
+    """Writes a flattened gate-level style netlist with non-ANSI ports."""
+    with open(filename, 'w') as file:
+        port_names = [f"p{idx}" for idx in range(n_ports)]
+        file.write(f"module BigNetlist ({', '.join(port_names)});\n")
+        for idx, name in enumerate(port_names):
+            direction = 'input' if idx % 2 else 'output'
+            file.write(f"  {direction} [7:0] {name};\n")
+        for idx in range(n_cells):
+            file.write(f"  INVx1_ASAP7_75t_R U{idx} ( .A(n{idx}), .Y(n{idx + 1}) );\n")
+        file.write("endmodule\n")
+
+
+def bench(label, stmt, number):
+    seconds = timeit.timeit(stmt, number=number) / number
+    print(f"{label:<40} {seconds * 1e3:10.3f} ms")
+
+
+if __name__ == '__main__':
+    lib = VerilogLibrary(behav_model)
+    srams = [name for name in lib if '_1bit' not in name]
+    for parser in ('regex', 'lexer'):
+        bench(f"sram.v, {len(srams)} modules, {parser}",
+              lambda: [lib.get_module(name, clocks=('CE',), seq_pins=[], parser=parser) for name in srams], 5)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        netlist = pathlib.Path(tmp_dir) / 'big_netlist.v'
+        make_netlist(netlist)
+        for parser in ('regex', 'lexer', 'stream'):
+            bench(f"big_netlist.v, {parser}",
+                  lambda: VerilogModule('BigNetlist', filename=netlist, clocks=(), seq_pins=[], parser=parser), 1)
@@ -0,0 +1,61 @@
+from phyrilog import bulk_parse
+from phyrilog.bulk_parse import parse_modules
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from phyrilog.verilog_library import VerilogLibrary
+from phyrilog.verilog_pin_extract import VerilogModule
+import pathlib
+import pprint
+
+this_dir = pathlib.Path(__file__).parent
+behav_model = this_dir.parent / 'views/behavioral/sram.v'
+testmodulefile = this_dir / 'test_module.v'
+clocks = ('CE',)
+seq_pins = (('O[^A-Z]', 'CE', '~OEB'), ('I[^A-Z]', 'CE', '~CSB & ~WEB'), ('A[^A-Z]', 'CE', '~CSB'))
+
+
+def test_parallel_matches_serial():
+    sources = [behav_model, (testmodulefile, 'TestNewlinePorts'), (behav_model, 'SRAM2RW16x8')]
+    parallel = parse_modules(sources, max_workers=2, clocks=clocks, seq_pins=seq_pins)
+    serial = parse_modules(sources, max_workers=1, clocks=clocks, seq_pins=seq_pins)
+    lib = VerilogLibrary(behav_model)
+    assert [result.name for result in parallel] == list(lib) + ['TestNewlinePorts', 'SRAM2RW16x8']
+    assert parallel == serial
+    mod = VerilogModule('SRAM2RW16x8', library=lib, clocks=clocks, seq_pins=seq_pins)
+    assert parallel[-1].pins == mod.pins
+    assert parallel[-1].seq_pins == mod.seq_pins
+
+
+class BreakingExecutor:
+    """Stands in for a process pool that loses a worker after the first
+    chunk: later chunks fail, and submitting the last one fails too."""
+    def __init__(self, max_workers):
+        self.n_submitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        self.n_submitted += 1
+        if self.n_submitted > 2:
+            raise BrokenProcessPool('A process in the pool was terminated abruptly.')
+        future = Future()
+        if self.n_submitted == 1:
+            future.set_result(fn(*args))
+        else:
+            future.set_exception(BrokenProcessPool('A process in the pool was terminated abruptly.'))
+        return future
+
+
+def test_broken_pool_finishes_serially(monkeypatch):
+    sources = [behav_model, (testmodulefile, 'TestNewlinePorts')]
+    serial = parse_modules(sources, max_workers=1, clocks=clocks, seq_pins=seq_pins)
+    monkeypatch.setattr(bulk_parse, 'ProcessPoolExecutor', BreakingExecutor)
+    assert parse_modules(sources, max_workers=2, chunksize=1, clocks=clocks, seq_pins=seq_pins) == serial
+
+
+if __name__ == '__main__':
+    pprint.pprint([result.name for result in parse_modules([behav_model])])
@@ -0,0 +1,39 @@
+from phyrilog.verilog2phy import PHYBusPin, PHYPortPin, expand_bus_pins, n_bits
+import pprint
+
+pin_dict = {'name': 'data', 'direction': 'input', 'is_bus': True, 'bus_max': 4, 'bus_min': 1,
+            'power_pin': 'VDD', 'ground_pin': 'VSS'}
+
+
+def make_bus():
+    bus = PHYBusPin(pin_dict, 'M4', 'left', 1, 0.018)
+    for bit_no in range(3):
+        bus.place_bit('M4', 0, round(0.5 + bit_no * 0.048, 3))
+    return bus
+
+
+def test_bits_created_on_demand():
+    bus = make_bus()
+    assert bus.n_bits == 4 and bus.n_placed == 3 and not bus.placed
+    assert bus.unplaced_bit_names() == ['data[4]']
+    bus.scale(4)
+    assert bus._bits is None
+    bits = bus.bits
+    assert [bit.name for bit in bits] == ['data[1]', 'data[2]', 'data[3]', 'data[4]']
+    eager = PHYPortPin(pin_dict, 'M4', 'left', 1, 0.018, bus_idx=2)
+    eager.add_rect('M4', left_x=0, bot_y=0.548)
+    eager.scale(4)
+    assert bits[1].phys_objs[0].coords == eager.phys_objs[0].coords
+    assert bits[1].labels[0].coords == eager.labels[0].coords
+    assert not bits[3].rects
+
+
+def test_expand_bus_pins():
+    scalar = PHYPortPin({'name': 'clk', 'direction': 'input'}, 'M4', 'left', 1, 0.018)
+    pins = [scalar, make_bus()]
+    assert n_bits(pins) == 5
+    assert [pin.name for pin in expand_bus_pins(pins)] == ['clk', 'data[1]', 'data[2]', 'data[3]', 'data[4]']
+
+
+if __name__ == '__main__':
+    pprint.pprint([bit.phys_objs[0].coords for bit in make_bus().bits if bit.rects])
@@ -0,0 +1,54 @@
+from phyrilog.utilities import open_source
+from phyrilog.verilog_library import VerilogLibrary
+from phyrilog.verilog_pin_extract import VerilogModule
+from phyrilog.verilog_preprocessor import get_macro_table
+import bz2
+import gzip
+import lzma
+import pathlib
+import pprint
+import tempfile
+
+this_dir = pathlib.Path(__file__).parent
+testmodulefile = this_dir / 'test_module.v'
+constfile = this_dir / 'const.vh'
+compressors = {'gz': gzip, 'xz': lzma, 'bz2': bz2}
+
+
+def compress(path, tmp_dir, fmt, suffix=''):
+    """Writes a compressed copy of path. The suffix is deliberately not the
+    format's extension, since formats are detected by content."""
+    out_path = pathlib.Path(tmp_dir) / (path.name + suffix + '.' + fmt)
+    out_path.write_bytes(compressors[fmt].compress(path.read_bytes()))
+    return out_path
+
+
+def test_open_source_detects_format():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in compressors:
+            path = compress(testmodulefile, tmp_dir, fmt, suffix='.bin')
+            with open_source(path) as file:
+                assert file.read() == testmodulefile.read_text()
+        with open_source(testmodulefile) as file:
+            assert file.read() == testmodulefile.read_text()
+
+
+def test_compressed_module_library_and_constfile():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt in compressors:
+            netlist = compress(testmodulefile, tmp_dir, fmt)
+            for parser in ('regex', 'stream'):
+                mod = VerilogModule('TestParamsAndPorts', filename=netlist, clocks=('clock',), seq_pins=[],
+                                    parser=parser)
+                plain = VerilogModule('TestParamsAndPorts', filename=testmodulefile, clocks=('clock',),
+                                      seq_pins=[], parser=parser)
+                assert mod.pins == plain.pins
+                assert mod.line_list == plain.line_list
+            assert list(VerilogLibrary(netlist)) == list(VerilogLibrary(testmodulefile))
+            assert get_macro_table(compress(constfile, tmp_dir, fmt)).macros == get_macro_table(constfile).macros
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pprint.pprint(VerilogModule('TestParamsAndPorts', filename=compress(testmodulefile, tmp_dir, 'gz'),
+                                    seq_pins=[]).pins)
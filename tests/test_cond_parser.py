@@ -0,0 +1,28 @@
+from phyrilog.cond_parser import ConditionError, compile_condition
+import pprint
+
+
+def test_render():
+    condition = compile_condition('~CSB & ~WEB')
+    assert condition.when('0') == '!CSB0 & !WEB0'
+    assert condition.sdf_cond('0') == '!CSB0 & !WEB0'
+    assert condition.signals == ('CSB', 'WEB')
+    assert compile_condition('!(CSB | WEB) & A[2]').when('1') == '!(CSB1 | WEB1) & A1[2]'
+    assert compile_condition("A' * (B + C)").when() == '!A & (B | C)'
+    assert compile_condition("(A & B) | ~~C").when() == 'A & B | C'
+    assert compile_condition("CSB == 1'b0 && WEB != 0").when() == '!CSB & WEB'
+    assert compile_condition("A ^ 1").sdf_cond() == "A ^ 1'b1"
+
+
+def test_cache_and_errors():
+    assert compile_condition('~CSB & ~WEB') is compile_condition('~CSB & ~WEB')
+    for text in ['', 'A &', '(A | B', 'A # B', 'A B']:
+        try:
+            compile_condition(text)
+            assert False
+        except ConditionError:
+            pass
+
+
+if __name__ == '__main__':
+    pprint.pprint(compile_condition('!(CSB | WEB) & A[2]').when('1'))
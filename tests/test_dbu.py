@@ -0,0 +1,55 @@
+from phyrilog.dbu import DBUGrid, DEFAULT_GRID, format_units
+from phyrilog.verilog2phy import Label, PHYBusPin, PHYPortPin, Rectangle, RectStore
+import pprint
+
+
+def test_grid():
+    assert DEFAULT_GRID.dbu_per_unit == 1000 and DEFAULT_GRID.decimals == 3
+    fine = DBUGrid(1e-6, 1e-10)
+    assert fine.dbu_per_unit == 10000 and fine.decimals == 4
+    assert DEFAULT_GRID.to_dbu(0.1236) == 124 and DEFAULT_GRID.to_dbu(2) == 2000
+    assert DEFAULT_GRID.snap(0.1 + 0.2) == 0.3 and DEFAULT_GRID.snap(0.00049) == 0.0
+    assert type(DEFAULT_GRID.snap(2)) is int
+    assert fine.snap(0.12346) == 0.1235
+    assert DEFAULT_GRID.to_dbu_array([[0.5, 1.0004]]).tolist() == [[500, 1000]]
+    assert DBUGrid() == DEFAULT_GRID != fine
+    assert DEFAULT_GRID.add(0.1, 0.2, -0.05) == 0.25 and DEFAULT_GRID.add(1, 2) == 3
+    assert DEFAULT_GRID.to_units(1500) == 1.5 and DEFAULT_GRID.to_units(2000) == 2
+    assert [format_units(value) for value in [2, 2.0, -0.0, 0.102, DEFAULT_GRID.to_units(1122)]] == \
+           ['2', '2', '0', '0.102', '1.122']
+
+
+def test_exact_store_arithmetic():
+    rects = [Rectangle('M4', 0.1, 0.2, 0.3, 0.7)]
+    store = RectStore(rects)
+    assert store.dbu.tolist() == [[100, 200, 300, 700]]
+    store.scale(3)
+    store.translate(0.1, 0)
+    assert rects[0].coords == [0.4, 0.6, 1.0, 2.1]
+    store.scale(0.3333)
+    assert store.dbu.tolist() == [[133, 200, 333, 700]]
+    assert store.bbox() == [0.133, 0.2, 0.333, 0.7]
+
+
+def test_design_grid():
+    fine = DBUGrid(1e-6, 1e-10)
+    rect = Rectangle('M4', 0, 0.12346, 1, 0.5, grid=fine)
+    assert rect.dbu == [0, 1235, 10000, 5000]
+    assert rect.coords == [0, 0.1235, 1, 0.5] and rect.centroid == (0.5, 0.3118)
+    rect.scale(2)
+    assert rect.coords == [0, 0.247, 2, 1.0]
+    assert Label('a', 'M4', (0.12346, 1), grid=fine).coords == [0.1235, 1]
+    pin = PHYPortPin({'name': 'a', 'direction': 'input'}, 'M4', 'left', 1, 0.0245, grid=fine)
+    pin.add_rect('M4', 0, 0.10005)
+    assert pin.phys_objs[0].coords == [0, 0.1, 1, 0.1245] and pin.labels[0].coords == [0.5, 0.1122]
+    bus = PHYBusPin({'name': 'd', 'direction': 'input', 'bus_max': 1}, 'M4', 'left', 1, 0.0245, grid=fine)
+    bus.place_bit('M4', 0, 0.10005)
+    assert list(bus.shape_array.iter_coords()) == [[0, 0.1, 1, 0.1245]]
+    assert bus.bits[0].phys_objs[0].coords == [0, 0.1, 1, 0.1245]
+    assert RectStore([rect], fine).dbu.tolist() == [[0, 2470, 20000, 10000]]
+
+
+if __name__ == '__main__':
+    store = RectStore([Rectangle('M4', 0.1, 0.2, 0.3, 0.7)])
+    store.scale(3)
+    pprint.pprint(store.dbu)
@@ -0,0 +1,73 @@
+from phyrilog.verilog2phy import PHYDesign, PHYObject, PHYPortPin, Rectangle, RectStore, Transform
+import json
+import pprint
+import types
+
+import pytest
+
+tech = {'stackups': [{'metals': [{'name': 'M4', 'min_width': 0.024, 'pitch': 0.048, 'direction': 'horizontal'}]}]}
+
+
+def make_design(tmp_path):
+    techfile = tmp_path / 'tech.json'
+    techfile.write_text(json.dumps(tech))
+    module = types.SimpleNamespace(name='top', pins={}, power_pins={'power_pin': 'VDD', 'ground_pin': 'VSS'})
+    design = PHYDesign(module, techfile, {'xwidth': 10, 'ywidth': 5, 'symmetry': 'X'})
+    clk = PHYPortPin({'name': 'clk', 'direction': 'input'}, 'M4', 'left', 1, 0.024)
+    clk.add_rect('M4', left_x=0, bot_y=0.488)
+    bbox = PHYObject('bbox')
+    bbox.add_rect('M4', 0, 0, 10, 5)
+    design.pins.append(clk)
+    design.phys_objs.extend([clk, bbox])
+    return design
+
+
+def geometry(design):
+    rect_store, labels = design.collect_geometry()
+    transform = design.transform
+    return (list(rect_store.iter_rects(transform)),
+            [label.coords if transform is None else transform.apply(label.coords) for label in labels])
+
+
+def test_transform():
+    transform = Transform(scale=2, offset=(1, 0.5), mirror='X', size=(10, 5))
+    assert transform.apply([0, 0.488, 1, 0.512]) == [1, 9.476, 3, 9.524]
+    assert transform.apply([0.5, 0.5]) == [2.0, 9.5]
+    assert transform.apply_length(0.012) == 0.024 and transform.apply_length(10) == 20
+    assert Transform(scale=0.3333).apply([0.1, 0, 1, 1]) == [0.033, 0.0, 0.333, 0.333]
+    with pytest.raises(ValueError):
+        Transform(mirror='Z')
+
+
+def test_store_rows():
+    rects = [Rectangle('M4', 0, 0.5, 1, 0.524), Rectangle('M5', 2, 3, 4, 5)]
+    store = RectStore(rects)
+    transform = Transform(scale=4, mirror='Y', size=(4, 5))
+    rows = [coords for _, _, coords in store.iter_rects(transform)]
+    assert rows == [transform.apply(rect.coords) for rect in rects] == [[12.0, 2.0, 16.0, 2.096], [0, 12, 8, 20]]
+    assert rects[0].coords == [0, 0.5, 1, 0.524]
+
+
+def test_scaled_view_matches_scale(tmp_path):
+    design = make_design(tmp_path)
+    before = geometry(design)
+    view = design.view(scale=4)
+    scaled = geometry(view)
+    assert geometry(design) == before
+    assert (view.x_width, view.y_width, view.name) == (40, 20, 'top')
+    assert view.specs['design_boundary'] == (40, 40) and design.specs['design_boundary'] == (10, 10)
+    design.scale(4)
+    assert geometry(design) == scaled
+
+
+def test_mirror_needs_symmetry(tmp_path):
+    design = make_design(tmp_path)
+    rects, labels = geometry(design.view(mirror='X'))
+    assert rects[0][2] == [0, 4.488, 1, 4.512] and labels == [[0.5, 4.5]]
+    with pytest.raises(ValueError):
+        design.view(mirror='Y')
+
+
+if __name__ == '__main__':
+    store = RectStore([Rectangle('M4', 0, 0.5, 1, 0.524)])
+    pprint.pprint(list(store.iter_rects(Transform(scale=4, offset=(1, 1)))))
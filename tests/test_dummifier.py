@@ -1,7 +1,27 @@
-from verilog_pin_extract import *
-from dummifier import *
+from phyrilog.verilog_pin_extract import *
+from phyrilog.dummifier import *
 import os, sys, pathlib, pprint
 
+
+def test_net_index():
+    testmodulefile = pathlib.Path(__file__).parent / 'test_module.v'
+    parent = VerilogModule('TestDummifier', filename=testmodulefile, clocks=([]), seq_pins=([]))
+    index = NetIndex(parent.line_list)
+    assert index.connections['D'] == [('random_gate', 'dim1', 'outd'), ('dummya', 'da', 'works'),
+                                      ('dummyb', 'Db', 'aworks')]
+    assert [(inst.name, inst.connections['wow']) for inst in index.instances_of('dummya')] == [('da', 'A')]
+    assert index.instances_of('missing') == []
+    driver, loads = index.driver_and_loads('A', {'outd'}, {'ina', 'inb', 'inc'})
+    assert driver is None and loads == [('random_gate', 'dim1', 'ina')]
+    dummifier = Dummifier(parent, macros=['dummya', 'dummyb'])
+    dummifier.scrape_dummies()
+    dummifier.get_macro_pins()
+    dummifier.get_pin_directions(submod_ins=['ina', 'inb', 'inc'], submod_outs=['outd'])
+    directions = {pin: pin_dict.get('direction') for pin, pin_dict in dummifier.dummy_pin_dicts['dummya'].items()}
+    assert directions == {'wow': 'output', 'thi': 'output', 'actually': 'output', 'works': 'input',
+                          'somehow': None}
+
+
 if __name__ == "__main__":
     this_path = os.path.abspath('')
     this_dir = pathlib.Path(this_path)
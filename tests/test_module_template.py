@@ -0,0 +1,44 @@
+from phyrilog.module_template import ModuleTemplate
+from phyrilog.verilog_pin_extract import VerilogModule
+import pathlib
+import pprint
+
+this_dir = pathlib.Path(__file__).parent
+testmodulefile = this_dir / 'test_module.v'
+param_module = """module Fifo #(parameter WIDTH = 8, parameter DEPTH = 16, parameter ADDR = $clog2(DEPTH))
+  (input clk, input [WIDTH-1:0] din, output [WIDTH-1:0] dout, input [ADDR-1:0] addr);
+endmodule
+"""
+
+
+def test_elaborate_defaults_match_parse():
+    for parser in ('regex', 'lexer'):
+        mod = VerilogModule('TestParamsAndPorts', filename=testmodulefile, clocks=('clock',), seq_pins=[],
+                            parser=parser)
+        variant = ModuleTemplate(mod).elaborate()
+        assert variant.pins == mod.pins
+        assert variant.params == mod.params
+        assert variant.clocks == mod.clocks
+        assert all(variant.clocks[name] is variant.pins[name] for name in variant.clocks)
+
+
+def test_elaborate_overrides():
+    mod = VerilogModule.from_source(param_module, 'Fifo', clocks=('clk',), seq_pins=[], parser='lexer')
+    template = ModuleTemplate(mod)
+    variant = template.elaborate({'WIDTH': 32, 'DEPTH': 1024})
+    assert variant.params == {'WIDTH': 32, 'DEPTH': 1024, 'ADDR': 10}
+    assert (variant.pins['din']['bus_max'], variant.pins['addr']['bus_max']) == (31, 9)
+    assert variant.clocks['clk'] is variant.pins['clk']
+    # The template module is untouched
+    assert (mod.pins['din']['bus_max'], mod.pins['addr']['bus_max']) == (7, 3)
+    try:
+        template.elaborate({'SIZE': 4})
+    except ValueError:
+        pass
+    else:
+        assert False, "Unknown parameter was accepted"
+
+
+if __name__ == '__main__':
+    template = ModuleTemplate(VerilogModule.from_source(param_module, 'Fifo', seq_pins=[], parser='lexer'))
+    pprint.pprint(template.elaborate({'WIDTH': 4}).pins)
@@ -0,0 +1,54 @@
+from phyrilog.parse_cache import ParseCache
+from phyrilog.verilog_library import VerilogLibrary
+from phyrilog.verilog_pin_extract import VerilogModule
+import pathlib
+import pickle
+import pprint
+import tempfile
+
+this_dir = pathlib.Path(__file__).parent
+behav_model = this_dir.parent / 'views/behavioral/sram.v'
+clocks = ('CE',)
+seq_pins = (('O[^A-Z]', 'CE', '~OEB'), ('I[^A-Z]', 'CE', '~CSB & ~WEB'), ('A[^A-Z]', 'CE', '~CSB'))
+
+
+def test_cache_hit_matches_parse():
+    lib = VerilogLibrary(behav_model)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        parsed = VerilogModule('SRAM1RW1024x16', library=lib, clocks=clocks, seq_pins=seq_pins, cache=ParseCache(cache_dir))
+        cache = ParseCache(cache_dir)
+        loaded = VerilogModule('SRAM1RW1024x16', library=lib, clocks=clocks, seq_pins=seq_pins, cache=cache)
+        assert cache.hits == 1
+        assert loaded.pins == parsed.pins
+        assert loaded.params == parsed.params
+        assert loaded.clocks == parsed.clocks
+        assert loaded.seq_pins == parsed.seq_pins
+        assert loaded.line_list == parsed.line_list
+        # clocks/seq_pins refer to the same pin dictionaries as pins
+        assert loaded.seq_pins and loaded.clocks
+        assert all(loaded.seq_pins[name] is loaded.pins[name] for name in loaded.seq_pins)
+        # Different specs miss
+        VerilogModule('SRAM1RW1024x16', library=lib, clocks=clocks, seq_pins=[], cache=cache)
+        assert cache.misses == 1
+
+
+def test_bad_entries_miss(tmp_path):
+    cache = ParseCache(tmp_path)
+    # Truncated, not a pickle, and referring to a class that does not exist
+    missing_class = pickle.dumps(ParseCache).replace(b'ParseCache', b'ParseCachX')
+    for idx, data in enumerate([b'\x80\x05', b'not a pickle', missing_class]):
+        key = f'{idx:02x}' * 20
+        path = pathlib.Path(cache._path(key))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        assert cache.get(key) is None
+        assert not path.exists()
+    assert cache.misses == 3 and cache.hits == 0
+    cache.put(key, {'pins': {}})
+    assert cache.get(key) == {'pins': {}}
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as cache_dir:
+        mod = VerilogModule('SRAM1RW1024x16', filename=behav_model, cache=ParseCache(cache_dir))
+        pprint.pprint(mod.export_state())
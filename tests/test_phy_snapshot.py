@@ -0,0 +1,89 @@
+from phyrilog.phy_snapshot import SnapshotError, load_snapshot, read_snapshot, snapshot_design, write_snapshot
+from phyrilog.verilog2phy import PHYBusPin, PHYDesign, PHYObject, PHYPortPin
+import json
+import pprint
+import types
+
+import pytest
+
+pin_dicts = {'clk': {'name': 'clk', 'direction': 'input', 'is_bus': False},
+             'data': {'name': 'data', 'direction': 'input', 'is_bus': True, 'bus_max': 3, 'bus_min': 0}}
+tech = {'stackups': [{'metals': [{'name': 'M4', 'min_width': 0.024, 'pitch': 0.048, 'direction': 'horizontal'},
+                                 {'name': 'M5', 'min_width': 0.032, 'pitch': 0.064, 'direction': 'vertical'}]}]}
+
+
+def make_design(tmp_path):
+    techfile = tmp_path / 'tech.json'
+    techfile.write_text(json.dumps(tech))
+    module = types.SimpleNamespace(name='top', pins=pin_dicts,
+                                   power_pins={'power_pin': 'VDD', 'ground_pin': 'VSS'})
+    design = PHYDesign(module, techfile, {'xwidth': 10, 'ywidth': 10})
+    clk = PHYPortPin(design.verilog_pin_dict['clk'], 'M4', 'left', 1, 0.024, center=0.5)
+    clk.add_rect('M4', left_x=0, bot_y=0.488)
+    bus = PHYBusPin(design.verilog_pin_dict['data'], 'M4', 'right', 1, 0.024)
+    for bit_no in range(3):
+        bus.place_bit('M4', 9, round(1 + bit_no * 0.048, 3))
+    vdd = PHYPortPin({'name': 'VDD', 'direction': 'inout'}, 'M5', 'top', 0.032, 1)
+    vdd.add_rect('M5', left_x=2, bot_y=9)
+    bbox = PHYObject('bbox')
+    bbox.add_rect('M4', 0, 0, 10, 10)
+    design.pins.extend([clk, bus])
+    design.pg_pins.append(vdd)
+    design.phys_objs.extend([clk, bus, vdd, bbox])
+    return design
+
+
+def rect_coords(obj):
+    return [(rect.layer, rect.purpose, rect.coords) for rect in obj.rects.values()]
+
+
+def test_roundtrip(tmp_path):
+    design = make_design(tmp_path)
+    loaded = load_snapshot(snapshot_design(design))
+    assert type(loaded) is PHYDesign and loaded.name == 'top'
+    assert not hasattr(loaded, 'tech_dict') and loaded.metals == design.metals
+    assert loaded.specs is loaded.defaults and loaded.polygons['pins'] is loaded.pins
+    clk, bus = loaded.pins
+    assert clk.pin_dict is loaded.verilog_pin_dict['clk']
+    assert (clk.x_width, clk.y_width, clk.center) == (1, 0.024, 0.5)
+    assert rect_coords(clk) == rect_coords(design.pins[0])
+    assert list(clk.rects) == list(design.pins[0].rects)
+    assert [rect.dbu for rect in clk.rects.values()] == [rect.dbu for rect in design.pins[0].rects.values()]
+    assert isinstance(bus, PHYBusPin) and bus.n_placed == 3
+    assert [bit.name for bit in bus.bits] == [bit.name for bit in design.pins[1].bits]
+    assert [rect_coords(bit) for bit in bus.bits] == [rect_coords(bit) for bit in design.pins[1].bits]
+    assert rect_coords(loaded.pg_pins[0]) == rect_coords(design.pg_pins[0])
+    assert rect_coords(loaded.phys_objs[0]) == rect_coords(design.phys_objs[0])
+
+
+def test_design_rect_store(tmp_path):
+    design = make_design(tmp_path)
+    store = design.rect_store
+    assert len(store) == 6 and design.rect_store is store
+    design.scale(4)
+    assert design.pins[0].rects[0.5].coords == [0, 1.952, 4, 2.048]
+    assert store.bbox('M4') == [0.0, 0.0, 40.0, 40.0]
+    design.pins[0].add_rect('M4', left_x=0, bot_y=3)
+    assert design.rect_store is not store and len(design.rect_store) == 7
+
+
+def test_file_roundtrip(tmp_path):
+    design = make_design(tmp_path)
+    write_snapshot(design, tmp_path / 'top.physnap')
+    loaded = read_snapshot(tmp_path / 'top.physnap')
+    assert [pin.name for pin in loaded.pins] == ['clk', 'data']
+
+
+def test_bad_snapshot(tmp_path):
+    data = snapshot_design(make_design(tmp_path))
+    with pytest.raises(SnapshotError):
+        load_snapshot(b'NOTASNAP' + data[8:])
+    with pytest.raises(SnapshotError):
+        load_snapshot(data[:8] + b'\xff\xff' + data[10:])
+
+
+if __name__ == '__main__':
+    import pathlib
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pprint.pprint(vars(load_snapshot(snapshot_design(make_design(pathlib.Path(tmp_dir))))))
@@ -0,0 +1,41 @@
+from phyrilog.verilog_pin_extract import PinPatternMatcher, get_pin_matcher, when_conditions
+from phyrilog.verilog_library import VerilogLibrary
+import pathlib
+import pprint
+import re
+
+this_dir = pathlib.Path(__file__).parent
+behav_model = this_dir.parent / 'views/behavioral/sram.v'
+seq_pins = (('O[^A-Z]', 'CE', '~OEB'), ('I[^A-Z]', 'CE', '~CSB & ~WEB'), ('A[^A-Z]', 'CE', '~CSB'))
+
+
+def test_matches_per_pattern_search():
+    patterns = tuple(seq_pin[0] + r"[_\w]*" for seq_pin in seq_pins) + (r'CE[_\w]*', '(W|R)E')
+    matcher = get_pin_matcher(patterns)
+    assert matcher is get_pin_matcher(patterns)
+    pin_names = ['CE1', 'OEB2', 'I2', 'A', 'WEB1', 'xCE', 'O1_x', 'AI_2', 'RE']
+    lib = VerilogLibrary(behav_model)
+    pin_names += [pin for top in lib for pin in lib.get_module(top, clocks=(), seq_pins=()).pins]
+    for pin_name in pin_names:
+        expected = tuple((idx, re.search(pattern, pin_name)[0]) for idx, pattern in enumerate(patterns)
+                         if re.search(pattern, pin_name))
+        assert matcher.match(pin_name) == expected
+
+
+def test_patterns_that_cannot_be_combined():
+    # Duplicate named groups, a backreference and a global inline flag
+    patterns = (r'(?P<bus>D)\d', r'(?P<bus>Q)\d', r'(a)\1', r'(?i)clk', r'EN')
+    matcher = PinPatternMatcher(patterns)
+    for pin_name in ['D1', 'Q2', 'aa', 'CLK', 'clk_EN', 'en', 'a']:
+        expected = tuple((idx, re.search(pattern, pin_name)[0]) for idx, pattern in enumerate(patterns)
+                         if re.search(pattern, pin_name))
+        assert matcher.match(pin_name) == expected
+
+
+def test_when_conditions():
+    assert when_conditions('~CSB & ~WEB', '1') == ('!CSB1 & !WEB1', '!CSB1 & !WEB1')
+    assert when_conditions('~CSB & ~WEB', '') == ('!CSB & !WEB', '!CSB & !WEB')
+
+
+if __name__ == '__main__':
+    pprint.pprint(when_conditions('~CSB & ~WEB', '1'))
@@ -0,0 +1,53 @@
+from phyrilog.bulk_parse import parse_modules
+from phyrilog.port_export import port_record, write_ports
+from phyrilog.verilog_pin_extract import VerilogModule
+import copy
+import io
+import json
+import pathlib
+import pprint
+import tempfile
+
+this_dir = pathlib.Path(__file__).parent
+testmodulefile = this_dir / 'test_module.v'
+pin_specs = {'all_pins': {'capacitance': 0.5}, 'carry': {'capacitance': 1.0}}
+
+
+def get_modules():
+    return [VerilogModule(top, filename=testmodulefile, clocks=('clock',), seq_pins=[])
+            for top in ['TestInlinePorts', 'TestParamsAndPorts']]
+
+
+def test_write_pin_json_matches_record():
+    mod = get_modules()[0]
+    pins = copy.deepcopy(mod.pins)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = pathlib.Path(tmp_dir) / 'pins.json'
+        mod.write_pin_json(filename, pin_specs)
+        record = json.loads(filename.read_text())
+    assert record == port_record(mod, pin_specs)
+    assert mod.pins == pins
+    carry = [pin for pin in record['cells'][0]['pins'] if pin['name'] == 'carry'][0]
+    assert carry['capacitance'] == 1.0
+
+
+def test_json_and_ndjson():
+    modules = get_modules()
+    records = [port_record(mod, pin_specs) for mod in modules]
+    stream = io.StringIO()
+    assert write_ports(iter(modules), stream, pin_specs, indent=1) == 2
+    assert json.loads(stream.getvalue()) == records
+    stream = io.StringIO()
+    write_ports(modules, stream, pin_specs, ndjson=True)
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == records
+    stream = io.StringIO()
+    write_ports([], stream)
+    assert json.loads(stream.getvalue()) == []
+    parsed = parse_modules([(testmodulefile, 'TestInlinePorts')], max_workers=1, clocks=('clock',), seq_pins=[])
+    assert port_record(parsed[0], pin_specs) == records[0]
+
+
+if __name__ == '__main__':
+    stream = io.StringIO()
+    write_ports(get_modules(), stream, pin_specs, ndjson=True)
+    pprint.pprint(stream.getvalue())
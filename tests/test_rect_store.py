@@ -0,0 +1,67 @@
+from phyrilog.verilog2phy import PHYBusPin, PHYObject, Rectangle, RectStore, collect_geometry
+import pprint
+
+pin_dict = {'name': 'data', 'direction': 'input', 'is_bus': True, 'bus_max': 3, 'bus_min': 0}
+
+
+def make_rects():
+    return [Rectangle('M4', 0, 0.5, 1, 0.524, 'horizontal', purpose=['drawing', 'pin']),
+            Rectangle('M5', 2, 3, 4, 5),
+            Rectangle('M4', 0.25, 1, 2, 1.5)]
+
+
+def test_views():
+    rects = make_rects()
+    store = RectStore(rects)
+    assert len(store) == 3 and store.holds(rects)
+    assert rects[0].coords == [0, 0.5, 1, 0.524] and rects[0].dbu == [0, 500, 1000, 524]
+    assert rects[0].purpose == ['drawing', 'pin'] and rects[1].orientation is None
+    assert rects[0].center == 0.512
+    rects[1].coords = [1, 1, 2.5, 2]
+    rects[1].layer = 'M6'
+    assert store.coords[1].tolist() == [1, 1, 2.5, 2] and store.get_layer(1) == 'M6'
+    assert [row[0] for row in store.iter_rects()] == ['M4', 'M6', 'M4']
+    assert store.bbox() == [0.0, 0.5, 2.5, 2.0] and store.bbox('M4') == [0.0, 0.5, 2.0, 1.5]
+    assert store.bbox('M9') is None
+
+
+def test_scale_matches_rectangles():
+    rects, expected = make_rects(), make_rects()
+    store = RectStore(rects)
+    for scale_factor in [4, 0.25, 3]:
+        store.scale(scale_factor)
+        for rect in expected:
+            rect.scale(scale_factor)
+        assert [rect.coords for rect in rects] == [rect.coords for rect in expected]
+        assert [list(map(type, rect.coords)) for rect in rects] == [list(map(type, rect.coords)) for rect in expected]
+    store.translate(1, 0.5)
+    assert rects[1].coords == [7.0, 9.5, 13.0, 15.5]
+
+
+def test_collect_geometry():
+    bus = PHYBusPin(pin_dict, 'M4', 'left', 1, 0.024)
+    bus.place_bit('M4', 0, 0.5)
+    obj = PHYObject('bbox')
+    obj.add_rect('M4', 0, 0, 10, 10)
+    rects, labels, lazy = collect_geometry([obj, bus], create_bits=False)
+    assert len(rects) == 1 and not labels and lazy == [bus] and bus._bits is None
+    rects, labels, lazy = collect_geometry([obj, bus])
+    assert len(rects) == 2 and [label.text for label in labels] == ['data[0]'] and not lazy
+
+
+
+def test_compact_objects():
+    rects = make_rects()
+    bus = PHYBusPin(pin_dict, 'M4', 'left', 1, 0.024)
+    bus.place_bit('M4', 0, 0.5)
+    bit = bus.bits[0]
+    for obj in [rects[0], bit, bit.labels[0]]:
+        assert not hasattr(obj, '__dict__')
+    assert rects[1].purpose is Rectangle('M4', 0, 0, 1, 1).purpose
+    assert bit.phys_objs[0].purpose is rects[0].purpose
+
+
+if __name__ == '__main__':
+    store = RectStore(make_rects())
+    store.scale(4)
+    pprint.pprint(list(store.iter_rects()))
@@ -0,0 +1,87 @@
+from phyrilog.GDSBuilder import GDSBuilder
+from phyrilog.LEFBuilder import LEFBlock
+from phyrilog.verilog2phy import PHYBusPin, Rectangle, RectStore, ShapeArray, ShapeTemplate
+import gdspy as gp
+import pprint
+
+import pytest
+
+pin_dict = {'name': 'data', 'direction': 'input', 'is_bus': True, 'bus_max': 7, 'bus_min': 0}
+
+
+def make_bus(scale_factor=0.25):
+    bus = PHYBusPin(pin_dict, 'M4', 'left', 1, 0.024)
+    for bit_no in range(6):
+        bus.place_bit('M4', 0, round(0.5 + bit_no * 0.048 + (bit_no % 2) * 0.012, 3))
+    bus.scale(scale_factor)
+    return bus
+
+
+def test_template():
+    template = ShapeTemplate('M4', 1, 0.024, 'horizontal', ['drawing', 'pin'])
+    assert template == ShapeTemplate('M4', 1, 0.024, 'horizontal', ['drawing', 'pin'])
+    assert len({template, ShapeTemplate('M4', 1, 0.024)}) == 2
+    rect = template.rect(2, 0.5)
+    assert rect.coords == [2, 0.5, 3, 0.524] and rect.purpose == ['drawing', 'pin']
+    shapes = ShapeArray(template, [(2, 0.5), (2, 0.548)])
+    assert shapes.offsets == [[2, 0.5], [2, 0.548]]
+    assert list(shapes.iter_coords()) == [[2, 0.5, 3, 0.524], [2, 0.548, 3, 0.572]]
+
+
+def test_bus_shapes_match_bits():
+    bus = make_bus()
+    shapes = list(bus.shape_array.iter_coords())
+    labels = [(label.text, label.coords) for label in bus.iter_labels()]
+    assert bus._bits is None and len(shapes) == bus.n_placed
+    bits = [bit for bit in bus.bits if bit.rects]
+    assert shapes == [bit.phys_objs[0].coords for bit in bits]
+    assert labels == [(bit.name, bit.labels[0].coords) for bit in bits]
+    with pytest.raises(ValueError):
+        make_bus().place_bit('M5', 0, 0)
+
+
+def test_store_shape_arrays():
+    rects = [Rectangle('M4', 0, y, 10, y + 0.5) for y in [0, 2, 4]] + [Rectangle('M4', 0, 1, 1, 1.024)]
+    rects.append(Rectangle('M5', 0, 6, 10, 6.5))
+    arrays = RectStore(rects).shape_arrays()
+    assert [(array.template.layer, array.template.width, array.template.height, len(array)) for array in arrays] == \
+           [('M4', 10, 0.5, 3), ('M4', 1, 0.024, 1), ('M5', 10, 0.5, 1)]
+    assert [list(array.iter_coords()) for array in arrays] == [[rect.coords for rect in rects[:3]],
+                                                              [rects[3].coords], [rects[4].coords]]
+
+
+def test_lef_bus_pin():
+    bus = make_bus(4)
+    compact = LEFBlock('MACRO', 'top', [])
+    compact.add_bus_pin(bus)
+    expanded = LEFBlock('MACRO', 'top', [])
+    for bit in bus.bits:
+        expanded.add_pin(bit)
+
+    def dump(block):
+        return [(name, pin.lines, [layer.rects for port in pin.blocks.values() for layer in port.layers.values()])
+                for name, pin in block.blocks.items()]
+
+    assert dump(compact) == dump(expanded)
+    assert list(compact.blocks)[-2:] == ['data[6]', 'data[7]']
+
+
+def test_gds_references(tmp_path):
+    mapfile = tmp_path / 'test.layermap'
+    mapfile.write_text('M4 drawing 20 0\nM4 pin 20 4\n')
+    builder = GDSBuilder(gp.GdsLibrary('test'), mapfile=str(mapfile))
+    bus = make_bus(1)
+    template = bus.template
+    cell = builder.make_template_cell('data_bit', template)
+    references = builder.make_references(cell, bus.shape_array)
+    # Bits alternate between two spacings, so they repeat with a period of two
+    assert [type(reference) for reference in references] == [gp.CellArray, gp.CellArray]
+    top = gp.Cell('top', exclude_from_current=True)
+    top.add(references)
+    boxes = sorted(polygon.get_bounding_box().round(6).tolist() for polygon in top.get_polygonsets())
+    expected = sorted([coords[:2], coords[2:]] for coords in bus.shape_array.iter_coords() for _ in template.purpose)
+    assert boxes == expected
+
+
+if __name__ == '__main__':
+    pprint.pprint(list(make_bus().shape_array.iter_coords()))
@@ -0,0 +1,102 @@
+from phyrilog.spatial_index import IntervalIndex, SpatialIndex
+from phyrilog.verilog2phy import PHYBusPin, PHYDesign, PHYObject, PHYPortPin, Rectangle
+import json
+import pprint
+import random
+import types
+
+
+def make_index(n=300, seed=1):
+    rng = random.Random(seed)
+    index, boxes = SpatialIndex(), []
+    for idx in range(n):
+        left_x, bot_y = rng.uniform(0, 100), rng.uniform(0, 100)
+        box = (left_x, bot_y, left_x + rng.uniform(0, 5), bot_y + rng.uniform(0, 5))
+        layer = 'M4' if idx % 3 else 'M5'
+        index.insert(layer, box, idx)
+        boxes.append((layer, box))
+    return index, boxes
+
+
+def test_interval_index():
+    index = IntervalIndex()
+    intervals = [(5, 8), (0, 3), (10, 12), (7, 9)]
+    for interval in intervals:
+        index.insert(interval[0], interval[1], interval)
+    index.insert(4, 2, 'reversed')
+    assert index.items() == [(0, 3), 'reversed', (5, 8), (7, 9), (10, 12)]
+    assert index.containing(7.5) == [(5, 8), (7, 9)]
+    assert index.containing(8) == [(7, 9)] and index.containing(3.5) == ['reversed']
+    assert index.overlapping(3, 5) == [(0, 3), 'reversed', (5, 8)]
+    index.remove(5, 8, intervals[0])
+    assert index.containing(7.5) == [(7, 9)] and len(index) == 4
+
+
+def test_window_matches_scan():
+    index, boxes = make_index()
+    assert len(index) == len(boxes)
+    for window in [(10, 10, 30, 20), (50, 0, 51, 100), (200, 200, 300, 300)]:
+        for layer in [None, 'M4']:
+            expected = {idx for idx, (box_layer, box) in enumerate(boxes)
+                        if (layer is None or box_layer == layer) and box[0] <= window[2] and window[0] <= box[2]
+                        and box[1] <= window[3] and window[1] <= box[3]}
+            assert set(index.window(window, layer)) == expected
+
+
+def test_nearest_matches_scan():
+    index, boxes = make_index()
+
+    def distance(box, x, y):
+        return max(box[0] - x, 0, x - box[2]) ** 2 + max(box[1] - y, 0, y - box[3]) ** 2
+
+    for x, y in [(50, 50), (-20, 3), (120, 80)]:
+        for layer in [None, 'M5']:
+            candidates = [idx for idx, (box_layer, _) in enumerate(boxes) if layer is None or box_layer == layer]
+            candidates.sort(key=lambda idx: distance(boxes[idx][1], x, y))
+            found = index.nearest((x, y), layer, count=3)
+            assert [distance(boxes[idx][1], x, y) for idx in found] == \
+                   [distance(boxes[idx][1], x, y) for idx in candidates[:3]]
+
+
+def test_rectangles():
+    index = SpatialIndex()
+    strap = Rectangle('M4', 0, 5, 10, 5.5)
+    pin = Rectangle('M4', 0, 5.5, 1, 5.524)
+    index.add_rect(strap)
+    index.add_rect(pin)
+    index.add_rect(pin)
+    assert len(index) == 2
+    assert index.window(strap.coords, 'M4') == [strap, pin] and index.window(strap.coords, 'M5') == []
+    assert index.nearest((0.5, 6)) == [pin]
+
+
+def test_design_index(tmp_path):
+    techfile = tmp_path / 'tech.json'
+    techfile.write_text(json.dumps({'stackups': [{'metals': []}]}))
+    module = types.SimpleNamespace(name='top', pins={}, power_pins={'power_pin': 'VDD', 'ground_pin': 'VSS'})
+    design = PHYDesign(module, techfile, {'xwidth': 10, 'ywidth': 5})
+    bbox = PHYObject('bbox')
+    bbox.add_rect('M1', 0, 0, 10, 5)
+    bus = PHYBusPin({'name': 'data', 'direction': 'input', 'bus_max': 3}, 'M4', 'left', 1, 0.024)
+    bus.place_bit('M4', 0, 0.5)
+    design.phys_objs.extend([bbox, bus])
+    index = design.spatial_index
+    assert index.window([0, 0, 10, 5], 'M1') == bbox.phys_objs and index.window([0, 0, 1, 1], 'M4') == [bus]
+    # Shapes created after the index is built are added as they are made
+    bbox.add_rect('M4', 0, 2, 10, 2.5)
+    strap = bbox.phys_objs[-1]
+    bus.place_bit('M4', 0, 3)
+    clk = PHYPortPin({'name': 'clk', 'direction': 'input'}, 'M4', 'left', 1, 0.024)
+    design.phys_objs.append(clk)
+    assert design.spatial_index is index
+    clk.add_rect('M4', left_x=0, bot_y=4)
+    assert index.nearest((0.5, 3.01), 'M4') == [bus] and index.window([0, 1, 1, 2.2], 'M4') == [strap]
+    assert index.nearest((0.5, 4.01), 'M4') == [clk.phys_objs[0]]
+    assert bus._bits is None and len(index) == 5
+    design.scale(2)
+    assert index.window([0, 6, 1, 6.01], 'M4') == [bus] and len(index) == 5
+
+
+if __name__ == '__main__':
+    index, _ = make_index()
+    pprint.pprint(index.nearest((50, 50), count=5))
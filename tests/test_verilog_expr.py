@@ -0,0 +1,34 @@
+from phyrilog.verilog_expr import ExpressionError, compile_expression, evaluate
+import pprint
+
+
+def test_operators():
+    params = {'WIDTH': 32, 'DEPTH': 1024}
+    assert evaluate('`WIDTH-1', params) == 31
+    assert evaluate('$clog2(DEPTH)-1', params) == 9
+    assert evaluate('WIDTH/3', params) == 10
+    assert evaluate('-7/2', params) == -3
+    assert evaluate('-7%2', params) == -1
+    assert evaluate('2**3**2', params) == 512
+    assert evaluate('1<<4 - 1', params) == 8
+    assert evaluate("WIDTH > 16 ? 8'hFF : 4'b1010", params) == 255
+    assert evaluate('(WIDTH + 1) * 2 - 1', params) == 65
+
+
+def test_names_and_errors():
+    assert compile_expression('`a * b + a') is compile_expression('`a * b + a')
+    assert compile_expression('`a * b + a').names == ('a', 'b')
+    try:
+        evaluate('WIDTH-1', {})
+        assert False
+    except KeyError:
+        pass
+    try:
+        compile_expression('WIDTH-')
+        assert False
+    except ExpressionError:
+        pass
+
+
+if __name__ == '__main__':
+    pprint.pprint(evaluate('$clog2(DEPTH)-1', {'DEPTH': 1024}))
@@ -0,0 +1,59 @@
+from phyrilog.verilog_lexer import StreamBuffer, scan_module_header, scan_module_stream, strip_comments, tokenize, \
+    tokenize_stream
+from phyrilog.verilog_pin_extract import VerilogModule
+import io
+import pathlib
+import pprint
+
+this_dir = pathlib.Path(__file__).parent
+testmodulefile = this_dir / 'test_module.v'
+
+
+def test_block_comment_spanning_lines():
+    text = "module M (a, /* b,\n c, */ d);\ninput a; // input b;\noutput [3:0] d;\nendmodule"
+    header = scan_module_header(text)
+    assert header.port_names == ['a', 'd']
+    assert [(decl.direction, decl.bus_range, decl.names) for decl in header.ports] == \
+           [('input', None, ['a']), ('output', ('3', '0'), ['d'])]
+    assert strip_comments(text.split('\n'))[0] == "module M (a, "
+    assert [token.line for token in tokenize(text) if token.value == 'd'] == [1, 3]
+
+
+def test_lexer_backend_matches_regex():
+    for top in ['TestNewlinePorts', 'TestParamsAndPorts', 'TestDummifier']:
+        regex_mod = VerilogModule(top, filename=testmodulefile, clocks=('clock',), seq_pins=[])
+        lexer_mod = VerilogModule(top, filename=testmodulefile, clocks=('clock',), seq_pins=[], parser='lexer')
+        assert regex_mod.pins == lexer_mod.pins
+        assert regex_mod.params == lexer_mod.params
+
+
+def test_stream_matches_text():
+    text = testmodulefile.read_text()
+    # A tiny chunk size puts chunk boundaries inside tokens and comments.
+    stream_tokens = list(tokenize_stream(StreamBuffer(io.BytesIO(text.encode()), chunk_size=7)))
+    assert stream_tokens == list(tokenize(text))
+    for top in ['TestNewlinePorts', 'TestParamsAndPorts', 'TestDummifier', 'TestHybridPorts']:
+        assert scan_module_stream(io.StringIO(text), top, chunk_size=7) == scan_module_header(text, top)
+    text = "// module A;\n/* module B;\n */ module  C #(parameter W = 4) (input [W-1:0] a);\nendmodule"
+    assert scan_module_stream(io.StringIO(text), 'C', chunk_size=3).line == 2
+
+
+def test_stream_backend_stops_at_ports():
+    body = ''.join(f"  INVx1 U{idx} (.A(n{idx}), .Y(n{idx + 1}));\n" for idx in range(20000))
+    text = f"module Big (a, y);\n  input a;\n  output [3:0] y;\n{body}endmodule\n"
+    source = io.StringIO(text)
+    mod = VerilogModule('Big', source=source, clocks=(), seq_pins=[], parser='stream')
+    assert source.tell() < len(text) // 4
+    assert mod.pins == VerilogModule('Big', source=text, clocks=(), seq_pins=[], parser='lexer').pins
+    assert mod.line_list[-1] == 'endmodule'
+    for top in ['TestNewlinePorts', 'TestParamsAndPorts', 'TestDummifier']:
+        lexer_mod = VerilogModule(top, filename=testmodulefile, clocks=('clock',), seq_pins=[], parser='lexer')
+        stream_mod = VerilogModule(top, filename=testmodulefile, clocks=('clock',), seq_pins=[], parser='stream')
+        assert stream_mod.pins == lexer_mod.pins
+        assert stream_mod.params == lexer_mod.params
+        assert stream_mod.line_list == lexer_mod.line_list
+
+
+if __name__ == '__main__':
+    mod = VerilogModule('TestHybridPorts', filename=testmodulefile, parser='lexer', seq_pins=[])
+    pprint.pprint(mod.pins)
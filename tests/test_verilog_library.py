@@ -0,0 +1,138 @@
+from phyrilog.library_watch import LibraryWatcher
+from phyrilog.verilog_library import VerilogLibrary
+from phyrilog.verilog_pin_extract import VerilogModule
+import io
+import pathlib
+import pprint
+import threading
+
+import pytest
+
+this_dir = pathlib.Path(__file__).parent
+testmodulefile = this_dir / 'test_module.v'
+behav_model = this_dir.parent / 'views/behavioral/sram.v'
+
+
+def test_module_index():
+    lib = VerilogLibrary(testmodulefile)
+    assert lib.module_names == ['TestNewlinePorts', 'TestInlinePorts', 'TestHybridPorts',
+                                'TestParamsAndPorts', 'TestDummifier']
+    for name in lib:
+        indexed = lib.get_module(name, clocks=('clock',), seq_pins=[])
+        scanned = VerilogModule(name, filename=testmodulefile, clocks=('clock',), seq_pins=[])
+        assert indexed.top_line_no == scanned.top_line_no
+        assert indexed.pins == scanned.pins
+
+
+def test_sram_preamble_consts():
+    lib = VerilogLibrary(behav_model)
+    sram = lib.get_module('SRAM1RW64x8', clocks=('CE',), seq_pins=[])
+    assert sram.params['wordLength'] == 8
+    assert sram.pins['A']['bus_max'] == 5
+
+
+def test_in_memory_source():
+    text = testmodulefile.read_text()
+    scanned = VerilogModule('TestParamsAndPorts', filename=testmodulefile, clocks=('clock',), seq_pins=[])
+    for source in [text, text.encode(), io.StringIO(text), io.BytesIO(text.encode())]:
+        mod = VerilogModule.from_source(source, 'TestParamsAndPorts', clocks=('clock',), seq_pins=[])
+        assert mod.pins == scanned.pins
+        assert mod.line_list == scanned.line_list
+    sram_text = behav_model.read_text()
+    lib = VerilogLibrary.from_source(sram_text)
+    assert lib.in_memory and lib.module_names == VerilogLibrary(behav_model).module_names
+    assert lib.get_module('SRAM1RW64x8', clocks=('CE',), seq_pins=[]).params['wordLength'] == 8
+
+
+def test_module_reload(tmp_path, monkeypatch):
+    verilog = tmp_path / 'test_module.v'
+    text = testmodulefile.read_text()
+    verilog.write_text(text)
+    mod = VerilogModule('TestInlinePorts', filename=verilog, clocks=('clock',), seq_pins=[])
+    lines = mod.line_list
+    assert lines[-1].strip().startswith('endmodule') and 'module TestHybridPorts' not in '\n'.join(lines)
+    verilog.write_text('// edited\n' + text)
+    # Reading the lines never checks the file; reload does
+    monkeypatch.setattr('phyrilog.verilog_pin_extract.file_stamp', None)
+    assert mod.line_list is lines and mod.clean_line_list
+    monkeypatch.undo()
+    assert mod.reload() and mod.line_list == lines and mod.top_line_no == 1 + VerilogModule(
+        'TestInlinePorts', filename=testmodulefile, clocks=('clock',), seq_pins=[]).top_line_no
+    assert not mod.reload()
+
+
+def test_refresh_changed_spans():
+    text = behav_model.read_text()
+    lib = VerilogLibrary.from_source(text)
+    assert lib.refresh(text) == ([], [])
+    span = lib.span('SRAM1RW64x8')
+    edited = text[:span.end] + '\n// edited\n' + text[span.end:]
+    edited = edited[:span.start] + edited[span.start:span.end].replace('input', 'input ', 1) + edited[span.end:]
+    changes = lib.refresh(edited)
+    assert changes.changed == ['SRAM1RW64x8'] and changes.removed == []
+    assert lib.get_module('SRAM1RW64x8', clocks=('CE',), seq_pins=[]).params['wordLength'] == 8
+    changes = lib.refresh(edited[:span.start] + edited[lib.span('SRAM1RW64x8').end:])
+    assert changes.changed == [] and changes.removed == ['SRAM1RW64x8']
+
+
+def test_watcher(tmp_path):
+    verilog = tmp_path / 'test_module.v'
+    text = testmodulefile.read_text()
+    verilog.write_text(text)
+    watcher = LibraryWatcher(verilog)
+    assert watcher.poll() == ([], [])
+    verilog.write_text(text.replace('module TestInlinePorts', '// comment\nmodule TestInlinePorts'))
+    assert watcher.poll().changed == []
+    verilog.write_text(text.replace('TestHybridPorts', 'TestRenamedPorts'))
+    assert watcher.poll() == (['TestRenamedPorts'], ['TestHybridPorts'])
+    assert 'TestRenamedPorts' in watcher.library
+
+
+def test_watcher_include_edited(tmp_path):
+    (tmp_path / 'defs.vh').write_text('`define W 4\n')
+    (tmp_path / 'const.vh').write_text('`include "defs.vh"\n')
+    verilog = tmp_path / 'top.v'
+    verilog.write_text('`include "const.vh"\nmodule top(input [`W-1:0] x);\nendmodule\n')
+    watcher = LibraryWatcher(verilog)
+    assert watcher.poll() == ([], [])
+    (tmp_path / 'defs.vh').write_text('`define W 16\n')
+    assert watcher.poll() == (['top'], [])
+    assert watcher.library.macros_for('top')['W'] == '16'
+    assert watcher.poll() == ([], [])
+
+
+def test_watcher_parse_error(tmp_path):
+    verilog = tmp_path / 'test_module.v'
+    text = testmodulefile.read_text()
+    verilog.write_text(text)
+    watcher = LibraryWatcher(verilog, interval=0.01)
+    verilog.write_text(text + '\n`endif\n')
+    for _ in range(2):
+        # The edit is retried until the file parses, keeping the old index
+        with pytest.raises(ValueError):
+            watcher.poll()
+        assert 'TestHybridPorts' in watcher.library
+    verilog.write_text(text.replace('TestHybridPorts', 'TestRenamedPorts'))
+    assert watcher.poll() == (['TestRenamedPorts'], ['TestHybridPorts'])
+
+    errors, changes = [], []
+    stop = threading.Event()
+
+    def on_error(error):
+        errors.append(error)
+        verilog.write_text(text)
+
+    def callback(change):
+        changes.append(change)
+        stop.set()
+
+    verilog.write_text(text + '\n`endif\n')
+    watcher.watch(callback, stop, on_error)
+    assert len(errors) == 1 and isinstance(errors[0], ValueError)
+    assert changes == [(['TestHybridPorts'], ['TestRenamedPorts'])]
+
+
+if __name__ == '__main__':
+    lib = VerilogLibrary(behav_model)
+    pprint.pprint(lib.spans)
+    pprint.pprint(lib.get_module('SRAM1RW1024x8', clocks=('CE',), seq_pins=[]).pins)
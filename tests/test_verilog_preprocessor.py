@@ -0,0 +1,86 @@
+from phyrilog.verilog_preprocessor import VerilogPreprocessor, get_macro_table
+from phyrilog.verilog_library import VerilogLibrary
+from phyrilog.verilog_pin_extract import VerilogModule
+import pathlib
+import pprint
+
+import pytest
+
+this_dir = pathlib.Path(__file__).parent
+constfile = this_dir / 'const.vh'
+behav_model = this_dir.parent / 'views/behavioral/sram.v'
+
+
+def test_conditionals_and_continuations():
+    lines = ["`define A 1",
+             "`ifdef A",
+             "  `define B 2 // two",
+             "`elsif C",
+             "  `define B 3",
+             "`else",
+             "  `define B 4",
+             "`endif",
+             "`ifndef A `define D 5 `endif",
+             "`define E (`A + \\",
+             "  `B)",
+             "`undef A"]
+    table, _ = VerilogPreprocessor().process_lines(lines)
+    assert table.macros == {'B': '2', 'E': '(`A +    `B)'}
+    assert table.numeric_values() == {'B': 2}
+
+
+def test_macro_table_shared():
+    assert get_macro_table(constfile) is get_macro_table(constfile)
+    mod_a = VerilogModule('Memory141', filename=this_dir / 'Memory141.v', constfile=constfile, seq_pins=[])
+    mod_b = VerilogModule('Memory141', filename=this_dir / 'Memory141.v', constfile=constfile, seq_pins=[])
+    assert mod_a.macros is mod_b.macros
+    assert mod_a.params['MEM_DATA_BITS'] == 128
+
+
+def test_library_macro_snapshots():
+    lib = VerilogLibrary(behav_model)
+    # The _1bit cells have no `define block of their own; they see the
+    # definitions of the SRAM that precedes them.
+    assert lib.macros_for('SRAM1RW1024x16_1bit').numeric_values()['wordLength'] == 16
+    assert lib.macros_for('SRAM1RW1024x17').numeric_values()['wordLength'] == 17
+
+
+def test_includes(tmp_path):
+    (tmp_path / 'a.vh').write_text('`ifndef A_VH\n`define A_VH\n`include "b.vh"\n`endif\n')
+    (tmp_path / 'b.vh').write_text('`ifndef B_VH\n`define B_VH\n`ifdef WIDE\n`define WIDTH 64\n'
+                                   '`else\n`define WIDTH 32\n`endif\n`include "a.vh"\n`endif\n')
+    (tmp_path / 'loop.vh').write_text('`define LOOP 1\n`include "loop.vh"\n')
+    # Guarded headers that include each other, and a header that includes itself
+    assert get_macro_table(tmp_path / 'a.vh').macros == {'A_VH': '', 'B_VH': '', 'WIDTH': '32'}
+    assert get_macro_table(tmp_path / 'loop.vh').macros == {'LOOP': '1'}
+    # Includes see the definitions made before them
+    table, _ = VerilogPreprocessor().process_lines(['`define WIDE', '`include "b.vh"'], current_dir=tmp_path)
+    assert table['WIDTH'] == '64'
+    assert get_macro_table(tmp_path / 'b.vh')['WIDTH'] == '32'
+
+
+def test_nested_include_edited(tmp_path):
+    (tmp_path / 'defs.vh').write_text('`define W 4\n')
+    (tmp_path / 'const.vh').write_text('`define D 2\n`include "defs.vh"\n')
+    assert get_macro_table(tmp_path / 'const.vh').macros == {'D': '2', 'W': '4'}
+    (tmp_path / 'defs.vh').write_text('`define W 16\n')
+    assert get_macro_table(tmp_path / 'const.vh').macros == {'D': '2', 'W': '16'}
+    preprocessor = VerilogPreprocessor()
+    preprocessor.process_lines(['`include "const.vh"'], current_dir=tmp_path)
+    assert set(preprocessor.include_stamps) == {str((tmp_path / name).resolve()) for name in ['const.vh', 'defs.vh']}
+
+
+def test_directive_errors():
+    for lines in [['`endif'], ['`else'], ['`elsif A'], ['`ifdef'], ['`ifdef A', '`define B']]:
+        with pytest.raises(ValueError, match='top.v'):
+            VerilogPreprocessor().process_lines(lines, filename='top.v')
+
+
+def test_missing_include():
+    with pytest.warns(UserWarning, match='Opcode.vh'):
+        lib = VerilogLibrary(this_dir / 'datapath.v')
+    assert 'datapath' in lib.spans
+
+
+if __name__ == '__main__':
+    pprint.pprint(get_macro_table(constfile).macros)
@@ -1,3 +1,11 @@
+import bz2
+import gzip
+import lzma
+import os
+
+# Leading bytes of the compressed formats accepted by open_source.
+_compression_magic = ((b'\x1f\x8b', gzip), (b'\xfd7zXZ\x00', lzma), (b'BZh', bz2))
+
 def r_update(base_dict, update_dict):
     """Recursively updates dictionary"""
     for key in base_dict.keys():
@@ -43,4 +51,36 @@ def get_orientation(side):
     elif side in ['top', 'bottom']:
         return 'vertical'
     else:
-        raise ValueError("Invalid side name")
\ No newline at end of file
+        raise ValueError("Invalid side name")
+
+def open_source(filename):
+    """Opens a source file for reading as text. gzip, xz and bz2 files are
+    detected by their magic bytes, whatever their extension, and are
+    decompressed as they are read rather than inflated up front.
+
+    Parameters
+    ----------
+    filename : str, Path
+        Path of the file.
+
+    Returns
+    -------
+    TextIO
+        Text stream over the (decompressed) file contents.
+
+    """
+    with open(filename, 'rb') as file:
+        head = file.read(6)
+    for magic, module in _compression_magic:
+        if head.startswith(magic):
+            return module.open(filename, 'rt', encoding='utf-8')
+    return open(filename, 'r')
+
+def file_stamp(filename):
+    """Returns the (mtime, size) stamp of a file, used to detect edits, or
+    None if the file cannot be read."""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
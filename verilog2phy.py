@@ -1,6 +1,407 @@
 import json
+import numbers
+import sys
 import numpy as np
 
+from phyrilog.dbu import DEFAULT_GRID, DBUGrid
+from phyrilog.spatial_index import SpatialIndex
+
+# Shared purpose lists, keyed by their contents. Every shape with the same
+# purposes refers to one list instead of carrying its own.
+_purposes = {}
+
+
+def _intern_name(name):
+    return sys.intern(name) if type(name) is str else name
+
+
+def _intern_purpose(purpose):
+    if not isinstance(purpose, list):
+        return purpose
+    key = tuple(purpose)
+    shared = _purposes.get(key)
+    if shared is None:
+        shared = _purposes[key] = list(purpose)
+    return shared
+
+
+def _values_to_dbu(values, grid):
+    """Returns a list of user-unit coordinates as DBU of grid."""
+    return [grid.to_dbu(value) for value in values]
+
+
+def _dbu_to_values(dbu, grid):
+    """Returns a list of DBU coordinates in user units."""
+    return [grid.to_units(value) for value in dbu]
+
+
+def _scale_dbu(dbu, scale_factor):
+    """Scales the DBU coordinates of one shape, returning a new list.
+    Integer factors are exact; other factors round to the grid."""
+    if isinstance(scale_factor, numbers.Integral):
+        return [value * scale_factor for value in dbu]
+    return [int(round(value * scale_factor)) for value in dbu]
+
+
+def _scale_rows(dbu, scale_factor):
+    """Scales (n, 4) DBU rows, returning a new array, see _scale_dbu."""
+    if isinstance(scale_factor, numbers.Integral):
+        return dbu * scale_factor
+    return np.rint(dbu * scale_factor).astype(np.int64)
+
+
+def _rows_to_units(dbu, dbu_per_unit):
+    """Returns (n, 4) DBU rows as lists of floats in user units."""
+    return (dbu / dbu_per_unit).tolist()
+
+
+class Transform:
+    """
+    Transform applied to design coordinates when a view is written.
+    Coordinates are scaled about the origin, mirrored within the scaled
+    design box, then translated. Results follow the same rules as scaling
+    a RectStore: integer factors are exact, and everything else is rounded
+    to the grid.
+
+    Parameters
+    ----------
+    scale : float, optional
+        Scale factor. Default is 1.
+    offset : tuple(float, float), optional
+        (dx, dy) added after scaling and mirroring. Default is (0, 0).
+    mirror : str, optional
+        Axes to mirror about: 'X' flips y-coordinates, 'Y' flips
+        x-coordinates, 'XY' flips both. Default is no mirroring.
+    size : tuple(float, float), optional
+        Unscaled width and height of the design box that mirroring flips
+        within.
+    grid : DBUGrid, optional
+        Grid of the transformed coordinates.
+
+    Attributes
+    ----------
+    scale : float
+    offset : tuple(float, float)
+    mirror : str
+    size : tuple(float, float)
+    grid : DBUGrid
+    """
+    __slots__ = ('scale', 'offset', 'mirror', 'size', 'grid')
+
+    def __init__(self, scale=1, offset=(0, 0), mirror='', size=(0, 0), grid=DEFAULT_GRID):
+        mirror = mirror.upper()
+        if set(mirror) - set('XY'):
+            raise ValueError(f"Unrecognized mirror axes {mirror}; expected 'X', 'Y' or 'XY'.")
+        self.scale = scale
+        self.offset = tuple(offset)
+        self.mirror = mirror
+        self.size = tuple(size)
+        self.grid = grid
+
+    def apply_rows(self, dbu):
+        """
+        Transforms (n, 4) DBU rows of [left_x, bot_y, right_x, top_y].
+
+        Parameters
+        ----------
+        dbu : numpy.ndarray
+            int64 coordinates on grid.
+
+        Returns
+        -------
+        numpy.ndarray
+            New array; the input is not modified.
+        """
+        dbu = dbu.copy()
+        if self.scale != 1:
+            dbu = _scale_rows(dbu, self.scale)
+        for axis in self.mirror:
+            # Mirroring about X flips y-coordinates and swaps bottom and top
+            low, high = (1, 3) if axis == 'X' else (0, 2)
+            extent_dbu = self.grid.to_dbu(self.size[low])
+            if self.scale != 1:
+                extent_dbu = self._scale_value(extent_dbu)
+            dbu[:, [low, high]] = extent_dbu - dbu[:, [high, low]]
+        for col, offset in enumerate(self.offset):
+            dbu[:, col::2] += self.grid.to_dbu(offset)
+        return dbu
+
+    def _scale_value(self, value_dbu):
+        if isinstance(self.scale, numbers.Integral):
+            return value_dbu * self.scale
+        return int(np.rint(value_dbu * self.scale))
+
+    def apply(self, coords):
+        """
+        Transforms one Rectangle's [left_x, bot_y, right_x, top_y], or one
+        Label's [x, y].
+
+        Parameters
+        ----------
+        coords : list[float]
+
+        Returns
+        -------
+        list[float]
+        """
+        values = list(coords) * 2 if len(coords) == 2 else coords
+        dbu = np.array([_values_to_dbu(values, self.grid)], dtype=np.int64)
+        row = _rows_to_units(self.apply_rows(dbu), self.grid.dbu_per_unit)[0]
+        return row[:len(coords)]
+
+    def apply_length(self, length):
+        """Scales a length, e.g. the width of the design. Lengths are not
+        mirrored or translated."""
+        if self.scale == 1:
+            return length
+        return self.grid.to_units(self._scale_value(self.grid.to_dbu(length)))
+
+
+class RectStore:
+    """
+    Column store of the geometry of many Rectangles, e.g. every Rectangle
+    in a PHYDesign.
+
+    The Rectangles given are adopted: their coordinates, layer, purpose and
+    orientation move into the store's arrays and the Rectangle objects
+    become views of one row each. Whole-design operations then run on the
+    arrays instead of on every object.
+
+    Coordinates are stored as integer database units (DBU) of grid, so
+    integer scaling and translation are exact. Fractional scale factors
+    round the results to the grid.
+
+    Parameters
+    ----------
+    rects : Iterable[Rectangle]
+        Rectangles to adopt, in row order. Rectangles held by another
+        store are moved to this one.
+    grid : DBUGrid, optional
+        Grid the coordinates are stored on. Default is 1000 DBU per unit.
+
+    Attributes
+    ----------
+    views : list[Rectangle]
+        Rectangle of each row.
+    grid : DBUGrid
+    dbu : numpy.ndarray
+        (n, 4) int64 array of [left_x, bot_y, right_x, top_y] rows, in DBU.
+    coords
+    layer_codes, purpose_codes, orientation_codes : numpy.ndarray
+        Row codes into the layers, purposes and orientations tables.
+    layers : list[str]
+    purposes : list[list[str]]
+    orientations : list[str, None]
+    """
+    def __init__(self, rects=(), grid=DEFAULT_GRID):
+        self.views = list(rects)
+        self.grid = grid
+        self.layers, self.purposes, self.orientations = [], [], []
+        self._codes = ({}, {}, {})
+        rows = [(rect.dbu if rect.grid == grid else _values_to_dbu(rect.coords, grid), rect.layer, rect.purpose,
+                 rect.orientation) for rect in self.views]
+        self.dbu = np.array([row[0] for row in rows], dtype=np.int64).reshape(-1, 4)
+        self.layer_codes = np.array([self._layer_code(row[1]) for row in rows], dtype=np.int32)
+        self.purpose_codes = np.array([self._purpose_code(row[2]) for row in rows], dtype=np.int32)
+        self.orientation_codes = np.array([self._orientation_code(row[3]) for row in rows], dtype=np.int32)
+        for idx, rect in enumerate(self.views):
+            rect._bind(self, idx)
+
+    def __len__(self):
+        return len(self.views)
+
+    @property
+    def coords(self):
+        """(n, 4) float array of the rows in user units. This is a copy;
+        write coordinates through the Rectangles or set_coords."""
+        return self.dbu / self.grid.dbu_per_unit
+
+    @staticmethod
+    def _intern(table, codes, key, value):
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(table)
+            table.append(value)
+        return code
+
+    def _layer_code(self, layer):
+        return self._intern(self.layers, self._codes[0], layer, layer)
+
+    def _purpose_code(self, purpose):
+        key = tuple(purpose) if isinstance(purpose, list) else purpose
+        return self._intern(self.purposes, self._codes[1], key, purpose)
+
+    def _orientation_code(self, orientation):
+        return self._intern(self.orientations, self._codes[2], orientation, orientation)
+
+    def holds(self, rects):
+        """True if the store's rows are exactly the given Rectangles, in
+        order."""
+        return len(rects) == len(self.views) and all(
+            rect is view and rect._store is self for rect, view in zip(rects, self.views))
+
+    def get_coords(self, idx):
+        return _dbu_to_values(self.dbu[idx].tolist(), self.grid)
+
+    def set_coords(self, idx, coords):
+        self.dbu[idx] = _values_to_dbu(coords, self.grid)
+
+    def get_dbu(self, idx):
+        return self.dbu[idx].tolist()
+
+    def set_dbu(self, idx, dbu):
+        self.dbu[idx] = dbu
+
+    def get_layer(self, idx):
+        return self.layers[self.layer_codes[idx]]
+
+    def set_layer(self, idx, layer):
+        self.layer_codes[idx] = self._layer_code(layer)
+
+    def get_purpose(self, idx):
+        return self.purposes[self.purpose_codes[idx]]
+
+    def set_purpose(self, idx, purpose):
+        self.purpose_codes[idx] = self._purpose_code(purpose)
+
+    def get_orientation(self, idx):
+        return self.orientations[self.orientation_codes[idx]]
+
+    def set_orientation(self, idx, orientation):
+        self.orientation_codes[idx] = self._orientation_code(orientation)
+
+    def iter_rects(self, transform=None):
+        """
+        Yields the layer, purpose and coordinates of every row, converting
+        the arrays to Python values once.
+
+        Parameters
+        ----------
+        transform : Transform, optional
+            Transform applied to the yielded coordinates. The stored rows
+            are not modified.
+
+        Yields
+        ------
+        layer : str
+        purpose : list[str]
+        coords : list[float]
+        """
+        dbu = self.dbu if transform is None else transform.apply_rows(self.dbu)
+        layers = [self.layers[code] for code in self.layer_codes.tolist()]
+        purposes = [self.purposes[code] for code in self.purpose_codes.tolist()]
+        rows = _rows_to_units(dbu, self.grid.dbu_per_unit)
+        yield from zip(layers, purposes, rows)
+
+    def shape_arrays(self, transform=None):
+        """
+        Groups the rows into ShapeArrays of shapes with the same layer,
+        purpose, orientation and size, e.g. the straps of a power grid, in
+        order of first row.
+
+        Parameters
+        ----------
+        transform : Transform, optional
+            Transform applied to the rows before grouping. The stored rows
+            are not modified.
+
+        Returns
+        -------
+        list[ShapeArray]
+        """
+        dbu = self.dbu if transform is None else transform.apply_rows(self.dbu)
+        codes = np.column_stack([self.layer_codes, self.purpose_codes, self.orientation_codes])
+
+        def make_template(row, width, height):
+            return ShapeTemplate(self.get_layer(row), width, height, self.get_orientation(row), self.get_purpose(row),
+                                 self.grid)
+
+        return _shape_arrays(dbu, codes, self.grid, make_template)
+
+    def scale(self, scale_factor):
+        """
+        Scales every row by scale factor, with the same results as scaling
+        each Rectangle. Integer factors are exact; other factors round the
+        results to the grid.
+
+        Parameters
+        ----------
+        scale_factor : float
+            Factor by which to scale all coordinates.
+
+        Returns
+        -------
+
+        """
+        self.dbu = _scale_rows(self.dbu, scale_factor)
+
+    def translate(self, dx=0, dy=0):
+        """
+        Moves every row by (dx, dy).
+
+        Parameters
+        ----------
+        dx : float
+            Offset added to the x-coordinates.
+        dy : float
+            Offset added to the y-coordinates.
+
+        Returns
+        -------
+
+        """
+        self.dbu[:, 0::2] += self.grid.to_dbu(dx)
+        self.dbu[:, 1::2] += self.grid.to_dbu(dy)
+
+    def bbox(self, layer=None):
+        """
+        Bounding box of all rows, or of the rows on one layer.
+
+        Parameters
+        ----------
+        layer : str, optional
+            Only consider Rectangles on this layer.
+
+        Returns
+        -------
+        list[float]
+            [left_x, bot_y, right_x, top_y], or None if there are no
+            matching rows.
+        """
+        dbu = self.dbu
+        if layer is not None:
+            code = self._codes[0].get(layer)
+            if code is None:
+                return None
+            dbu = dbu[self.layer_codes == code]
+        if not len(dbu):
+            return None
+        return [self.grid.to_units(int(value)) for value in
+                (dbu[:, 0].min(), dbu[:, 1].min(), dbu[:, 2].max(), dbu[:, 3].max())]
+
+
+class _StoredField:
+    """Rectangle attribute that is kept on the Rectangle until a RectStore
+    adopts it, and in the store's columns after that."""
+    def __set_name__(self, owner, name):
+        self.attr = '_' + name
+        self.getter = 'get_' + name
+        self.setter = 'set_' + name
+
+    def __get__(self, rect, owner=None):
+        if rect is None:
+            return self
+        if rect._store is None:
+            return getattr(rect, self.attr)
+        return getattr(rect._store, self.getter)(rect._index)
+
+    def __set__(self, rect, value):
+        if rect._store is None:
+            setattr(rect, self.attr, value)
+        else:
+            getattr(rect._store, self.setter)(rect._index, value)
+
+
 class Rectangle:
     """
     Representation of a physical rectangle object.
@@ -21,6 +422,9 @@ class Rectangle:
         Orientation of the rectangle.
     purpose : str
         Layer purpose of the rectangle.
+    grid : DBUGrid, optional
+        Grid the coordinates are stored on, normally the grid of the
+        design the rectangle belongs to. Default is 1000 DBU per unit.
 
     Attributes
     ----------
@@ -31,22 +435,68 @@ class Rectangle:
     coords : list[float]
         Rectangle coordinates. List follows the format of [left_x, bot_y,
         right_x, top_y].
+    dbu : list[int]
+        Rectangle coordinates in DBU of grid.
     purpose : str
         Layer purpose of the rectangle.
     orientation : {'horizontal', 'vertical'}
         Orientation of the rectangle.
+    grid : DBUGrid
+
+    Coordinates are kept in DBU and only converted to user units when
+    coords is read. Once a RectStore adopts the rectangle, the attributes
+    above are views of its row in the store.
 
     """
-    def __init__(self, layer, left_x, bot_y, right_x, top_y, orientation=None, purpose=['drawing']):
-        self.layer = layer
-        # Fixme: May want to change these rounding precisions to be a parameter
-        self.coords = [round(left_x, 3), round(bot_y, 3), round(right_x, 3), round(top_y, 3)]
-        self.purpose = purpose
+    __slots__ = ('_store', '_index', '_layer', '_dbu', '_purpose', '_orientation', 'grid')
+    layer = _StoredField()
+    dbu = _StoredField()
+    purpose = _StoredField()
+    orientation = _StoredField()
+
+    def __init__(self, layer, left_x, bot_y, right_x, top_y, orientation=None, purpose=['drawing'], grid=DEFAULT_GRID):
+        self._store = None
+        self._index = None
+        self.grid = grid
+        self.layer = _intern_name(layer)
+        self.dbu = _values_to_dbu((left_x, bot_y, right_x, top_y), grid)
+        self.purpose = _intern_purpose(purpose)
         self.orientation = orientation
 
+    @classmethod
+    def _from_dbu(cls, layer, dbu, orientation, purpose, grid):
+        """Returns a Rectangle with coordinates already in DBU of grid."""
+        rect = cls.__new__(cls)
+        rect._store = rect._index = None
+        rect.grid = grid
+        rect.layer = layer
+        rect.dbu = dbu
+        rect.purpose = purpose
+        rect.orientation = orientation
+        return rect
+
+    def _bind(self, store, idx):
+        """Makes the rectangle a view of row idx of store."""
+        self._store = store
+        self._index = idx
+        self.grid = store.grid
+        self._layer = self._dbu = self._purpose = self._orientation = None
+
+    @property
+    def coords(self):
+        if self._store is not None:
+            return self._store.get_coords(self._index)
+        return _dbu_to_values(self._dbu, self.grid)
+
+    @coords.setter
+    def coords(self, coords):
+        if self._store is not None:
+            self._store.set_coords(self._index, coords)
+        else:
+            self._dbu = _values_to_dbu(coords, self.grid)
+
     def scale(self, scale_factor):
-        coord_arr = np.asarray(self.coords) * scale_factor
-        self.coords = coord_arr.tolist()
+        self.dbu = _scale_dbu(self.dbu, scale_factor)
 
     @property
     def centroid(self):
@@ -57,7 +507,8 @@ class Rectangle:
         tuple(float, float)
             Coordinates of the rectangle's centroid.
         """
-        return (round((self.coords[0] + self.coords[2]) / 2, 3), round((self.coords[1] + self.coords[3]) / 2, 3))
+        dbu = self.dbu
+        return (self.grid.to_units(round((dbu[0] + dbu[2]) / 2)), self.grid.to_units(round((dbu[1] + dbu[3]) / 2)))
 
     @property
     def center(self):
@@ -92,6 +543,8 @@ class Label:
         Coordinates for label location.
     show : bool
         True if label to actually be drawn. Default is True.
+    grid : DBUGrid, optional
+        Grid the position is stored on. Default is 1000 DBU per unit.
 
     Attributes
     ----------
@@ -99,16 +552,30 @@ class Label:
     purpose : str
     layer : str
     coords : list[float, float]
+    dbu : list[int]
+        Position in DBU of grid.
     show : bool
+    grid : DBUGrid
 
     """
-    def __init__(self, text, layer, position, show=True):
+    __slots__ = ('text', 'purpose', 'layer', 'dbu', 'show', 'grid')
+
+    def __init__(self, text, layer, position, show=True, grid=DEFAULT_GRID):
         self.text = text
-        self.purpose = ['label']
-        self.layer = layer
-        self.coords = [round(position[0], 3), round(position[1], 3)]
+        self.purpose = _intern_purpose(['label'])
+        self.layer = _intern_name(layer)
+        self.grid = grid
+        self.dbu = _values_to_dbu(position[:2], grid)
         self.show = show
 
+    @property
+    def coords(self):
+        return _dbu_to_values(self.dbu, self.grid)
+
+    @coords.setter
+    def coords(self, coords):
+        self.dbu = _values_to_dbu(coords, self.grid)
+
     def scale(self, scale_factor):
         """
         Scales location coordinates by given scale factor.
@@ -122,8 +589,191 @@ class Label:
         -------
 
         """
-        coord_arr = np.asarray(self.coords) * scale_factor
-        self.coords = coord_arr.tolist()
+        self.dbu = _scale_dbu(self.dbu, scale_factor)
+
+
+class ShapeTemplate:
+    """
+    Layer, purpose, size and orientation shared by repeated shapes, e.g.
+    the pin shape of every bit of a bus. Placing the template at an offset
+    gives the Rectangle whose lower-left corner is at that offset.
+
+    Parameters
+    ----------
+    layer : str
+        Layout layer the shapes exist on.
+    width : float
+        X dimension of the shapes.
+    height : float
+        Y dimension of the shapes.
+    orientation : {'horizontal', 'vertical'}, optional
+        Orientation of the shapes.
+    purpose : list[str], optional
+        Layer purpose of the shapes. Default is ['drawing'].
+    grid : DBUGrid, optional
+        Grid the size is stored on. Default is 1000 DBU per unit.
+
+    Attributes
+    ----------
+    layer : str
+    width : float
+    height : float
+    dbu : list[int]
+        [width, height] in DBU of grid.
+    orientation : {'horizontal', 'vertical'}
+    purpose : list[str]
+    grid : DBUGrid
+    """
+    __slots__ = ('layer', 'dbu', 'orientation', 'purpose', 'grid')
+
+    def __init__(self, layer, width, height, orientation=None, purpose=['drawing'], grid=DEFAULT_GRID):
+        self.layer = _intern_name(layer)
+        self.grid = grid
+        self.dbu = _values_to_dbu((width, height), grid)
+        self.orientation = orientation
+        self.purpose = _intern_purpose(purpose)
+
+    @property
+    def width(self):
+        return self.grid.to_units(self.dbu[0])
+
+    @property
+    def height(self):
+        return self.grid.to_units(self.dbu[1])
+
+    def _key(self):
+        return (self.layer, self.width, self.height, self.orientation, tuple(self.purpose))
+
+    def __eq__(self, other):
+        return isinstance(other, ShapeTemplate) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def rect(self, left_x, bot_y):
+        """Returns the Rectangle of the template placed with its lower-left
+        corner at (left_x, bot_y)."""
+        left, bot = _values_to_dbu((left_x, bot_y), self.grid)
+        width, height = self.dbu
+        return Rectangle._from_dbu(self.layer, [left, bot, left + width, bot + height], self.orientation,
+                                   self.purpose, self.grid)
+
+
+class ShapeArray:
+    """
+    One ShapeTemplate placed at many offsets, e.g. the bits of a bus or the
+    straps of a power grid. The offsets are kept as one (n, 2) DBU array
+    instead of one Rectangle per shape, so writers can emit the template
+    once and place it per offset.
+
+    Parameters
+    ----------
+    template : ShapeTemplate
+        Shape placed at every offset.
+    offsets : Iterable[tuple(float, float)]
+        Lower-left corner of each shape.
+    grid : DBUGrid, optional
+        Grid the offsets are stored on. Default is 1000 DBU per unit.
+    scale_factors : Iterable[float], optional
+        Factors the shapes are scaled by, in order, when their coordinates
+        are read. Results are the same as scaling the Rectangles.
+
+    Attributes
+    ----------
+    template : ShapeTemplate
+    grid : DBUGrid
+    scale_factors : list[float]
+    dbu : numpy.ndarray
+        (n, 2) int64 array of [left_x, bot_y] rows, in DBU.
+    offsets
+    """
+    def __init__(self, template, offsets=(), grid=DEFAULT_GRID, scale_factors=()):
+        offsets = [tuple(offset) for offset in offsets]
+        self.template = template
+        self.grid = grid
+        self.scale_factors = list(scale_factors)
+        self.dbu = grid.to_dbu_array(offsets).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.dbu)
+
+    @property
+    def offsets(self):
+        """Offsets as [left_x, bot_y] lists of floats, before scaling."""
+        return _rows_to_units(self.dbu, self.grid.dbu_per_unit)
+
+    def rows(self, transform=None):
+        """
+        Returns the (n, 4) DBU rows of [left_x, bot_y, right_x, top_y] of
+        every shape, with the scale factors and transform applied.
+
+        Parameters
+        ----------
+        transform : Transform, optional
+            Transform applied after the scale factors.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        template = self.template
+        if template.grid == self.grid:
+            size = template.dbu
+        else:
+            size = _values_to_dbu((template.width, template.height), self.grid)
+        dbu = np.hstack([self.dbu, self.dbu + size])
+        for scale_factor in self.scale_factors:
+            dbu = _scale_rows(dbu, scale_factor)
+        if transform is not None:
+            dbu = transform.apply_rows(dbu)
+        return dbu
+
+    def iter_coords(self, transform=None):
+        """Yields the [left_x, bot_y, right_x, top_y] of every shape, see
+        rows."""
+        yield from _rows_to_units(self.rows(transform), self.grid.dbu_per_unit)
+
+    def instances(self, transform=None):
+        """
+        Returns the shapes with the scale factors and transform applied, as
+        ShapeArrays without scale factors. Fractional scaling rounds each
+        shape to the grid, which can leave shapes a DBU apart in size; those
+        are split into separate arrays.
+
+        Parameters
+        ----------
+        transform : Transform, optional
+
+        Returns
+        -------
+        list[ShapeArray]
+        """
+        template = self.template
+        dbu = self.rows(transform)
+        codes = np.zeros((len(dbu), 1), dtype=np.int64)
+        return _shape_arrays(dbu, codes, self.grid,
+                             lambda row, width, height: ShapeTemplate(template.layer, width, height,
+                                                                      template.orientation, template.purpose,
+                                                                      self.grid))
+
+
+def _shape_arrays(dbu, codes, grid, make_template):
+    """Groups (n, 4) DBU rows into ShapeArrays of rows with equal codes and
+    size, in order of first row. make_template(row, width, height) returns
+    the template of the group starting at row."""
+    size = dbu[:, 2:] - dbu[:, :2]
+    keys = np.column_stack([codes, size])
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    arrays = []
+    for group in np.argsort(first, kind='stable'):
+        rows = np.flatnonzero(inverse == group)
+        width, height = _rows_to_units(size[rows[0]], grid.dbu_per_unit)
+        array = ShapeArray(make_template(rows[0], width, height), grid=grid)
+        array.dbu = dbu[rows, :2]
+        arrays.append(array)
+    return arrays
+
 
 class PHYObject:
     """
@@ -146,12 +796,21 @@ class PHYObject:
         that ths object contains.
     rects : dict
         Dictionary of Rectangle objects. Keyed by center coordinate value.
+    spatial_index : SpatialIndex
+        Index that Rectangles are added to as they are created, set when
+        the object is indexed by its design. None if not indexed.
+    grid : DBUGrid
+        Grid of the Rectangles and Labels the object creates.
     """
-    def __init__(self, name):
+    __slots__ = ('name', 'purpose', 'phys_objs', 'rects', 'spatial_index', 'grid')
+
+    def __init__(self, name, grid=DEFAULT_GRID):
         self.name = name
         self.purpose = None
         self.phys_objs = []
         self.rects = {}
+        self.spatial_index = None
+        self.grid = grid
 
     def add_rect(self, layer, left_x=0, bot_y=0, right_x=0, top_y=0, purpose=['drawing']):
         """
@@ -175,9 +834,11 @@ class PHYObject:
         -------
 
         """
-        rect_obj = Rectangle(layer, left_x, bot_y, right_x, top_y, purpose=purpose)
+        rect_obj = Rectangle(layer, left_x, bot_y, right_x, top_y, purpose=purpose, grid=self.grid)
         self.phys_objs.append(rect_obj)
         self.rects[rect_obj.centroid] = rect_obj
+        if self.spatial_index is not None:
+            self.spatial_index.add_rect(rect_obj)
 
     def scale(self, scale_factor):
         """
@@ -221,6 +882,9 @@ class PHYPortPin(PHYObject):
         Index of bus element that this pin represents. This is only needed
         if the pin is part of a bus. This index is appended onto the name
         of the pin for labeling.
+    grid : DBUGrid, optional
+        Grid of the pin's Rectangles and Labels, normally the design grid.
+        Default is 1000 DBU per unit.
 
     Attributes
     ----------
@@ -255,12 +919,15 @@ class PHYPortPin(PHYObject):
     labels : list[Label]
         List of Label objects associated with this pin object.
     """
-    def __init__(self, pin_dict, layer, side, x_width, y_width, center=None, bus_idx=None):
-        super().__init__(pin_dict['name'])
+    __slots__ = ('pin_dict', 'direction', 'layer', 'side', 'x_width', 'y_width', 'center', 'related_power_pin',
+                 'related_ground_pin', 'bus_idx', 'block_structure', 'labels')
+
+    def __init__(self, pin_dict, layer, side, x_width, y_width, center=None, bus_idx=None, grid=DEFAULT_GRID):
+        super().__init__(pin_dict['name'], grid)
 
         self.pin_dict = pin_dict
         self.direction = pin_dict['direction']
-        self.layer = layer
+        self.layer = _intern_name(layer)
         self.side = side
         self.x_width = x_width
         self.y_width = y_width
@@ -299,14 +966,15 @@ class PHYPortPin(PHYObject):
         -------
 
         """
-        right_x = left_x + self.x_width
-        top_y = bot_y + self.y_width
         orientation = 'horizontal' if self.side in ['left', 'right'] else 'vertical'
-        rect_obj = Rectangle(layer, left_x, bot_y, right_x, top_y, orientation, purpose=purpose)
+        template = ShapeTemplate(layer, self.x_width, self.y_width, orientation, purpose, self.grid)
+        rect_obj = template.rect(left_x, bot_y)
         if rect_obj.center not in self.rects.keys():
             self.phys_objs.append(rect_obj)
             self.rects[rect_obj.center] = rect_obj
-            self.add_label(layer, ((right_x + left_x) / 2, (top_y + bot_y) / 2))
+            self.add_label(layer, rect_obj.centroid)
+            if self.spatial_index is not None:
+                self.spatial_index.add_rect(rect_obj)
 
     def add_label(self, layer, position):
         """
@@ -323,10 +991,333 @@ class PHYPortPin(PHYObject):
         -------
 
         """
-        label_obj = Label(self.name, layer, position, show=True)
+        label_obj = Label(self.name, layer, position, show=True, grid=self.grid)
         self.phys_objs.append(label_obj)
         self.labels.append(label_obj)
 
+    @property
+    def n_bits(self):
+        """Number of bits this pin object represents."""
+        return 1
+
+
+class PHYBusPin:
+    """
+    Bus Port Pin object representing every bit of a bus without creating a
+    PHYPortPin per bit.
+
+    Every bit has the same pin shape, so the bus keeps one ShapeTemplate
+    and placement only records the lower-left corner of each placed bit.
+    The per-bit PHYPortPin objects (with their Rectangles and Labels) are
+    created the first time they are needed, e.g. by a view writer, so a
+    wide bus costs a handful of numbers until then. Writers that handle
+    ShapeArrays read the bits' shapes from shape_array without creating
+    them. Scaling applied before the bits exist is replayed on them when
+    they are created.
+
+    Parameters
+    ----------
+    pin_dict : dict
+        Pin descriptor dictionary of the bus. Must contain bus_max, and
+        may contain bus_min (default 0).
+    layer : str
+        Layer the pin shapes exist on.
+    side : str
+        Side of the design that the pins should exist on.
+    x_width : float
+        X dimension width of each bit's pin shape.
+    y_width : float
+        Y dimension width of each bit's pin shape.
+    grid : DBUGrid, optional
+        Grid of the bits' shapes, normally the design grid. Default is 1000
+        DBU per unit.
+
+    Attributes
+    ----------
+    pin_dict : dict
+        Pin descriptor dictionary of the bus.
+    name : str
+        Name of the bus, without an index.
+    direction : {'input', 'output', 'inout'}
+        Port direction of the bus.
+    layer : str
+    side : str
+    x_width : float
+    y_width : float
+    related_power_pin : str
+    related_ground_pin : str
+    bus_min : int
+        Lowest bus index.
+    bus_max : int
+        Highest bus index.
+    n_placed : int
+        Number of bits placed so far. Bits are placed in ascending index
+        order.
+    spatial_index : SpatialIndex
+        Index that placed bits are added to, with the bus as their item,
+        set when the bus is indexed by its design. None if not indexed.
+    grid : DBUGrid
+    template
+    shape_array
+    """
+    def __init__(self, pin_dict, layer, side, x_width, y_width, grid=DEFAULT_GRID):
+        self.name = pin_dict['name']
+        self.purpose = None
+        self.pin_dict = pin_dict
+        self.direction = pin_dict['direction']
+        self.layer = layer
+        self.side = side
+        self.x_width = x_width
+        self.y_width = y_width
+        self.related_power_pin = pin_dict.get('power_pin', None)
+        self.related_ground_pin = pin_dict.get('ground_pin', None)
+        bus_max = pin_dict['bus_max']
+        bus_min = pin_dict.get('bus_min', 0)
+        self.bus_min = min(bus_min, bus_max)
+        self.bus_max = max(bus_min, bus_max)
+        self.n_placed = 0
+        self._offsets = []
+        self._scale_factors = []
+        self._bits = None
+        self.spatial_index = None
+        self.grid = grid
+
+    @property
+    def n_bits(self):
+        """Number of bits in the bus."""
+        return self.bus_max - self.bus_min + 1
+
+    @property
+    def placed(self):
+        """True if every bit of the bus has been placed."""
+        return self.n_placed == self.n_bits
+
+    @property
+    def bus_indices(self):
+        """Bus indices in placement order."""
+        return range(self.bus_min, self.bus_max + 1)
+
+    @property
+    def template(self):
+        """ShapeTemplate of the pin shape of every bit, before scaling."""
+        orientation = 'horizontal' if self.side in ['left', 'right'] else 'vertical'
+        return ShapeTemplate(self.layer, self.x_width, self.y_width, orientation, ['drawing', 'pin'], self.grid)
+
+    @property
+    def shape_array(self):
+        """ShapeArray of the pin shapes of the placed bits, carrying the
+        scale factors recorded before the bits were created. Does not
+        create the bits."""
+        return ShapeArray(self.template, self._offsets, self.grid, self._scale_factors)
+
+    def iter_labels(self):
+        """Yields the Label of every placed bit, scaled like the bits'
+        Labels would be. Does not create the bits."""
+        template = self.template
+        for bus_idx, offset in zip(self.bus_indices, self._offsets):
+            label = Label(self.bit_name(bus_idx), self.layer, template.rect(*offset).centroid, grid=self.grid)
+            for scale_factor in self._scale_factors:
+                label.scale(scale_factor)
+            yield label
+
+    def bit_name(self, bus_idx):
+        return self.name + f'[{bus_idx}]'
+
+    def unplaced_bit_names(self):
+        """Returns the names of the bits that have not been placed."""
+        return [self.bit_name(bus_idx) for bus_idx in self.bus_indices[self.n_placed:]]
+
+    def place_bit(self, layer, left_x, bot_y):
+        """
+        Places the next unplaced bit of the bus by recording its lower-left
+        corner. No objects are created.
+
+        Parameters
+        ----------
+        layer : str
+            Layout layer of the bit's pin shape. Must be the layer of the
+            bus, as every bit shares its template.
+        left_x : float
+            X-coordinate of the left edge.
+        bot_y : float
+            Y-coordinate of the bottom edge.
+
+        Returns
+        -------
+
+        """
+        if self.placed:
+            raise IndexError(f"All bits of bus {self.name} are already placed.")
+        if layer != self.layer:
+            raise ValueError(f"Bits of bus {self.name} must be placed on {self.layer}, not {layer}.")
+        self._offsets.append((left_x, bot_y))
+        self.n_placed += 1
+        self._bits = None
+        if self.spatial_index is not None:
+            rect = self.template.rect(left_x, bot_y)
+            for scale_factor in self._scale_factors:
+                rect.scale(scale_factor)
+            self.spatial_index.insert(self.layer, rect.coords, self)
+
+    @property
+    def bits(self):
+        """
+        Per-bit PHYPortPin objects, in ascending index order. They are
+        created on first access.
+
+        Returns
+        -------
+        list[PHYPortPin]
+        """
+        if self._bits is None:
+            bits = []
+            for bit_no, bus_idx in enumerate(self.bus_indices):
+                bit = PHYPortPin(self.pin_dict, self.layer, self.side, self.x_width, self.y_width, bus_idx=bus_idx,
+                                 grid=self.grid)
+                if bit_no < self.n_placed:
+                    left_x, bot_y = self._offsets[bit_no]
+                    bit.add_rect(self.layer, left_x=left_x, bot_y=bot_y)
+                for scale_factor in self._scale_factors:
+                    bit.scale(scale_factor)
+                bits.append(bit)
+            self._bits = bits
+        return self._bits
+
+    @property
+    def phys_objs(self):
+        """Physical objects of all bits. Creates the bits."""
+        return [phy_obj for bit in self.bits for phy_obj in bit.phys_objs]
+
+    @property
+    def rects(self):
+        """Rectangle objects of all placed bits, keyed by center
+        coordinate. Creates the bits."""
+        return {center: rect for bit in self.bits for center, rect in bit.rects.items()}
+
+    def scale(self, scale_factor):
+        """
+        Scales all bits of the bus by scale factor. If the bits have not
+        been created yet, the factor is recorded and applied when they are.
+
+        Parameters
+        ----------
+        scale_factor : float
+            Factor by which to scale all physical objects in this bus.
+
+        Returns
+        -------
+
+        """
+        if self._bits is None:
+            self._scale_factors.append(scale_factor)
+        else:
+            for bit in self._bits:
+                bit.scale(scale_factor)
+
+
+def collect_geometry(phys_objs, create_bits=True):
+    """
+    Collects the Rectangles and Labels of an iterable of physical objects,
+    in the order the view writers visit them.
+
+    Parameters
+    ----------
+    phys_objs : Iterable
+        PHYObjects, PHYBusPins, Rectangles and Labels.
+    create_bits : bool, optional
+        If False, the bits of PHYBusPins that have not been created are not
+        created; those buses are returned separately instead. Default is
+        True.
+
+    Returns
+    -------
+    rects : list[Rectangle]
+    labels : list[Label]
+    lazy_buses : list[PHYBusPin]
+        Buses whose bits were not created.
+    """
+    rects, labels, lazy_buses = [], [], []
+    stack = [iter(phys_objs)]
+    while stack:
+        for obj in stack[-1]:
+            if isinstance(obj, Rectangle):
+                rects.append(obj)
+            elif isinstance(obj, Label):
+                labels.append(obj)
+            elif isinstance(obj, PHYBusPin) and obj._bits is None and not create_bits:
+                lazy_buses.append(obj)
+            else:
+                children = obj.bits if isinstance(obj, PHYBusPin) else obj.phys_objs
+                stack.append(iter(children))
+                break
+        else:
+            stack.pop()
+    return rects, labels, lazy_buses
+
+
+def index_objects(phys_objs, spatial_index):
+    """
+    Adds the geometry of physical objects to a SpatialIndex, and has the
+    objects add any geometry they create later to it too.
+
+    Rectangles are indexed as themselves. The placed bits of a PHYBusPin
+    whose bits have not been created are indexed from its ShapeArray, with
+    the bus as their item; the bits are not created.
+
+    Parameters
+    ----------
+    phys_objs : Iterable
+        PHYObjects, PHYBusPins, Rectangles and Labels.
+    spatial_index : SpatialIndex
+
+    Returns
+    -------
+
+    """
+    stack = [iter(phys_objs)]
+    while stack:
+        for obj in stack[-1]:
+            if isinstance(obj, Rectangle):
+                spatial_index.add_rect(obj)
+            elif isinstance(obj, Label):
+                continue
+            elif isinstance(obj, PHYBusPin) and obj._bits is None:
+                obj.spatial_index = spatial_index
+                for coords in obj.shape_array.iter_coords():
+                    spatial_index.insert(obj.layer, coords, obj)
+            else:
+                obj.spatial_index = spatial_index
+                stack.append(iter(obj.bits if isinstance(obj, PHYBusPin) else obj.phys_objs))
+                break
+        else:
+            stack.pop()
+
+
+def n_bits(pins):
+    """Total number of bits in an iterable of PHYPortPin and PHYBusPin
+    objects."""
+    return sum(pin.n_bits for pin in pins)
+
+
+def expand_bus_pins(pins):
+    """
+    Yields the PHYPortPin objects of an iterable of pins, replacing each
+    PHYBusPin by its bits.
+
+    Parameters
+    ----------
+    pins : Iterable[PHYPortPin, PHYBusPin]
+
+    Yields
+    ------
+    PHYPortPin
+    """
+    for pin in pins:
+        if isinstance(pin, PHYBusPin):
+            yield from pin.bits
+        else:
+            yield pin
+
 
 class PHYDesign:
     """Python representation of a PHY Design. Right now this just consumes
@@ -368,7 +1359,11 @@ class PHYDesign:
         Top-level y-coordinate width of design.
     polygons : dict
         Flat hierarchy dictionary of polygons in design.
+    transform : Transform
+        Transform the view writers apply to the design's coordinates. None
+        for a design; see view.
     """
+    transform = None
 
     def __init__(self, verilog_module, techfile, spec_dict=None):
         self.verilog_pin_dict = verilog_module.pins
@@ -385,6 +1380,8 @@ class PHYDesign:
             raise ValueError(f"Unrecognized File Type .{filetype}")
 
         self.spec_dict = spec_dict
+        self._rect_store = None
+        self._spatial_index = None
         self.pins = []
         self.pg_pins = []
         self.phys_objs = []
@@ -419,7 +1416,12 @@ class PHYDesign:
         # self.aspect_ratio = self.specs_dict.get('aspect_ratio', None)
         self.polygons = {'pins': self.pins,
                          'pg_pins': self.pg_pins}
-        self.sig_figs = int(-(np.log10(self.specs['units']) - np.log10(self.specs['precision'])))
+        self.sig_figs = self.grid.decimals
+
+    @property
+    def grid(self):
+        """DBUGrid implied by the units and precision specs."""
+        return DBUGrid(self.specs['units'], self.specs['precision'])
 
     def _extract_tech_json_info(self, techfile):
         """
@@ -488,14 +1490,14 @@ class PHYDesign:
                         'is_analog': False}
         pwr_pin = PHYPortPin(pwr_pin_dict, pwr_pin_specs['layer'],
                              pwr_pin_specs['side'],
-                             round(pwr_pin_specs['xwidth'], 3),
-                             round(pwr_pin_specs['ywidth'], 3),
-                             center=pg_pin_specs['pwr_pin'].get('center', None))
+                             self.grid.snap(pwr_pin_specs['xwidth']),
+                             self.grid.snap(pwr_pin_specs['ywidth']),
+                             center=pg_pin_specs['pwr_pin'].get('center', None), grid=self.grid)
         gnd_pin = PHYPortPin(gnd_pin_dict, pg_pin_specs['gnd_pin']['layer'],
                              pg_pin_specs['gnd_pin']['side'],
-                             round(pg_pin_specs['gnd_pin']['xwidth'], 3),
-                             round(pg_pin_specs['gnd_pin']['ywidth'], 3),
-                             center=pg_pin_specs['gnd_pin'].get('center', None))
+                             self.grid.snap(pg_pin_specs['gnd_pin']['xwidth']),
+                             self.grid.snap(pg_pin_specs['gnd_pin']['ywidth']),
+                             center=pg_pin_specs['gnd_pin'].get('center', None), grid=self.grid)
         pwr_pin.type = 'POWER'
         gnd_pin.type = 'GROUND'
         self.pg_pins['pwr'] = pwr_pin
@@ -545,29 +1547,181 @@ class PHYDesign:
                     x_width = 'x_width', self.specs['pins']['pin_length']
                     y_width = 'y_width', self.metals[layer]['min_width']
             if pin_info.get('is_bus', None):
-                self.n_inputs += (direction == 'input') * (pin_info['bus_max'] + 1)
-                self.n_outputs += (direction == 'output') * (pin_info['bus_max'] + 1)
-                for pin in range(pin_info['bus_max'] + 1):
-                    self.pins[pin_name + '[' + str(pin) + ']'] = PHYPortPin(pin_info, layer, side, round(x_width, 3),
-                                                                            round(y_width, 3),
-                                                                            bus_idx=pin)
+                bus_pin = PHYBusPin(pin_info, layer, side, self.grid.snap(x_width), self.grid.snap(y_width), self.grid)
+                self.n_inputs += (direction == 'input') * bus_pin.n_bits
+                self.n_outputs += (direction == 'output') * bus_pin.n_bits
+                self.pins[pin_name] = bus_pin
             else:
                 self.n_inputs += direction == 'input'
                 self.n_outputs += direction == 'output'
-                self.pins[pin_name] = PHYPortPin(pin_info, layer, side, round(x_width, 3), round(y_width, 3))
+                self.pins[pin_name] = PHYPortPin(pin_info, layer, side, self.grid.snap(x_width),
+                                                 self.grid.snap(y_width), grid=self.grid)
         self.phys_objs += list(self.pins.values())
 
     def define_design_boundaries(self):
         pass
 
+    def _sync_rect_store(self, rects):
+        """Returns the design's RectStore, rebuilding it if rects are not
+        exactly its rows."""
+        store = getattr(self, '_rect_store', None)
+        if store is None or not store.holds(rects):
+            store = RectStore(rects, self.grid)
+            self._rect_store = store
+        return store
+
+    def collect_geometry(self):
+        """
+        Collects the geometry of the whole design, creating any bus bits
+        that do not exist yet.
+
+        Returns
+        -------
+        rect_store : RectStore
+            Store holding every Rectangle of the design in writer order.
+            Rectangles added since the last call are adopted.
+        labels : list[Label]
+        """
+        rects, labels, _ = collect_geometry(self.phys_objs)
+        return self._sync_rect_store(rects), labels
+
+    def collect_shapes(self):
+        """
+        Collects the geometry of the whole design without creating bus
+        bits, for writers that place the ShapeArrays of buses themselves.
+
+        Returns
+        -------
+        rect_store : RectStore
+            Store holding every Rectangle of the design in writer order,
+            except those of bus bits that have not been created.
+        labels : list[Label]
+        buses : list[PHYBusPin]
+            Buses whose bits have not been created, see
+            PHYBusPin.shape_array.
+        """
+        rects, labels, buses = collect_geometry(self.phys_objs, create_bits=False)
+        return self._sync_rect_store(rects), labels, buses
+
+    @property
+    def rect_store(self):
+        """RectStore holding every Rectangle of the design, see
+        collect_geometry."""
+        return self.collect_geometry()[0]
+
+    @property
+    def spatial_index(self):
+        """
+        SpatialIndex of the geometry of the design, for window and
+        nearest-shape queries, see index_objects. It is built on first
+        access. After that, objects add the shapes they create to it, and
+        only objects appended to phys_objs since the last access are
+        walked. Scaling the design re-indexes it.
+
+        Returns
+        -------
+        SpatialIndex
+        """
+        index = getattr(self, '_spatial_index', None)
+        if index is None:
+            index = self._spatial_index = SpatialIndex()
+            self._n_indexed = 0
+        if self._n_indexed < len(self.phys_objs):
+            index_objects(self.phys_objs[self._n_indexed:], index)
+            self._n_indexed = len(self.phys_objs)
+        return index
+
     def scale(self, scale_factor = 1):
-        scaled = []
-        for obj in self.phys_objs:
-            obj.scale(scale_factor)
+        # Rectangles are scaled in one pass over the design's RectStore. Bus
+        # bits that have not been created are left to record the factor.
+        rect_store, labels, lazy_buses = self.collect_shapes()
+        rect_store.scale(scale_factor)
+        for label in labels:
+            label.scale(scale_factor)
+        for bus in lazy_buses:
+            bus.scale(scale_factor)
+        index = getattr(self, '_spatial_index', None)
+        if index is not None:
+            index.clear()
+            index_objects(self.phys_objs, index)
+            self._n_indexed = len(self.phys_objs)
 
         try:
             self.x_width = self.specs['x_width']
             self.y_width = self.specs['y_width']
         except KeyError:
-            self.x_width = round(self.x_width * scale_factor, 3)
-            self.y_width = round(self.y_width * scale_factor, 3)
+            self.x_width = self.grid.snap(self.x_width * scale_factor)
+            self.y_width = self.grid.snap(self.y_width * scale_factor)
+
+    def view(self, scale=1, offset=(0, 0), mirror=''):
+        """
+        Returns a view of the design that the view writers write with a
+        Transform applied, without modifying the design. Any number of
+        views can be written from one placed design.
+
+        Parameters
+        ----------
+        scale : float, optional
+            Scale factor. Default is 1.
+        offset : tuple(float, float), optional
+            (dx, dy) added to every coordinate after scaling and mirroring.
+        mirror : str, optional
+            Axes to mirror about within the design box, 'X', 'Y' or 'XY'.
+            Each axis must be allowed by the design's symmetry spec.
+
+        Returns
+        -------
+        PHYDesignView
+        """
+        symmetry = str(self.specs.get('symmetry', '')).upper().split()
+        for axis in mirror.upper():
+            if axis not in symmetry:
+                raise ValueError(f"Cannot mirror {self.name} about {axis}; its symmetry is "
+                                 f"'{self.specs.get('symmetry', '')}'.")
+        return PHYDesignView(self, Transform(scale, offset, mirror, (self.x_width, self.y_width), self.grid))
+
+
+class PHYDesignView:
+    """
+    Read-only view of a PHYDesign with a Transform. View writers (LEF and
+    GDS) apply the transform to every coordinate as they write, so the
+    design's geometry is neither copied nor modified.
+
+    Attributes other than the ones below are read from the design.
+
+    Parameters
+    ----------
+    design : PHYDesign
+    transform : Transform
+
+    Attributes
+    ----------
+    design : PHYDesign
+    transform : Transform
+    specs : dict
+        Copy of the design specs with design_boundary, bound_box and
+        internal_box transformed.
+    x_width
+    y_width
+    """
+    def __init__(self, design, transform):
+        self.design = design
+        self.transform = transform
+        self.specs = dict(design.specs)
+        if 'design_boundary' in self.specs:
+            self.specs['design_boundary'] = tuple(transform.apply_length(value)
+                                                  for value in self.specs['design_boundary'])
+        for key in ('bound_box', 'internal_box'):
+            if key in self.specs:
+                self.specs[key] = transform.apply(self.specs[key])
+
+    def __getattr__(self, name):
+        return getattr(self.design, name)
+
+    @property
+    def x_width(self):
+        return self.transform.apply_length(self.design.x_width)
+
+    @property
+    def y_width(self):
+        return self.transform.apply_length(self.design.y_width)
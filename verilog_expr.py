@@ -0,0 +1,247 @@
+import functools
+import re
+
+_token_pattern = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<based>(?P<size>\d+)?\s*'[sS]?(?P<base>[bBoOdDhH])\s*(?P<digits>[0-9a-fA-F_]+))
+  | (?P<number>\d[\d_]*)
+  | (?P<name>`?[A-Za-z_][\w$]*|\$clog2)
+  | (?P<op>\*\*|<<<|>>>|<<|>>|===|!==|==|!=|<=|>=|&&|\|\||~\^|\^~|[-+*/%&|^~!<>?:(),])
+""", re.VERBOSE)
+
+_bases = {'b': 2, 'o': 8, 'd': 10, 'h': 16}
+
+# Binding power of binary operators, lowest to highest (IEEE 1364 table 5-4).
+_binary_ops = {
+    '||': (1, lambda a, b: int(bool(a) or bool(b))),
+    '&&': (2, lambda a, b: int(bool(a) and bool(b))),
+    '|': (3, lambda a, b: a | b),
+    '^': (4, lambda a, b: a ^ b),
+    '~^': (4, lambda a, b: ~(a ^ b)),
+    '^~': (4, lambda a, b: ~(a ^ b)),
+    '&': (5, lambda a, b: a & b),
+    '==': (6, lambda a, b: int(a == b)),
+    '!=': (6, lambda a, b: int(a != b)),
+    '===': (6, lambda a, b: int(a == b)),
+    '!==': (6, lambda a, b: int(a != b)),
+    '<': (7, lambda a, b: int(a < b)),
+    '<=': (7, lambda a, b: int(a <= b)),
+    '>': (7, lambda a, b: int(a > b)),
+    '>=': (7, lambda a, b: int(a >= b)),
+    '<<': (8, lambda a, b: a << b),
+    '>>': (8, lambda a, b: a >> b),
+    '<<<': (8, lambda a, b: a << b),
+    '>>>': (8, lambda a, b: a >> b),
+    '+': (9, lambda a, b: a + b),
+    '-': (9, lambda a, b: a - b),
+    '*': (10, lambda a, b: a * b),
+    '/': (10, lambda a, b: _div(a, b)),
+    '%': (10, lambda a, b: a - b * _div(a, b)),
+    '**': (11, lambda a, b: a ** b),
+}
+_right_assoc = {'**'}
+
+_unary_ops = {
+    '+': lambda a: a,
+    '-': lambda a: -a,
+    '!': lambda a: int(not a),
+    '~': lambda a: ~a,
+}
+
+
+def _div(a, b):
+    """Integer division truncating toward zero, as in Verilog."""
+    quotient = abs(a) // abs(b)
+    return quotient if (a >= 0) == (b >= 0) else -quotient
+
+
+def _clog2(a):
+    return max(int(a) - 1, 0).bit_length()
+
+
+class ExpressionError(ValueError):
+    """Raised when a bus index expression cannot be parsed."""
+
+
+class CompiledExpression:
+    """Constant expression compiled into a tree of Python closures.
+
+    Parameters
+    ----------
+    text : str
+        Expression text.
+
+    Attributes
+    ----------
+    text : str
+        Expression text.
+    names : tuple[str]
+        Names of the parameters/macros the expression refers to, with any
+        backtick removed.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self._tokens = self._tokenize(text)
+        self._pos = 0
+        names = []
+        self._names = names
+        self._fn = self._parse(0)
+        if self._pos != len(self._tokens):
+            raise ExpressionError(f"Unexpected '{self._tokens[self._pos][1]}' in expression {text}")
+        self.names = tuple(dict.fromkeys(names))
+        del self._tokens, self._names
+
+    def __call__(self, params):
+        """Evaluates the expression.
+
+        Parameters
+        ----------
+        params : dict
+            Dictionary of parameter values keyed by name.
+
+        Returns
+        -------
+        int
+            Value of the expression.
+
+        """
+        return int(self._fn(params))
+
+    @staticmethod
+    def _tokenize(text):
+        tokens = []
+        pos = 0
+        while pos < len(text):
+            match = _token_pattern.match(text, pos)
+            if match is None:
+                raise ExpressionError(f"Unexpected character '{text[pos]}' in expression {text}")
+            pos = match.end()
+            kind = match.lastgroup
+            if kind == 'space':
+                continue
+            if kind in ('based', 'size', 'base', 'digits'):
+                value = int(match['digits'].replace('_', ''), _bases[match['base'].lower()])
+                tokens.append(('number', value))
+            elif kind == 'number':
+                tokens.append(('number', int(match[kind].replace('_', ''))))
+            elif kind == 'name':
+                tokens.append(('name', match[kind].lstrip('`')))
+            else:
+                tokens.append(('op', match[kind]))
+        return tokens
+
+    def _peek(self):
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, None)
+
+    def _advance(self):
+        token = self._peek()
+        self._pos += 1
+        return token
+
+    def _expect(self, op):
+        kind, value = self._advance()
+        if value != op:
+            raise ExpressionError(f"Expected '{op}' in expression {self.text}")
+
+    def _parse(self, min_power):
+        fn = self._parse_unary()
+        while True:
+            kind, value = self._peek()
+            if kind != 'op':
+                return fn
+            if value == '?' and min_power == 0:
+                self._advance()
+                if_true = self._parse(0)
+                self._expect(':')
+                if_false = self._parse(0)
+                fn = (lambda cond, a, b: lambda p: a(p) if cond(p) else b(p))(fn, if_true, if_false)
+                continue
+            if value not in _binary_ops:
+                return fn
+            power, op = _binary_ops[value]
+            if power <= min_power and not (value in _right_assoc and power == min_power):
+                return fn
+            self._advance()
+            rhs = self._parse(power)
+            fn = (lambda op, a, b: lambda p: op(a(p), b(p)))(op, fn, rhs)
+
+    def _parse_unary(self):
+        kind, value = self._advance()
+        if kind == 'number':
+            return lambda p: value
+        if kind == 'name':
+            if value == '$clog2':
+                self._expect('(')
+                arg = self._parse(0)
+                self._expect(')')
+                return lambda p: _clog2(arg(p))
+            self._names.append(value)
+            return lambda p: p[value]
+        if value == '(':
+            fn = self._parse(0)
+            self._expect(')')
+            return fn
+        if value in _unary_ops:
+            op = _unary_ops[value]
+            # Unary operators bind tighter than every binary operator
+            operand = self._parse_unary()
+            return lambda p: op(operand(p))
+        raise ExpressionError(f"Unexpected '{value}' in expression {self.text}")
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_expression(text):
+    """Compiles a constant expression once. Compiled expressions are cached
+    by expression text.
+
+    Parameters
+    ----------
+    text : str
+        Expression text, e.g. "`wordLength-1".
+
+    Returns
+    -------
+    CompiledExpression
+
+    """
+    return CompiledExpression(text)
+
+
+@functools.lru_cache(maxsize=16384)
+def _evaluate_values(text, values):
+    expr = compile_expression(text)
+    return expr(dict(zip(expr.names, values)))
+
+
+def evaluate(text, params):
+    """Evaluates a constant Verilog expression without eval().
+
+    Results are memoized by the expression text and the values of the
+    parameters it refers to, so identical ranges across many ports (or
+    many modules with the same parameter values) are evaluated once.
+
+    Parameters
+    ----------
+    text : str
+        Expression text. Backticks on macro names are ignored.
+    params : dict
+        Dictionary of parameter values keyed by name.
+
+    Returns
+    -------
+    int
+        Value of the expression.
+
+    Raises
+    ------
+    KeyError
+        If the expression refers to a name that is not in params.
+
+    """
+    expr = compile_expression(text)
+    values = tuple(params[name] for name in expr.names)
+    try:
+        return _evaluate_values(text, values)
+    except TypeError:  # Unhashable parameter value
+        return expr(params)
@@ -0,0 +1,509 @@
+import codecs
+import re
+from collections import namedtuple
+
+Token = namedtuple('Token', ['kind', 'value', 'line'])
+Token.__doc__ = """Lexical token. kind is one of 'keyword', 'ident', 'macro',
+'number', 'string' or 'op'; line is the 0-based line index in the source."""
+
+PortDecl = namedtuple('PortDecl', ['direction', 'bus_range', 'names', 'line'])
+PortDecl.__doc__ = """Port declaration. bus_range is None for scalar ports,
+otherwise a (msb, lsb) tuple of expression strings."""
+
+ModuleHeader = namedtuple('ModuleHeader', ['name', 'line', 'params', 'port_names', 'ports'])
+ModuleHeader.__doc__ = """Result of scanning a module declaration.
+
+params is a dict of header/body parameter names to their default value
+expression strings, port_names lists the names from the port list in order,
+and ports is a list of PortDecl in declaration order."""
+
+DIRECTIONS = ('input', 'output', 'inout')
+NET_TYPES = ('wire', 'reg', 'logic', 'tri', 'wand', 'wor', 'supply0', 'supply1',
+             'signed', 'unsigned', 'var', 'integer')
+KEYWORDS = frozenset(DIRECTIONS + NET_TYPES + ('module', 'macromodule', 'endmodule', 'parameter',
+                                               'localparam', 'function', 'endfunction', 'task',
+                                               'endtask', 'generate', 'endgenerate'))
+
+_token_pattern = re.compile(r"""
+    (?P<comment>/\*[\s\S]*?\*/|//[^\n]*)
+  | (?P<open_comment>/\*[\s\S]*)
+  | (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+)
+  | (?P<string>"(?:\\.|[^"\\\n])*")
+  | (?P<macro>`\w+)
+  | (?P<number>\d*\s*'[sS]?[bBoOdDhH]\s*[0-9a-fA-F_xXzZ?]+|\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_][\w$]*|\\\S+)
+  | (?P<op>\*\*|<<<|>>>|<<|>>|===|!==|==|!=|<=|>=|&&|\|\||[-+*/%&|^~!<>?:;,.\#()\[\]{}=@$])
+  | (?P<other>.)
+""", re.VERBOSE)
+
+_comment_pattern = re.compile(r'(?P<string>"(?:\\.|[^"\\\n])*")|(?P<comment>//[^\n]*|/\*[\s\S]*?\*/|/\*[\s\S]*)')
+
+
+# Characters a token match must end before the end of a stream buffer to be
+# accepted; a match that runs closer to the end may continue in the next chunk.
+_STREAM_MARGIN = 64
+
+_module_pattern = re.compile(r"""
+    //[^\n]*
+  | /\*[\s\S]*?\*/
+  | /\*[\s\S]*
+  | "(?:\\.|[^"\\\n])*"?
+  | \b(?:macro)?module\s+(?P<name>[A-Za-z_][\w$]*)
+""", re.VERBOSE)
+
+
+def _emit_tokens(matches, line):
+    for match in matches:
+        kind = match.lastgroup
+        value = match.group()
+        if kind == 'newline':
+            line += 1
+        elif kind == 'space':
+            continue
+        elif kind in ('comment', 'open_comment'):
+            line += value.count('\n')
+        elif kind == 'ident':
+            yield Token('keyword' if value in KEYWORDS else 'ident', value, line)
+        else:
+            yield Token(kind, value, line)
+
+
+def tokenize(text, line=0):
+    """Lexes Verilog source text in a single pass.
+
+    Comments (including block comments spanning lines) and whitespace are
+    dropped. Tokens are produced lazily, so callers that stop early do not
+    pay for the rest of the text.
+
+    Parameters
+    ----------
+    text : str
+        Verilog source text.
+    line : int, optional
+        Line index of the first character of text. Default is 0.
+
+    Yields
+    ------
+    Token
+
+    """
+    return _emit_tokens(_token_pattern.finditer(text), line)
+
+
+def mask_comments(text):
+    """Replaces comments with spaces, keeping newlines so that character
+    offsets and line numbers are unchanged.
+
+    Parameters
+    ----------
+    text : str
+        Verilog source text.
+
+    Returns
+    -------
+    str
+        Source text with comments blanked out.
+
+    """
+    return _comment_pattern.sub(lambda m: m.group() if m.lastgroup == 'string' else
+                                re.sub(r'[^\n]', ' ', m.group()), text)
+
+
+def strip_comments(line_list):
+    """Removes comments and empty lines from a list of lines.
+
+    Unlike VerilogModule._strip_comments, code sharing a line with a
+    comment is kept.
+
+    Parameters
+    ----------
+    line_list : list[str]
+        List of lines in the Verilog file.
+
+    Returns
+    -------
+    new_line_list : list[str]
+        List of lines with comments and empty lines removed.
+
+    """
+    text = '\n'.join(line_list)
+    stripped = _token_pattern.sub(
+        lambda m: '\n' * m.group().count('\n') if m.lastgroup in ('comment', 'open_comment') else m.group(),
+        text)
+    return [line for line in stripped.split('\n') if line.strip()]
+
+
+class HeaderScanner:
+    """Extracts the parameters and port declarations of a module from a
+    token stream.
+
+    The scanner reads only as many tokens as it needs: for ANSI-style
+    headers it stops at the end of the port list, and for non-ANSI headers
+    it stops once every port in the port list has been declared in the
+    module body (or at endmodule).
+
+    Parameters
+    ----------
+    tokens : Iterable[Token]
+        Token stream, e.g. from tokenize().
+
+    """
+
+    def __init__(self, tokens):
+        self.tokens = iter(tokens)
+        self.lookahead = None
+
+    def _next(self):
+        if self.lookahead is not None:
+            token, self.lookahead = self.lookahead, None
+            return token
+        return next(self.tokens, None)
+
+    def _peek(self):
+        if self.lookahead is None:
+            self.lookahead = next(self.tokens, None)
+        return self.lookahead
+
+    def _expect(self, value):
+        token = self._next()
+        if token is None or token.value != value:
+            found = token.value if token else 'end of file'
+            raise SyntaxError(f"Expected '{value}' but found '{found}'.")
+        return token
+
+    def _collect_until(self, stop_values):
+        """Collects tokens up to (not including) the first depth-0 token whose
+        value is in stop_values. Returns the list of token values."""
+        depth = 0
+        values = []
+        while True:
+            token = self._peek()
+            if token is None:
+                return values
+            if depth == 0 and token.value in stop_values:
+                return values
+            if token.value in ('(', '[', '{'):
+                depth += 1
+            elif token.value in (')', ']', '}'):
+                depth -= 1
+            values.append(self._next().value)
+
+    def _parse_range(self):
+        """Parses a [msb:lsb] range after the opening bracket has been
+        peeked. Returns (msb, lsb) expression strings."""
+        self._expect('[')
+        msb = ''.join(self._collect_until((':', ']')))
+        lsb = msb
+        if self._peek() is not None and self._peek().value == ':':
+            self._next()
+            lsb = ''.join(self._collect_until((']',)))
+        self._expect(']')
+        return msb, lsb
+
+    def _parse_param_assignments(self, params, stop_values):
+        """Parses 'parameter [type] [range] NAME = expr, NAME = expr' lists."""
+        while True:
+            token = self._peek()
+            if token is None or token.value in stop_values:
+                return
+            if token.value in (',', 'parameter', 'localparam') or token.value in NET_TYPES:
+                self._next()
+            elif token.value == '[':
+                self._parse_range()
+            elif token.kind == 'ident':
+                name = self._next().value
+                if self._peek() is not None and self._peek().value == '=':
+                    self._next()
+                    params[name] = ''.join(self._collect_until((',',) + tuple(stop_values)))
+            else:
+                self._next()
+
+    def _parse_declaration(self, direction, stop_values):
+        """Parses '[net type] [range] name {, name}' following a direction.
+        Returns a PortDecl. Stops at a depth-0 token in stop_values or at the
+        next direction keyword."""
+        bus_range = None
+        names = []
+        line = None
+        while True:
+            token = self._peek()
+            if token is None or token.value in stop_values or (names and token.value in DIRECTIONS):
+                break
+            if token.value in NET_TYPES:
+                self._next()
+            elif token.value == '[':
+                if names:
+                    self._parse_range()  # Unpacked array dimensions
+                else:
+                    bus_range = self._parse_range()
+            elif token.kind == 'ident':
+                token = self._next()
+                line = token.line if line is None else line
+                names.append(token.value)
+            elif token.value == ',':
+                self._next()
+                nxt = self._peek()
+                if nxt is not None and (nxt.value in DIRECTIONS or nxt.value in stop_values):
+                    break
+            else:
+                self._next()
+        return PortDecl(direction, bus_range, names, line)
+
+    def scan(self, top=None):
+        """Scans the token stream for the declaration of module top.
+
+        Parameters
+        ----------
+        top : str, optional
+            Name of the module. If not given, the first module is scanned.
+
+        Returns
+        -------
+        ModuleHeader
+
+        """
+        while True:
+            token = self._next()
+            if token is None:
+                raise NameError(f"Could not find module name {top}.")
+            if token.value in ('module', 'macromodule'):
+                name = self._next()
+                if name is not None and (top is None or name.value == top):
+                    break
+        header = ModuleHeader(name.value, token.line, {}, [], [])
+        if self._peek() is not None and self._peek().value == '#':
+            self._next()
+            self._expect('(')
+            self._parse_param_assignments(header.params, (')',))
+            self._expect(')')
+        token = self._peek()
+        if token is not None and token.value == '(':
+            self._next()
+            self._scan_port_list(header)
+        declared = {name for decl in header.ports for name in decl.names}
+        if header.port_names and not declared.issuperset(header.port_names):
+            self._scan_body(header, declared)
+        return header
+
+    def _scan_port_list(self, header):
+        """Scans the module port list, which is either a list of names or a
+        list of ANSI-style declarations."""
+        direction = None
+        while True:
+            token = self._peek()
+            if token is None:
+                return
+            if token.value == ')':
+                self._next()
+                return
+            if token.value in DIRECTIONS:
+                direction = self._next().value
+            if direction is not None:
+                decl = self._parse_declaration(direction, (')',))
+                header.ports.append(decl)
+                header.port_names.extend(decl.names)
+            elif token.kind == 'ident':
+                header.port_names.append(self._next().value)
+            else:
+                self._next()
+
+    def _scan_body(self, header, declared):
+        """Scans module body statements for non-ANSI port declarations."""
+        remaining = set(header.port_names) - declared
+        at_statement = True
+        while remaining:
+            token = self._peek()
+            if token is None or token.value == 'endmodule':
+                return
+            if at_statement and token.value in DIRECTIONS:
+                decl = self._parse_declaration(self._next().value, (';',))
+                header.ports.append(decl)
+                remaining.difference_update(decl.names)
+                continue
+            if at_statement and token.value in ('parameter', 'localparam'):
+                self._next()
+                self._parse_param_assignments(header.params, (';',))
+                continue
+            self._next()
+            at_statement = token.value in (';', 'begin', 'end') or token.kind == 'macro'
+
+
+def scan_module_header(text, top=None, line=0):
+    """Scans Verilog source text for a module's parameters and ports.
+
+    Parameters
+    ----------
+    text : str
+        Verilog source text.
+    top : str, optional
+        Name of the module. If not given, the first module is scanned.
+    line : int, optional
+        Line index of the first character of text.
+
+    Returns
+    -------
+    ModuleHeader
+
+    """
+    return HeaderScanner(tokenize(text, line)).scan(top)
+
+
+class StreamBuffer:
+    """Sliding window over a text or binary stream.
+
+    Only the unconsumed text (plus one character of context) is kept, so
+    memory is bounded by the chunk size and the longest token rather than
+    by the size of the stream. Bytes are decoded incrementally as UTF-8.
+
+    Parameters
+    ----------
+    stream : TextIO, BinaryIO
+        Stream to read from. Any object with a read(size) method works.
+    chunk_size : int, optional
+        Number of bytes (or characters) read at a time.
+
+    Attributes
+    ----------
+    text : str
+        Buffered text.
+    pos : int
+        Offset in text of the next unconsumed character.
+    eof : bool
+        Whether the stream is exhausted.
+
+    """
+
+    def __init__(self, stream, chunk_size=1 << 16):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = None
+
+    def refill(self):
+        """Drops consumed text and appends the next chunk of the stream.
+
+        Returns
+        -------
+        bool
+            False if the stream was already exhausted.
+
+        """
+        if self.eof:
+            return False
+        data = self.stream.read(self.chunk_size)
+        self.eof = not data
+        if isinstance(data, (bytes, bytearray)) or (self._decoder is not None and not data):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder('utf-8')()
+            data = self._decoder.decode(data, final=self.eof)
+        keep = min(self.pos, 1)
+        self.text = self.text[self.pos - keep:] + data
+        self.pos = keep
+        return True
+
+
+def tokenize_stream(buffer, line=0):
+    """Lexes Verilog source from a StreamBuffer, reading the stream only as
+    far as the tokens are consumed. Produces the same tokens as tokenize().
+
+    Parameters
+    ----------
+    buffer : StreamBuffer
+        Buffer positioned at the first character to lex.
+    line : int, optional
+        Line index of the buffer position. Default is 0.
+
+    Yields
+    ------
+    Token
+
+    """
+    def matches():
+        while True:
+            if buffer.pos >= len(buffer.text) and not buffer.refill():
+                return
+            match = _token_pattern.match(buffer.text, buffer.pos)
+            if not buffer.eof and match.end() + _STREAM_MARGIN > len(buffer.text):
+                # The token may continue in the next chunk.
+                buffer.refill()
+                continue
+            buffer.pos = match.end()
+            yield match
+
+    return _emit_tokens(matches(), line)
+
+
+def seek_module(buffer, top=None, line=0):
+    """Skips a StreamBuffer forward to the declaration of module top without
+    tokenizing the text before it. Declarations inside comments and strings
+    are ignored.
+
+    Parameters
+    ----------
+    buffer : StreamBuffer
+        Buffer to advance. On return, buffer.pos is at the module keyword.
+    top : str, optional
+        Name of the module. If not given, the first module is found.
+    line : int, optional
+        Line index of the buffer position. Default is 0.
+
+    Returns
+    -------
+    int
+        Line index of the module declaration.
+
+    Raises
+    ------
+    NameError
+        If the module is not declared in the stream.
+
+    """
+    while True:
+        match = _module_pattern.search(buffer.text, buffer.pos)
+        if not buffer.eof and (match is None or match.end() + _STREAM_MARGIN > len(buffer.text)):
+            # Skip what cannot be part of a match, keeping a tail that may
+            # hold the start of a comment or declaration.
+            skip_to = max(buffer.pos, len(buffer.text) - _STREAM_MARGIN) if match is None else match.start()
+            line += buffer.text.count('\n', buffer.pos, skip_to)
+            buffer.pos = skip_to
+            buffer.refill()
+            continue
+        if match is None:
+            raise NameError(f"Could not find module name {top}.")
+        line += buffer.text.count('\n', buffer.pos, match.start())
+        name = match.group('name')
+        if name is not None and (top is None or name == top):
+            buffer.pos = match.start()
+            return line
+        line += match.group().count('\n')
+        buffer.pos = match.end()
+
+
+def scan_module_stream(stream, top=None, chunk_size=1 << 16):
+    """Scans a Verilog stream for a module's parameters and ports, reading
+    only up to the end of its port declarations.
+
+    Text before the module is skipped without tokenizing it, and the
+    module body is not read past the last port declaration, so memory
+    stays bounded regardless of the size of the source.
+
+    Parameters
+    ----------
+    stream : TextIO, BinaryIO
+        Stream of Verilog source, e.g. a file opened in binary mode.
+    top : str, optional
+        Name of the module. If not given, the first module is scanned.
+    chunk_size : int, optional
+        Number of bytes (or characters) read at a time.
+
+    Returns
+    -------
+    ModuleHeader
+
+    """
+    buffer = StreamBuffer(stream, chunk_size)
+    line = seek_module(buffer, top)
+    return HeaderScanner(tokenize_stream(buffer, line)).scan(top)
@@ -0,0 +1,308 @@
+import bisect
+import hashlib
+import os
+import re
+from collections import namedtuple
+
+from phyrilog.utilities import file_stamp, open_source
+from phyrilog.verilog_lexer import mask_comments
+from phyrilog.verilog_pin_extract import VerilogModule, read_source, source_digest, split_lines
+from phyrilog.verilog_preprocessor import VerilogPreprocessor
+
+
+class ModuleSpan:
+    """Location of a single ``module ... endmodule`` block in a Verilog
+    file.
+
+    Parameters
+    ----------
+    name : str
+        Name of the module.
+    start : int
+        Character offset of the ``module`` keyword.
+    end : int
+        Character offset just past the ``endmodule`` keyword (and its
+        optional ``: <name>`` label).
+    start_line : int
+        Index in the file line list of the line containing the ``module``
+        keyword.
+    end_line : int
+        Index in the file line list of the line containing the
+        ``endmodule`` keyword.
+    preamble_start_line : int
+        Index in the file line list of the first line after the previous
+        module (or 0 for the first module). Lines between this and
+        start_line hold any `define/`timescale header for the module.
+    digest : str, optional
+        Digest of the module text, from ``module`` through ``endmodule``.
+
+    """
+
+    def __init__(self, name, start, end, start_line, end_line, preamble_start_line, digest=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.start_line = start_line
+        self.end_line = end_line
+        self.preamble_start_line = preamble_start_line
+        self.digest = digest
+
+    def __repr__(self):
+        return f"ModuleSpan({self.name!r}, lines {self.start_line}-{self.end_line})"
+
+
+LibraryChanges = namedtuple('LibraryChanges', ['changed', 'removed'])
+LibraryChanges.__doc__ = """Result of VerilogLibrary.refresh. changed lists the
+modules that are new or whose text or `define constants changed, removed
+the modules no longer defined, both in file order."""
+
+
+class VerilogLibrary:
+    """Index of every module defined in a Verilog file.
+
+    The file is read and scanned once; each ``module ... endmodule`` block
+    is recorded as a ModuleSpan so that VerilogModule objects can be handed
+    out without rescanning the file for every module.
+
+    Parameters
+    ----------
+    filename : str, Path, optional
+        The Verilog file name or absolute path. If source is given, this is
+        only used as a label and to resolve relative `include paths.
+    include_dirs : Iterable[str, Path], optional
+        Extra directories to search for `include files.
+    source : str, bytes, TextIO, BinaryIO, optional
+        Verilog source text, or a stream to read it from, used instead of
+        reading filename.
+
+    Attributes
+    ----------
+    filename : str, Path
+        The Verilog file name or absolute path.
+    include_dirs : Iterable[str, Path]
+        Extra directories searched for `include files.
+    in_memory : bool
+        True if the library was built from in-memory source.
+    text : str
+        Full contents of the Verilog file.
+    digest : str
+        Digest of the file contents, used to detect changes.
+    line_list : list[str]
+        List of lines in the Verilog file, without trailing newlines.
+    spans : dict
+        Dictionary of ModuleSpan objects keyed by module name, in file
+        order.
+    macros : dict
+        Dictionary of MacroTable snapshots keyed by module name. Each
+        snapshot holds the `define macros in effect at the start of the
+        module.
+    include_stamps : dict
+        (mtime, size) stamps of the `include files read while collecting
+        the macros, nested includes included, keyed by real path.
+
+    """
+
+    _module_pattern = re.compile(r'\b(?:macro)?module\s+(\w+)|\bendmodule\b(?:\s*:\s*\w+)?')
+
+    def __init__(self, filename=None, include_dirs=(), source=None):
+        self.filename = filename
+        self.include_dirs = include_dirs
+        self.in_memory = source is not None
+        self._load(self._read(source))
+
+    def _read(self, source):
+        if source is not None:
+            return read_source(source)
+        with open_source(self.filename) as file:
+            return file.read()
+
+    def _load(self, text):
+        """Indexes the modules and macros of the given file contents."""
+        self.text = text
+        self.digest = source_digest(text)
+        self.line_list = split_lines(text)
+        self.spans = {}
+        self.macros = {}
+        self._line_starts = [0] + [match.end() for match in re.finditer('\n', text)]
+        self._index_modules()
+        self._collect_macros(self.include_dirs)
+
+    @classmethod
+    def from_source(cls, source, include_dirs=(), filename=None):
+        """Creates a VerilogLibrary from in-memory Verilog source.
+
+        Parameters
+        ----------
+        source : str, bytes, TextIO, BinaryIO
+            Verilog source text, or a stream to read it from.
+        include_dirs : Iterable[str, Path], optional
+            Extra directories to search for `include files.
+        filename : str, Path, optional
+            Label for the source.
+
+        Returns
+        -------
+        VerilogLibrary
+
+        """
+        return cls(filename, include_dirs, source=source)
+
+    def _line_no(self, offset):
+        """Returns the line index containing the given character offset."""
+        return bisect.bisect_right(self._line_starts, offset) - 1
+
+    def _index_modules(self):
+        """Records the span of every module in the file."""
+        # Comments are blanked out so that commented-out modules are not
+        # indexed.
+        masked = mask_comments(self.text)
+        open_name = None
+        open_start = 0
+        preamble_line = 0
+        for match in self._module_pattern.finditer(masked):
+            if match[1]:
+                if open_name is None:
+                    open_name = match[1]
+                    open_start = match.start()
+                continue
+            if open_name is None:
+                continue
+            end_line = self._line_no(match.start())
+            span = ModuleSpan(open_name, open_start, match.end(), self._line_no(open_start),
+                              end_line, preamble_line, source_digest(self.text[open_start:match.end()]))
+            # Keep the first definition, matching VerilogModule's lookup.
+            self.spans.setdefault(open_name, span)
+            open_name = None
+            preamble_line = end_line + 1
+
+    def _collect_macros(self, include_dirs):
+        """Runs the preprocessor over the file once, recording the macro
+        table in effect at the start of every module."""
+        preprocessor = VerilogPreprocessor(include_dirs)
+        start_lines = {span.start_line: name for name, span in self.spans.items()}
+        current_dir = os.path.dirname(os.path.abspath(self.filename)) if self.filename else None
+        _, snapshots = preprocessor.process_lines(self.line_list, marks=start_lines.keys(),
+                                                  current_dir=current_dir, filename=self.filename)
+        for line_no, name in start_lines.items():
+            self.macros[name] = snapshots[line_no]
+        self.include_stamps = preprocessor.include_stamps
+
+    def includes_changed(self):
+        """Checks whether any `include file read while collecting the
+        macros has been edited or removed since."""
+        return any(file_stamp(path) != stamp for path, stamp in self.include_stamps.items())
+
+    def refresh(self, source=None):
+        """Re-reads the file and re-indexes it if its contents, or any of
+        the `include files it reads, changed.
+
+        Parameters
+        ----------
+        source : str, bytes, TextIO, BinaryIO, optional
+            New source text, for a library built from in-memory source.
+            Otherwise the file is read again.
+
+        Returns
+        -------
+        LibraryChanges
+            Modules that changed or were removed. Both are empty if the
+            contents are unchanged.
+
+        If the new contents cannot be indexed, the error is raised and the
+        library keeps its previous index.
+
+        """
+        text = self._read(source)
+        if source_digest(text) == self.digest and not self.includes_changed():
+            return LibraryChanges([], [])
+        old_digests = {name: self.module_digest(name) for name in self.spans}
+        old_state = dict(vars(self))
+        try:
+            self._load(text)
+        except Exception:
+            vars(self).update(old_state)
+            raise
+        changed = [name for name in self.spans if old_digests.get(name) != self.module_digest(name)]
+        removed = [name for name in old_digests if name not in self.spans]
+        return LibraryChanges(changed, removed)
+
+    def __contains__(self, top):
+        return top in self.spans
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def __len__(self):
+        return len(self.spans)
+
+    @property
+    def module_names(self):
+        return list(self.spans.keys())
+
+    def span(self, top):
+        """Returns the ModuleSpan of the given module.
+
+        Parameters
+        ----------
+        top : str
+            Name of the module.
+
+        Returns
+        -------
+        ModuleSpan
+            Location of the module in the file.
+
+        """
+        try:
+            return self.spans[top]
+        except KeyError:
+            raise NameError(f"Could not find module name {top} in {self.filename}.")
+
+    def module_text(self, top):
+        """Returns the source text of the given module."""
+        span = self.span(top)
+        return self.text[span.start:span.end]
+
+    def module_lines(self, top):
+        """Returns the lines from the ``module`` line through the
+        ``endmodule`` line of the given module."""
+        span = self.span(top)
+        return self.line_list[span.start_line:span.end_line + 1]
+
+    def preamble_lines(self, top):
+        """Returns the lines between the previous module and the given
+        module. In files such as the ASAP7 SRAM behavioral model these hold
+        the `define constants for the module."""
+        span = self.span(top)
+        return self.line_list[span.preamble_start_line:span.start_line]
+
+    def macros_for(self, top):
+        """Returns the MacroTable snapshot in effect at the start of the
+        given module."""
+        self.span(top)
+        return self.macros[top]
+
+    def module_digest(self, top):
+        """Returns a digest of everything the given module's parse depends
+        on: its own text and the `define macros in effect at its start.
+        Editing another module leaves it unchanged."""
+        span = self.span(top)
+        content = span.digest + self.macros[top].digest()
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    def get_module(self, top, **kwargs):
+        """Creates a VerilogModule for the given module from the index.
+
+        Parameters
+        ----------
+        top : str
+            Name of the module.
+        kwargs
+            Keyword arguments passed through to VerilogModule.
+
+        Returns
+        -------
+        VerilogModule
+
+        """
+        return VerilogModule(top, library=self, **kwargs)
@@ -1,7 +1,43 @@
 import re
 import operator
 import ast
+import functools
 import json
+import hashlib
+import io
+import contextlib
+
+from phyrilog.cond_parser import compile_condition
+from phyrilog.port_export import port_record
+from phyrilog.utilities import file_stamp, open_source
+from phyrilog.verilog_expr import evaluate
+from phyrilog.verilog_lexer import scan_module_header, scan_module_stream
+from phyrilog.verilog_preprocessor import get_macro_table
+
+
+def split_lines(text):
+    """Splits file contents into a list of lines without trailing
+    newlines, matching iteration over a file opened in text mode."""
+    line_list = text.split('\n')
+    if line_list and not line_list[-1]:
+        line_list.pop()
+    return line_list
+
+
+def read_source(source):
+    """Returns Verilog source text from a string, bytes, or a text or
+    binary stream. Bytes are decoded as UTF-8."""
+    if hasattr(source, 'read'):
+        source = source.read()
+    if isinstance(source, (bytes, bytearray)):
+        source = source.decode('utf-8')
+    return source
+
+
+def source_digest(text):
+    """Returns the hex digest used to detect changes to source text."""
+    return hashlib.sha1(text.encode()).hexdigest()
+
 
 class NameLookup(ast.NodeTransformer):
     """NodeTransformer object that replaces all variables in bus index expressions with a corresponding param dictionary
@@ -16,57 +52,139 @@ class NameLookup(ast.NodeTransformer):
             ctx=ast.Load()
         ), node)
 
-class WhenWriter(ast.NodeVisitor):
+@functools.lru_cache(maxsize=1024)
+def when_conditions(when, suffix):
+    """Returns the when and sdf_cond strings of a sequential pin condition
+    template, with suffix appended to every pin name in it.
 
-    def __init__(self):
-        super().__init__()
-        self.when_list = []
-        self.sdf_list = []
-        self.invert_expr = ""
+    Each template is compiled once by cond_parser, and the strings for each
+    (template, suffix) pair are built once per process.
 
-    def visit_Invert(self, node):
-        self.invert_expr = "!"
-        # self.when_expr.append("!")
-        # self.sdf_expr.append("!")
-        self.generic_visit(node)
+    Parameters
+    ----------
+    when : str
+        Condition template, e.g. '~CSB & ~WEB'.
+    suffix : str
+        Suffix appended to every name in the template.
 
-    # def visit_BitAnd(self, node):
-    #     self.when_expr.append("&")
-    #     self.sdf_expr.append("&")
-    #     self.generic_visit(node)
+    Returns
+    -------
+    when_str : str
+    sdf_str : str
 
-    def visit_Name(self, node):
-        if self.invert_expr:
-            node_str = self.invert_expr + node.id
-            self.invert_expr = ""
+    """
+    condition = compile_condition(when)
+    return condition.when(suffix), condition.sdf_cond(suffix)
+
+# Numbered backreferences, which would refer to the wrong group once a
+# pattern is embedded in the combined regex.
+_backreference = re.compile(r"\\[1-9]")
+
+
+class PinPatternMatcher:
+    """Matches pin names against a list of regex patterns in one pass.
+
+    The patterns are combined into a single regex of lookaheads that is
+    matched once at the start of a pin name; the capture for pattern i is
+    what re.search(patterns[i], pin_name) would return. Patterns that
+    cannot be embedded in another regex (named groups, backreferences or
+    global inline flags such as (?i)) are searched on their own, as are
+    all patterns if the combined regex does not compile. Results are
+    cached per pin name, so a matcher shared between modules with the same
+    pin names only runs the regexes once per name.
+
+    Parameters
+    ----------
+    patterns : Tuple[str]
+        Regex patterns.
+    singular_patterns : Tuple[str], optional
+        Patterns used instead for single-character pin names.
+
+    """
+
+    def __init__(self, patterns, singular_patterns=None):
+        self.patterns = patterns
+        self._matcher = self._combine(patterns)
+        if singular_patterns is None:
+            self._singular_matcher = self._matcher
         else:
-            node_str = node.id
-        self.when_list.append(node_str)
-        self.sdf_list.append(node_str)
-        self.generic_visit(node)
+            self._singular_matcher = self._combine(singular_patterns)
+        self._cache = {}
+
+    @staticmethod
+    def _combine(patterns):
+        """Returns the combined regex, the (pattern index, group) of every
+        pattern in it, and the (pattern index, regex) of every pattern
+        that is searched on its own."""
+        compiled = [re.compile(pattern) for pattern in patterns]
+        lookaheads = []
+        groups = []
+        separate = []
+        n_groups = 0
+        for idx, regex in enumerate(compiled):
+            if regex.groupindex or regex.flags & ~re.UNICODE or _backreference.search(regex.pattern):
+                separate.append((idx, regex))
+                continue
+            lookaheads.append(f"(?=(?:[\\s\\S]*?({regex.pattern}))?)")
+            groups.append((idx, n_groups + 1))
+            n_groups += regex.groups + 1
+        try:
+            combined = re.compile(''.join(lookaheads))
+        except re.error:
+            return re.compile(''), [], list(enumerate(compiled))
+        return combined, groups, separate
+
+    def match(self, pin_name):
+        """Returns a tuple of (pattern index, matched text) for every
+        pattern found in pin_name."""
+        result = self._cache.get(pin_name)
+        if result is None:
+            combined, groups, separate = self._singular_matcher if len(pin_name) == 1 else self._matcher
+            re_match = combined.match(pin_name)
+            result = [(idx, re_match[group]) for idx, group in groups if re_match[group] is not None]
+            if separate:
+                for idx, regex in separate:
+                    re_match = regex.search(pin_name)
+                    if re_match:
+                        result.append((idx, re_match[0]))
+                result.sort()
+            result = tuple(result)
+            self._cache[pin_name] = result
+        return result
+
+    def match_pins(self, pin_names):
+        """Matches every pin name.
 
-    def clear(self):
-        self.when_list = []
-        self.sdf_list = []
+        Parameters
+        ----------
+        pin_names : Iterable[str]
 
-    @property
-    def when_expr(self):
-        return " & ".join(self.when_list)
+        Returns
+        -------
+        list[list[Tuple[str, str]]]
+            For each pattern, the (pin name, matched text) pairs in the
+            order of pin_names.
 
-    @property
-    def sdf_expr(self):
-        return " & ".join(self.sdf_list)
+        """
+        matches = [[] for _ in self.patterns]
+        for pin_name in pin_names:
+            for idx, re_name in self.match(pin_name):
+                matches[idx].append((pin_name, re_name))
+        return matches
 
-class NameUpdate(ast.NodeTransformer):
 
-    def __init__(self, suffix):
-        super().__init__()
-        self.suffix = suffix
+# Process-wide cache of PinPatternMatcher objects keyed by their patterns.
+_pin_matchers = {}
 
-    def visit_Name(self, node):
-        return ast.copy_location(
-            ast.Name(id=node.id + self.suffix, ctx=node.ctx),
-            node)
+
+def get_pin_matcher(patterns, singular_patterns=None):
+    """Returns the shared PinPatternMatcher for the given patterns."""
+    key = (patterns, singular_patterns)
+    matcher = _pin_matchers.get(key)
+    if matcher is None:
+        matcher = PinPatternMatcher(patterns, singular_patterns)
+        _pin_matchers[key] = matcher
+    return matcher
 
 
 class VerilogModule:
@@ -86,7 +204,8 @@ class VerilogModule:
         The related ground pin of all pins in the design. Default is 'VSS'.
 
     filename : str, Path
-        The Verilog file name or absolute path.
+        The Verilog file name or absolute path. If source is given, this is
+        only used as a label and the file is never read.
 
     constfile : str, Path, optional
         The constants header file name or absolute path.
@@ -97,6 +216,30 @@ class VerilogModule:
     seq_pins : Tuple(Tuple(str, str)), optional
         Iterable of all the sequential pin names with associated clocks.
 
+    library : VerilogLibrary, optional
+        Module index of an already scanned Verilog file. If given, the
+        module is looked up in the index instead of reading and scanning
+        filename. If no constfile is given, the `define macros in effect at
+        the start of the module are used as the constants.
+
+    parser : {'regex', 'lexer', 'stream'}, optional
+        Port extraction backend. 'regex' is the original line-based
+        parser; 'lexer' uses the single-pass tokenizer in verilog_lexer.
+        'stream' runs the same tokenizer over a buffered reader and stops
+        at the end of the port declarations, so only the module header is
+        ever held in memory; use it for very large netlists. Lines of the
+        module (line_list) are then read on first access. Default is
+        'regex'.
+
+    cache : ParseCache, optional
+        On-disk cache of parse results. If the module has been parsed
+        before with the same source, constants and pin specs, the stored
+        result is loaded instead of parsing the module again.
+
+    source : str, bytes, TextIO, BinaryIO, optional
+        Verilog source text, or a stream to read it from, used instead of
+        reading filename. Modules built from source never touch disk.
+
     Attributes
     ----------
     name : str
@@ -111,6 +254,10 @@ class VerilogModule:
         constants file or the parameter definition block in the Verilog
         module. Keys are names of parameters, values are parameter values.
 
+    macros : MacroTable
+        Table of `define macros from the constants file. Tables are built
+        once per file and shared by every VerilogModule in the process.
+
     power_pins : dict
         Special dictionary containing the related power and ground pin
         names.
@@ -121,14 +268,37 @@ class VerilogModule:
 
     """
 
-    def __init__(self, top, VDD='VDD', VSS='VSS', filename=None, constfile=None, clocks=('clock', 'clk'), seq_pins=(('', 'clock', 'when'))):
-        with open(filename, 'r') as file:
-            line_list = [line.rstrip('\n') for line in file]
+    _clk_suffix_pattern = re.compile(r"[_\d]")
+
+    def __init__(self, top, VDD='VDD', VSS='VSS', filename=None, constfile=None, clocks=('clock', 'clk'), seq_pins=(('', 'clock', 'when')),
+                 library=None, parser='regex', cache=None, source=None):
+        self._in_memory = source is not None
+        if library is not None:
+            line_list = library.line_list
+            filename = library.filename if filename is None else filename
+            self._source_digest = library.digest
+            self._in_memory = library.in_memory
+        elif parser == 'stream':
+            # Only the module header is read, below.
+            if cache is not None:
+                raise ValueError("A ParseCache needs the whole source; it cannot be used with parser='stream'.")
+            line_list = None
+            self._source_digest = None
+        elif source is not None:
+            text = read_source(source)
+            line_list = split_lines(text)
+            self._source_digest = source_digest(text)
+        else:
+            with open_source(filename) as file:
+                text = file.read()
+            line_list = split_lines(text)
+            self._source_digest = source_digest(text)
         if constfile:
-            with open(constfile, 'r') as file:
-                self.constfile_list =  self._strip_comments([line.rstrip('\n') for line in file])
+            self.macros = get_macro_table(constfile)
+        elif library is not None:
+            self.macros = library.macros_for(top)
         else:
-            self.constfile_list = None
+            self.macros = None
 
         self.name = top
         self.pins = {}
@@ -137,12 +307,53 @@ class VerilogModule:
         self.seq_pins = {}
         self.filename = filename
         self.constfile = constfile
-        self.ww = WhenWriter()
         self.pin_name_list = None
-
-        self.top_line_no = self._get_top_module_line_no(line_list, top)
-        pin_def_list = self._get_pin_def_list(line_list, self.top_line_no)
-        self._check_for_definitions(pin_def_list, self.top_line_no, line_list)
+        self.library = library
+        self._header = None
+        self._source = source
+        self._source_start = None
+        self._source_stamp = self._get_source_stamp()
+
+        if cache is not None:
+            macro_digest = self.macros.digest() if self.macros else ''
+            # With a library only the module's own text is hashed, so
+            # editing one module of a file keeps the others cached.
+            digest = library.span(top).digest if library is not None else self._source_digest
+            cache_key = cache.key(digest, macro_digest, top, clocks, seq_pins, VDD, VSS, parser)
+            state = cache.get(cache_key)
+            if state is not None:
+                end_line_no = None
+                if library is not None:
+                    span = library.span(top)
+                    state = dict(state, top_line_no=span.start_line)
+                    end_line_no = span.end_line
+                self._restore_state(state, line_list, end_line_no)
+                return
+
+        if line_list is None:
+            header = self._scan_header_stream()
+            self.top_line_no = header.line
+            self.end_line_no = None
+            self._line_cache = None
+            self._clean_line_cache = None
+            self._parse_ports_with_lexer(header)
+        else:
+            if library is not None:
+                span = library.span(top)
+                self.top_line_no = span.start_line
+                self._cache_module_lines(line_list, span.end_line)
+            else:
+                self.top_line_no = self._get_top_module_line_no(line_list, top)
+                self._cache_module_lines(line_list)
+            if parser in ('lexer', 'stream'):
+                self._parse_ports_with_lexer()
+            elif parser == 'regex':
+                # Only the module's own lines are searched, not the rest of
+                # the file.
+                pin_def_list = self._get_pin_def_list(self._line_cache)
+                self._check_for_definitions(pin_def_list, self._line_cache)
+            else:
+                raise ValueError(f"Unrecognized parser {parser}")
         # self._parse_pin_def_list(pin_def_list)
         self.power_pins = {"power_pin": VDD,
                            "ground_pin": VSS}
@@ -154,6 +365,70 @@ class VerilogModule:
 
         self._get_clock(clocks)
         self._get_seq_pins(seq_pins)
+        if cache is not None:
+            cache.put(cache_key, self.export_state())
+
+    def export_state(self):
+        """Returns the parse results as a dictionary of plain Python objects
+        that can be pickled and later passed to _restore_state.
+
+        Returns
+        -------
+        dict
+            Dictionary with the module name, pins, params, clocks,
+            seq_pins, power_pins and top_line_no.
+
+        """
+        return {'name': self.name,
+                'pins': self.pins,
+                'params': self.params,
+                'clocks': self.clocks,
+                'seq_pins': self.seq_pins,
+                'power_pins': self.power_pins,
+                'top_line_no': self.top_line_no}
+
+    def _restore_state(self, state, line_list, end_line_no=None):
+        """Sets the parse results from a dictionary made by export_state.
+
+        Parameters
+        ----------
+        state : dict
+            Dictionary returned by export_state.
+        line_list : list[str]
+            List of lines in the Verilog file.
+        end_line_no : int, optional
+            Index in line_list of the endmodule line, if already known.
+
+        """
+        self.pins = state['pins']
+        self.params = state['params']
+        self.clocks = state['clocks']
+        self.seq_pins = state['seq_pins']
+        self.power_pins = state['power_pins']
+        self.top_line_no = state['top_line_no']
+        self.ports_json_dict = {'name': self.name,
+                                'pins': self.pins}
+        self._cache_module_lines(line_list, end_line_no)
+
+    @classmethod
+    def from_source(cls, source, top, **kwargs):
+        """Creates a VerilogModule from in-memory Verilog source.
+
+        Parameters
+        ----------
+        source : str, bytes, TextIO, BinaryIO
+            Verilog source text, or a stream to read it from.
+        top : str
+            Name of the module.
+        **kwargs
+            Passed to VerilogModule.
+
+        Returns
+        -------
+        VerilogModule
+
+        """
+        return cls(top, source=source, **kwargs)
 
     @property
     def pin_names(self):
@@ -165,16 +440,114 @@ class VerilogModule:
 
     @property
     def line_list(self):
-        with open(self.filename, 'r') as file:
-            line_list = [line.rstrip('\n') for line in file]
-        for line in line_list[self.top_line_no:]:
-            if 'endmodule' in line:
-                end_idx = line_list.index(line) + 1
-        return line_list[self.top_line_no:end_idx]
+        """Lines of the module definition, from the module declaration
+        through its own endmodule. Earlier versions re-read the file on
+        every access and returned everything from the module declaration
+        through the last endmodule of the file, i.e. every module after
+        this one as well. The lines are now read once, when the module is
+        parsed (on first access with the 'stream' parser); call reload to
+        pick up later edits of the source file."""
+        if self._line_cache is None:
+            self._load_stream_lines()
+        return self._line_cache
 
     @property
     def clean_line_list(self):
-        return self._strip_comments(self.line_list)
+        if self._clean_line_cache is None:
+            self._clean_line_cache = tuple(self._strip_comments(self.line_list))
+        return self._clean_line_cache
+
+    def reload(self):
+        """Re-reads the module lines if the source file has changed since
+        they were read. The ports are not parsed again.
+
+        Returns
+        -------
+        bool
+            True if the lines were reloaded.
+
+        """
+        stamp = self._get_source_stamp()
+        if stamp is None or stamp == self._source_stamp:
+            return False
+        self._source_stamp = stamp
+        with open_source(self.filename) as file:
+            text = file.read()
+        digest = source_digest(text)
+        if digest == self._source_digest:
+            return False
+        self._source_digest = digest
+        line_list = split_lines(text)
+        self.top_line_no = self._get_top_module_line_no(line_list, self.name)
+        self._cache_module_lines(line_list)
+        return True
+
+    def _get_source_stamp(self):
+        """Returns the (mtime, size) stamp of the source file, or None if it
+        cannot be read or the module was built from in-memory source."""
+        if self._in_memory or self.filename is None:
+            return None
+        return file_stamp(self.filename)
+
+    def _cache_module_lines(self, line_list, end_line_no=None):
+        """Stores the slice of line_list holding the module definition.
+
+        Parameters
+        ----------
+        line_list : list[str]
+            List of lines in the Verilog file.
+        end_line_no : int, optional
+            Index in line_list of the endmodule line, e.g. from a
+            ModuleSpan. If not given, line_list is searched for it.
+
+        """
+        if end_line_no is None:
+            end_line_no = len(line_list) - 1
+            for idx in range(self.top_line_no, len(line_list)):
+                if 'endmodule' in line_list[idx]:
+                    end_line_no = idx
+                    break
+        self.end_line_no = end_line_no
+        self._line_cache = tuple(line_list[self.top_line_no:end_line_no + 1])
+        self._clean_line_cache = None
+
+    def _load_stream_lines(self):
+        """Reads the module lines of a module parsed with the 'stream'
+        parser, which only read its header."""
+        if self.reload():
+            # The file changed after the header was read.
+            return
+        text = self._read_stream_source()
+        self._source_digest = source_digest(text)
+        self._cache_module_lines(split_lines(text))
+
+    def _open_stream_source(self):
+        """Returns a stream over the module source, rewound to its start."""
+        source = self._source
+        if source is None:
+            return open_source(self.filename)
+        if isinstance(source, str):
+            return io.StringIO(source)
+        if isinstance(source, (bytes, bytearray)):
+            return io.BytesIO(source)
+        # The caller owns the stream, so it is not closed after reading.
+        if self._source_start is None:
+            self._source_start = source.tell() if source.seekable() else -1
+        elif self._source_start < 0:
+            raise ValueError("The module source stream cannot be read twice; pass a seekable stream.")
+        else:
+            source.seek(self._source_start)
+        return contextlib.nullcontext(source)
+
+    def _read_stream_source(self):
+        with self._open_stream_source() as stream:
+            return read_source(stream)
+
+    def _scan_header_stream(self):
+        """Scans the module header from the source without reading past
+        the port declarations."""
+        with self._open_stream_source() as stream:
+            return scan_module_stream(stream, self.name)
 
     def _get_top_module_line_no(self, line_list, top):
         """Finds the beginning of the module definition.
@@ -202,16 +575,22 @@ class VerilogModule:
                 return line_list.index(line)
         raise NameError(f"Could not find module name {top} in {self.filename}.")
 
-    def _get_pin_def_list(self, line_list, top_line_no):
-        """Returns list of strings containing the module and port definitions."""
+    def _get_pin_def_list(self, module_lines):
+        """Returns list of strings containing the module and port definitions.
+
+        Parameters
+        ----------
+        module_lines : Sequence[str]
+            Lines of the module, starting with the module declaration.
 
-        for line in line_list[top_line_no:]:
+        """
+
+        for end_idx, line in enumerate(module_lines):
             if ");" in line:
-                end_idx = line_list[top_line_no:].index(line)
                 break
         if end_idx == 0:
             end_idx += 1 # THIS IS A HACK, DO THIS BETTER NEXT TIME
-        pin_def_list = self._strip_comments(line_list[top_line_no:top_line_no + end_idx])
+        pin_def_list = self._strip_comments(module_lines[:end_idx])
         return pin_def_list
 
     def _strip_comments(self, line_list):
@@ -250,7 +629,7 @@ class VerilogModule:
                 new_line_list.append(line)
         return new_line_list
 
-    def _check_for_definitions(self, pin_def_list, top_line_no, line_list):
+    def _check_for_definitions(self, pin_def_list, module_lines):
         """
         Do a preliminary check for input/output definitions in the module
         definition.
@@ -260,13 +639,9 @@ class VerilogModule:
         pin_def_list : list[str]
             List of lines that contain the port declarations.
 
-        top_line_no : int
-            Index in the file line list of the line containing the
-            top-level Verilog module definition (i.e. the line containing
-            "module <top>")
-
-        line_list : list[str]
-            List of lines in the Verilog file.
+        module_lines : Sequence[str]
+            Lines of the module, from the module declaration through
+            endmodule.
 
         """
         input_check = ['input' in line for line in pin_def_list]
@@ -274,7 +649,7 @@ class VerilogModule:
         if any(input_check) or any(output_check):
             self._parse_pin_def_list(pin_def_list)
         else:
-            self._parse_ports_in_body(top_line_no, line_list)
+            self._parse_ports_in_body(module_lines)
 
     def _get_params_and_values(self, pins_str):
         """
@@ -307,20 +682,50 @@ class VerilogModule:
                 self.params[param_name] = int(param_val)
         else:
             params_str = ""
-        if self.constfile_list:
-            for line in self.constfile_list:
-                parts = line.split()
-                if parts[0] == '`define':
-                    param_name = parts[1]
-                    param_val = parts[-1]
-                    if param_val.isnumeric():
-                        self.params[param_name] = int(param_val)
+        self._get_const_params()
 
         return pins_str[pins_str.index(params_str) + len(params_str):]
 
+    def _set_params(self, param_exprs, overrides=None):
+        """Evaluates parameter default expressions in declaration order and
+        adds the numeric `define constants.
+
+        Parameters
+        ----------
+        param_exprs : dict
+            Dictionary of parameter default expression strings keyed by
+            parameter name.
+        overrides : dict, optional
+            Dictionary of parameter values used instead of the defaults.
+            Later defaults are evaluated with the overridden values.
+
+        """
+        overrides = overrides or {}
+        for param_name, param_val in param_exprs.items():
+            if param_name in overrides:
+                self.params[param_name] = overrides[param_name]
+            elif param_val.isdigit():
+                self.params[param_name] = int(param_val)
+            else:
+                try:
+                    self.params[param_name] = self._eval_param_op(param_val)
+                except Exception:
+                    digits = re.findall(r'\d+', param_val)
+                    if digits:
+                        self.params[param_name] = int(digits[0])
+        self._get_const_params()
+        self.params.update(overrides)
+
+    def _get_const_params(self):
+        """Adds numeric `define constants from the macro table to the
+        parameter dictionary."""
+        if self.macros:
+            self.params.update(self.macros.numeric_values())
+
     def _eval_param_op(self, string):
-        """Evaluates bus index expression using Abstract Syntax Tree code
-         evaluation.
+        """Evaluates bus index expression with the constant expression
+        evaluator in verilog_expr. Results are memoized by expression and the
+        values of the parameters it refers to.
 
         Parameters
         ----------
@@ -334,12 +739,7 @@ class VerilogModule:
 
         """
 
-        clean_exp = re.findall(r"[^`\n]+", string)
-        clean_exp = "".join(clean_exp)
-        expr_ast = ast.parse(clean_exp, mode='eval')
-        NameLookup().visit(expr_ast)
-        ast.fix_missing_locations(expr_ast)
-        return int(eval(compile(expr_ast, filename='<ast>', mode='eval')))
+        return evaluate(string, self.params)
 
     def _bus_parser(self, bus_idx):
         """Parses bus indices from [X:Y] string. This method can handle
@@ -434,26 +834,21 @@ class VerilogModule:
 
                 self.pins[name] = pin_info
 
-    def _parse_ports_in_body(self, top_line_no, line_list):
+    def _parse_ports_in_body(self, module_lines):
         """Parse Verilog module body for port definitions. This method is
         invoked if the module definition does not contain port definitions.
 
         Parameters
         ----------
-        top_line_no : int
-            Index in the file line list of the line containing the
-            top-level Verilog module definition (i.e. the line containing
-            "module <top>")
-
-        line_list : list[str]
-            List of lines in Verilog module file.
+        module_lines : Sequence[str]
+            Lines of the module, from the module declaration through
+            endmodule.
 
         Returns
         -------
 
         """
-        use_line_list = line_list[top_line_no:]
-        pin_def_list = self._get_pin_def_list(line_list, top_line_no)
+        pin_def_list = self._get_pin_def_list(module_lines)
         if len(pin_def_list) == 1:
             pins_str = pin_def_list[0]
         else:
@@ -471,7 +866,7 @@ class VerilogModule:
         out_pattern = re.compile('^\s*output')
         end_pattern = re.compile('^\s*endmodule')
         pin_def_list_bk = pin_def_list
-        for line in use_line_list:
+        for line in module_lines:
             if not pin_def_list:
                 break
             if re.match(in_pattern, line) or re.match(out_pattern, line):
@@ -507,6 +902,34 @@ class VerilogModule:
 
                 self.pins[name] = pin_info
 
+    def _parse_ports_with_lexer(self, header=None):
+        """Extracts parameters and ports from the module definition using
+        the single-pass tokenizer. Handles both port declarations in the
+        module definition and in the module body.
+
+        Parameters
+        ----------
+        header : ModuleHeader, optional
+            Already scanned module header. If not given, the cached module
+            lines are scanned.
+
+        """
+        if header is None:
+            header = scan_module_header('\n'.join(self._line_cache), self.name, self.top_line_no)
+        self._header = header
+        self._set_params(header.params)
+        for decl in header.ports:
+            for name in decl.names:
+                pin_info = {"name": name,
+                            "direction": decl.direction,
+                            "is_analog": False
+                            }
+                if decl.bus_range:
+                    bus_lim_dict = self._bus_parser(f"[{decl.bus_range[0]}:{decl.bus_range[1]}]")
+                    pin_info.update(bus_lim_dict)
+
+                self.pins[name] = pin_info
+
     def _get_clock(self, clocks):
         """
         Gets clock pin.
@@ -523,14 +946,11 @@ class VerilogModule:
 
         if isinstance(clocks, str):
             clocks = [clocks]
-        for clk_name in clocks:
-            re_pattern = re.compile(clk_name + "[_\w]*")
-            for pin_name in self.pins.keys():
-                re_match = re.search(re_pattern, pin_name)
-                if re_match:
-                    re_name = re_match[0]
-                    self.clocks[pin_name] = self.pins[re_name]
-                    self.pins[re_name].update({'clock': True})
+        matcher = get_pin_matcher(tuple(clk_name + "[_\w]*" for clk_name in clocks))
+        for matches in matcher.match_pins(self.pins.keys()):
+            for pin_name, re_name in matches:
+                self.clocks[pin_name] = self.pins[re_name]
+                self.pins[re_name].update({'clock': True})
 
     def _get_seq_pins(self, seq_pin_names):
         """
@@ -546,33 +966,20 @@ class VerilogModule:
 
         """
 
-        for seq_pin in seq_pin_names:
-            seq_pin_name = seq_pin[0]
+        matcher = get_pin_matcher(tuple(seq_pin[0] + "[_\w]*" for seq_pin in seq_pin_names),
+                                  tuple(seq_pin[0] + '*' for seq_pin in seq_pin_names))
+        for seq_pin, matches in zip(seq_pin_names, matcher.match_pins(self.pins.keys())):
             seq_pin_clk = seq_pin[1]
             seq_pin_when = seq_pin[2]
-            re_pattern = re.compile(seq_pin_name + "[_\w]*")
-            re_singular = re.compile(seq_pin_name + '*')
-            re_clk_suffix_pattern = re.compile("[_\d]")
-            for pin_name in self.pins.keys():
-                if len(pin_name) == 1:
-                    re_match = re.search(re_singular, pin_name)
-                else:
-                    re_match = re.search(re_pattern, pin_name)
-                if re_match:
-                    re_name = re_match[0]
-                    clk_suffix = re.search(re_clk_suffix_pattern, re_name)
-                    clk_suffix = [""] if not clk_suffix else clk_suffix
-                    when_ast = ast.parse(seq_pin_when)
-                    when_ast = NameUpdate(clk_suffix[0]).visit(when_ast)
-                    self.ww.visit(when_ast)
-                    when_str = self.ww.when_expr
-                    sdf_str = self.ww.sdf_expr
-                    self.pins[re_name].update({'sequential': True})
-                    self.pins[re_name].update({'related_clock': seq_pin_clk + clk_suffix[0]})
-                    self.pins[re_name].update({'when': when_str})
-                    self.pins[re_name].update({'sdf_cond': sdf_str})
-                    self.seq_pins[pin_name] = self.pins[re_name]
-                    self.ww.clear()
+            for pin_name, re_name in matches:
+                clk_suffix = self._clk_suffix_pattern.search(re_name)
+                clk_suffix = clk_suffix[0] if clk_suffix else ""
+                when_str, sdf_str = when_conditions(seq_pin_when, clk_suffix)
+                self.pins[re_name].update({'sequential': True})
+                self.pins[re_name].update({'related_clock': seq_pin_clk + clk_suffix})
+                self.pins[re_name].update({'when': when_str})
+                self.pins[re_name].update({'sdf_cond': sdf_str})
+                self.seq_pins[pin_name] = self.pins[re_name]
 
 
 
@@ -595,29 +1002,12 @@ class VerilogModule:
         Returns
         -------
 
+        See Also
+        --------
+        port_export.write_ports : Writes the ports of many modules.
+
         """
-        json_dict = {'name': self.name,
-                     'revision': 0,
-                     'cells': [{'name': self.name,
-                               'pins': [],
-                               'pg_pins': []}],
-                     }
-        all_pins_specs = pin_specs['all_pins']
-        for pin_name, pin_dict in self.pins.items():
-            this_pin_specs = pin_specs.get(pin_name, dict())
-            pin_dict.update(all_pins_specs)
-            pin_dict.update(this_pin_specs) # specific pin specs take precedence
-            # pin_dict['related_power_pin'] = pin_dict.pop('power_pin')
-            # pin_dict['related_ground_pin'] = pin_dict.pop('ground_pin')
-            json_dict['cells'][0]['pins'].append(pin_dict)
-            pg_pins = [{'name': self.power_pins['power_pin'],
-                        'pg_type': 'primary_power'},
-                       {'name': self.power_pins['ground_pin'],
-                        'pg_type': 'primary_ground'},
-                       ]
-            json_dict['cells'][0]['pg_pins'] = pg_pins
-
-            with open(filename, 'w') as json_file:
-                json.dump(json_dict,json_file)
+        with open(filename, 'w') as json_file:
+            json.dump(port_record(self, pin_specs), json_file)
 
 
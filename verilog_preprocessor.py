@@ -0,0 +1,438 @@
+import hashlib
+import os
+import re
+import warnings
+
+from phyrilog.utilities import file_stamp, open_source
+from phyrilog.verilog_lexer import mask_comments
+
+
+class MacroTable:
+    """Dictionary-backed table of `define macros.
+
+    Parameters
+    ----------
+    macros : dict, optional
+        Initial macro definitions. Keys are macro names, values are the
+        macro body text.
+
+    Attributes
+    ----------
+    macros : dict
+        Macro definitions. Keys are macro names (without the backtick),
+        values are the macro body text.
+    args : dict
+        Formal argument names of function-like macros, keyed by macro name.
+
+    """
+
+    def __init__(self, macros=None, args=None):
+        self.macros = dict(macros) if macros else {}
+        self.args = dict(args) if args else {}
+        self._version = 0
+        self._snapshot = None
+        self._numeric_values = None
+        self._digest = None
+
+    def __contains__(self, name):
+        return name in self.macros
+
+    def __getitem__(self, name):
+        return self.macros[name]
+
+    def __len__(self):
+        return len(self.macros)
+
+    def get(self, name, default=None):
+        return self.macros.get(name, default)
+
+    def items(self):
+        return self.macros.items()
+
+    def define(self, name, value, args=None):
+        self.macros[name] = value
+        if args is not None:
+            self.args[name] = args
+        else:
+            self.args.pop(name, None)
+        self._changed()
+
+    def undef(self, name):
+        self.macros.pop(name, None)
+        self.args.pop(name, None)
+        self._changed()
+
+    def update(self, other):
+        """Merges the definitions of another MacroTable into this one."""
+        if not other.macros:
+            return
+        self.macros.update(other.macros)
+        for name in other.macros:
+            self.args.pop(name, None)
+        self.args.update(other.args)
+        self._changed()
+
+    def _changed(self):
+        self._version += 1
+        self._snapshot = None
+        self._numeric_values = None
+        self._digest = None
+
+    def snapshot(self):
+        """Returns a copy of the table as it currently stands. Consecutive
+        calls without intervening changes return the same object, so taking
+        a snapshot per module only copies the table when it has changed."""
+        if self._snapshot is None:
+            self._snapshot = MacroTable(self.macros, self.args)
+        return self._snapshot
+
+    def numeric_values(self):
+        """Returns a dictionary of the macros whose value is a plain integer,
+        converted to int. The dictionary is computed once per table state."""
+        if self._numeric_values is None:
+            self._numeric_values = {name: int(value) for name, value in self.macros.items()
+                                    if value.isnumeric()}
+        return self._numeric_values
+
+    def digest(self):
+        """Returns a hex digest of the macro definitions, used to detect
+        changes to the constants seen by a module."""
+        if self._digest is None:
+            content = repr((sorted(self.macros.items()), sorted(self.args.items())))
+            self._digest = hashlib.sha1(content.encode()).hexdigest()
+        return self._digest
+
+
+class VerilogPreprocessor:
+    """Processes `define, `undef, `include, `ifdef, `ifndef, `elsif, `else
+    and `endif directives to build a MacroTable.
+
+    Included files are processed against the including file's table, so
+    their `ifdef checks see its definitions and include guards stop
+    repeated includes. A file whose definitions do not depend on the
+    including file is processed once per process, and its definitions are
+    shared with every preprocessor that includes it (see get_macro_table).
+    Include files that cannot be found are skipped with a warning.
+
+    Parameters
+    ----------
+    include_dirs : Iterable[str, Path], optional
+        Extra directories to search for `include files. The directory of
+        the including file is always searched first.
+
+    Attributes
+    ----------
+    include_stamps : dict
+        (mtime, size) stamps of every `include file read, directly or
+        through other includes, keyed by real path.
+
+    """
+
+    _directive_pattern = re.compile(r'`(define|undef|ifdef|ifndef|elsif|else|endif|include)\b')
+    _define_pattern = re.compile(r'\s*(\w+)(\([^)]*\))?\s*(.*)', re.DOTALL)
+    _name_pattern = re.compile(r'\s*(\w+)')
+    _include_pattern = re.compile(r'\s*["<]([^">]+)[">]')
+
+    def __init__(self, include_dirs=()):
+        self.include_dirs = tuple(str(path) for path in include_dirs)
+        self._including = {}
+        self.include_stamps = {}
+
+    def process_file(self, filename):
+        """Returns the MacroTable defined by a file, using the process-wide
+        cache.
+
+        Parameters
+        ----------
+        filename : str, Path
+            Path to the Verilog header or source file.
+
+        Returns
+        -------
+        MacroTable
+
+        """
+        return get_macro_table(filename, self.include_dirs)
+
+    def process_lines(self, line_list, table=None, marks=(), current_dir=None, filename=None):
+        """Runs the preprocessor over a list of source lines.
+
+        Parameters
+        ----------
+        line_list : list[str]
+            List of lines in the Verilog file.
+        table : MacroTable, optional
+            Table to add definitions to. A new table is created if not
+            given.
+        marks : Iterable[int], optional
+            Line indices at which to record a snapshot of the table, e.g. the
+            first line of each module.
+        current_dir : str, Path, optional
+            Directory used to resolve relative `include paths.
+        filename : str, Path, optional
+            Name of the file the lines came from, used in error messages.
+
+        Returns
+        -------
+        table : MacroTable
+            Table with all definitions from the lines.
+        snapshots : dict
+            Dictionary of MacroTable snapshots keyed by mark line index.
+
+        Raises
+        ------
+        ValueError
+            If a conditional directive is unbalanced or has no macro name.
+
+        """
+        table = MacroTable() if table is None else table
+        snapshots, _ = self._process(line_list, table, marks, current_dir, filename)
+        return table, snapshots
+
+    def _process(self, line_list, table, marks, current_dir, filename):
+        """Does the work of process_lines. Also returns how the result
+        depends on the table the lines were processed against, see
+        _Context."""
+        context = _Context()
+        marks = sorted(marks)
+        mark_idx = 0
+        snapshots = {}
+        # Each entry is [this branch active, any branch taken, parent active]
+        cond_stack = []
+        active = True
+        masked_lines = mask_comments('\n'.join(line_list)).split('\n')
+        line_no = 0
+        n_lines = len(masked_lines)
+
+        def error(message):
+            return ValueError(f"{filename or '<source>'}:{line_no}: {message}")
+
+        def macro_name(directive, rest):
+            name = self._name_pattern.match(rest)
+            if name is None:
+                raise error(f"`{directive} without a macro name.")
+            return name
+
+        def open_cond(directive):
+            if not cond_stack:
+                raise error(f"`{directive} without a matching `ifdef or `ifndef.")
+            return cond_stack[-1]
+
+        while line_no < n_lines:
+            while mark_idx < len(marks) and marks[mark_idx] <= line_no:
+                snapshots[marks[mark_idx]] = table.snapshot()
+                mark_idx += 1
+            line = masked_lines[line_no]
+            line_no += 1
+            if '`' not in line:
+                continue
+            pos = 0
+            while True:
+                match = self._directive_pattern.search(line, pos)
+                if match is None:
+                    break
+                directive = match[1]
+                rest = line[match.end():]
+                pos = match.end()
+                if directive in ('ifdef', 'ifndef'):
+                    name = macro_name(directive, rest)
+                    pos += name.end()
+                    defined = context.test(name[1], table)
+                    taken = defined if directive == 'ifdef' else not defined
+                    cond_stack.append([taken, taken, active])
+                    active = active and taken
+                elif directive == 'elsif':
+                    name = macro_name(directive, rest)
+                    pos += name.end()
+                    cond = open_cond(directive)
+                    cond[0] = not cond[1] and context.test(name[1], table)
+                    cond[1] = cond[1] or cond[0]
+                    active = cond[2] and cond[0]
+                elif directive == 'else':
+                    cond = open_cond(directive)
+                    cond[0] = not cond[1]
+                    cond[1] = True
+                    active = cond[2] and cond[0]
+                elif directive == 'endif':
+                    active = open_cond(directive)[2]
+                    cond_stack.pop()
+                elif not active:
+                    continue
+                elif directive == 'define':
+                    # Macro bodies continue onto the next line after a backslash
+                    while rest.rstrip().endswith('\\') and line_no < n_lines:
+                        rest = rest.rstrip()[:-1] + ' ' + masked_lines[line_no]
+                        line_no += 1
+                    name, args, value = self._define_pattern.match(rest).groups()
+                    if args is not None:
+                        args = tuple(arg.strip() for arg in args[1:-1].split(',') if arg.strip())
+                    table.define(name, value.strip(), args)
+                    context.defined(name)
+                    break
+                elif directive == 'undef':
+                    name = macro_name(directive, rest)
+                    pos += name.end()
+                    context.test(name[1], table)
+                    table.undef(name[1])
+                    context.defined(name[1])
+                elif directive == 'include':
+                    include = self._include_pattern.match(rest)
+                    if include is None:
+                        raise error("`include without a file name.")
+                    pos += include.end()
+                    path = self._resolve_include(include[1], current_dir)
+                    if path is None:
+                        warnings.warn(f"{filename or '<source>'}:{line_no}: include file {include[1]} not found; "
+                                      f"its definitions are skipped.")
+                    else:
+                        context.include(self._include(path, table))
+        if cond_stack:
+            raise error("`ifdef or `ifndef without a matching `endif.")
+        for mark in marks[mark_idx:]:
+            snapshots[mark] = table.snapshot()
+        return snapshots, context
+
+    def _include(self, filename, table):
+        """Processes an included file against table, using the cached
+        definitions of the file when they do not depend on table. Returns
+        the file's _Context."""
+        path = os.path.realpath(filename)
+        if self._including.get(path, 0) >= 2:
+            # A file that includes itself, directly or through other files.
+            # Include guards stop at the second entry; without one the
+            # cycle is cut here.
+            context = _Context()
+            context.complete = False
+            return context
+        key = (path, self.include_dirs)
+        stamp = file_stamp(path)
+        cached = _macro_table_cache.get(key)
+        if cached is None or cached.stamp != stamp:
+            with open_source(path) as file:
+                cached = _Header(stamp, file.read().split('\n'))
+            _macro_table_cache[key] = cached
+        elif cached.table is not None and cached.table_applies(table) and cached.is_current():
+            table.update(cached.table)
+            self.include_stamps.update(cached.context.stamps)
+            return cached.context
+        self._including[path] = self._including.get(path, 0) + 1
+        try:
+            _, context = self._process(cached.line_list, table, (), os.path.dirname(path), path)
+        finally:
+            self._including[path] -= 1
+        context.stamps[path] = stamp
+        self.include_stamps[path] = stamp
+        if context.complete and not context.depends_on:
+            cached.table = MacroTable({name: table[name] for name in context.names if name in table},
+                                      {name: table.args[name] for name in context.names if name in table.args})
+            cached.context = context
+        return context
+
+    def _resolve_include(self, include, current_dir):
+        search_dirs = ([str(current_dir)] if current_dir else []) + list(self.include_dirs)
+        for search_dir in search_dirs:
+            path = os.path.join(search_dir, include)
+            if os.path.exists(path):
+                return path
+        if os.path.exists(include):
+            return include
+        return None
+
+
+class _Context:
+    """How the definitions made by a file depend on the table it was
+    processed against.
+
+    Attributes
+    ----------
+    names : set[str]
+        Macros the file defined or undefined; their state afterwards does
+        not depend on the table.
+    external : set[str]
+        Macros the file tested or undefined before defining them. The file
+        has the same effect on any table that has none of them.
+    depends_on : set[str]
+        External macros that were defined in the table.
+    complete : bool
+        False if an include cycle was cut short.
+    stamps : dict
+        (mtime, size) stamps of the file and of every file it included,
+        keyed by real path.
+
+    """
+
+    def __init__(self):
+        self.names = set()
+        self.external = set()
+        self.depends_on = set()
+        self.complete = True
+        self.stamps = {}
+
+    def test(self, name, table):
+        defined = name in table
+        if name not in self.names:
+            self.external.add(name)
+            if defined:
+                self.depends_on.add(name)
+        return defined
+
+    def defined(self, name):
+        self.names.add(name)
+
+    def include(self, other):
+        self.external.update(other.external - self.names)
+        self.depends_on.update(other.depends_on - self.names)
+        self.complete = self.complete and other.complete
+        self.names.update(other.names)
+        self.stamps.update(other.stamps)
+
+
+class _Header:
+    """Cache entry of an included file: its lines, and its definitions
+    when they do not depend on the including file."""
+
+    def __init__(self, stamp, line_list):
+        self.stamp = stamp
+        self.line_list = line_list
+        self.table = None
+        self.context = None
+
+    def table_applies(self, table):
+        return not any(name in table for name in self.context.external)
+
+    def is_current(self):
+        """Checks that none of the files the definitions were read from,
+        nested includes included, has changed since."""
+        return all(file_stamp(path) == stamp for path, stamp in self.context.stamps.items())
+
+
+# Process-wide cache of included files, keyed by file path and search path.
+_macro_table_cache = {}
+
+
+def get_macro_table(filename, include_dirs=()):
+    """Returns the MacroTable defined by a header file on its own. Each
+    file is read and preprocessed once per process; later calls return the
+    cached table as long as the mtime and size of the file, and of every
+    file it includes, are unchanged.
+
+    Parameters
+    ----------
+    filename : str, Path
+        Path to the Verilog header file.
+    include_dirs : Iterable[str, Path], optional
+        Extra directories to search for `include files.
+
+    Returns
+    -------
+    MacroTable
+        Table of macros defined by the file. This table is shared; callers
+        must not modify it.
+
+    """
+    table = MacroTable()
+    preprocessor = VerilogPreprocessor(include_dirs)
+    preprocessor._include(filename, table)
+    cached = _macro_table_cache[(os.path.realpath(filename), preprocessor.include_dirs)]
+    # An include cycle leaves the file uncached; its table is not shared then
+    return cached.table if cached.table is not None else table.snapshot()